@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import product
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.recount import MIDDLE, PreparedTrajectories, classify_positions, count_crossings, prepare_trajectories
+from app.analytics.trajectory_store import TrajectoryArrays
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Métricas de uma configuração candidata de linha de contagem."""
+
+    y_ratio: float
+    offset: float
+    in_count: int
+    out_count: int
+    near_misses: int
+    id_churn: int
+    count_error: Optional[int] = None
+
+    @property
+    def instability(self) -> int:
+        return self.near_misses + self.id_churn
+
+    @property
+    def crossings(self) -> int:
+        return self.in_count + self.out_count
+
+    @property
+    def instability_rate(self) -> float:
+        """Instabilidade por travessia: sem referência, compara linhas com volumes de passagem diferentes."""
+        return self.instability / max(1, self.crossings)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def evaluate_line(
+    prepared: PreparedTrajectories,
+    y_ratio: float,
+    offset: float,
+    expected: Optional[Tuple[int, int]] = None,
+) -> SweepResult:
+    """
+    Avalia uma configuração sobre trajetórias já preparadas.
+
+    - near_misses: visitas à faixa que retornam para o mesmo lado (oscilação; a máquina de
+      estados conta MIDDLE -> borda como evento, então cada uma tende a gerar contagem espúria).
+    - id_churn: segmentos de track que nascem dentro da faixa, sintoma de troca/fragmentação de ID
+      exatamente onde a contagem é decidida.
+    """
+    crossings = count_crossings(prepared, y_ratio, offset)
+    position = classify_positions(prepared, y_ratio, offset)
+
+    outside = np.flatnonzero(position != MIDDLE)
+    a, b = outside[:-1], outside[1:]
+    revisit = (
+        (prepared.segment[a] == prepared.segment[b])
+        & ((b - a) > 1)
+        & (position[a] == position[b])
+    )
+
+    born_in_band = prepared.segment_start & (position == MIDDLE)
+
+    error = None
+    if expected is not None:
+        error = abs(crossings.in_count - expected[0]) + abs(crossings.out_count - expected[1])
+
+    return SweepResult(
+        y_ratio=round(float(y_ratio), 4),
+        offset=round(float(offset), 4),
+        in_count=crossings.in_count,
+        out_count=crossings.out_count,
+        near_misses=int(revisit.sum()),
+        id_churn=int(born_in_band.sum()),
+        count_error=error,
+    )
+
+
+_worker_prepared: Optional[PreparedTrajectories] = None
+
+
+def _init_worker(prepared: PreparedTrajectories) -> None:
+    global _worker_prepared
+    _worker_prepared = prepared
+
+
+def _evaluate_chunk(args: Tuple[List[Tuple[float, float]], Optional[Tuple[int, int]]]) -> List[SweepResult]:
+    candidates, expected = args
+    return [evaluate_line(_worker_prepared, y, o, expected) for y, o in candidates]
+
+
+def rank_results(results: Iterable[SweepResult], min_crossings: int = 1) -> List[SweepResult]:
+    """
+    Ordena do melhor para o pior.
+
+    - Com referência: erro de contagem, instabilidade, faixa mais estreita.
+    - Sem referência: instabilidade por travessia, faixa mais estreita. Linhas
+      com menos de `min_crossings` travessias vão para o fim; uma linha que
+      ninguém cruza não tem oscilação nem troca de ID e venceria sempre.
+    """
+
+    def key(r: SweepResult) -> tuple:
+        if r.count_error is not None:
+            return (r.count_error, r.instability, r.offset)
+        return (r.crossings < min_crossings, r.instability_rate, r.offset)
+
+    return sorted(results, key=key)
+
+
+def sweep_line_params(
+    traj: TrajectoryArrays,
+    y_ratios: Sequence[float],
+    offsets: Sequence[float],
+    max_inactive_seconds: float = 10.0,
+    expected: Optional[Tuple[int, int]] = None,
+    workers: int = 1,
+    min_crossings: int = 1,
+) -> List[SweepResult]:
+    """
+    Varre a grade (y_ratio x offset) sobre trajetórias gravadas uma única vez.
+
+    A ordenação/segmentação é feita uma vez; cada candidata é avaliada de
+    forma vetorizada. Com `workers > 1`, a grade é dividida entre processos
+    que recebem as trajetórias preparadas apenas na inicialização.
+    """
+    prepared = prepare_trajectories(traj, max_inactive_seconds)
+    grid = [(float(y), float(o)) for y, o in product(y_ratios, offsets) if y - o > 0 and y + o < 1]
+
+    if workers <= 1 or len(grid) < 2:
+        return rank_results((evaluate_line(prepared, y, o, expected) for y, o in grid), min_crossings)
+
+    chunks = [grid[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(prepared,)) as pool:
+        results = [r for chunk in pool.map(_evaluate_chunk, [(c, expected) for c in chunks if c]) for r in chunk]
+    return rank_results(results, min_crossings)
@@ -1,13 +1,21 @@
-from typing import Dict, Set, Tuple
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Optional, Set, Tuple
 from time import monotonic
 
 from app.services.storage import StorageService
 from app.config.settings import load_zones_config
 from app.analytics.statistics import StatsAnalyzer
 from app.core.enums import Direction, Position
+from app.tracking.track_batch import TrackBatch
 from app.utils.logger import log
 
 
+def compute_line_bounds(frame_h: int, y_ratio: float, offset: float) -> Tuple[int, int]:
+    """Limites (em pixels) da faixa de contagem: (linha superior, linha inferior)."""
+    return int(frame_h * (y_ratio - offset)), int(frame_h * (y_ratio + offset))
+
+
 class StreamCounter:
     """
     Gerencia a lógica de contagem de fluxo baseada em zonas virtuais.
@@ -17,27 +25,40 @@ class StreamCounter:
     - Aplica uma máquina de estados simples para validar cruzamentos.
     """
 
-    def __init__(self) -> None:
-        config = load_zones_config()
-        zone_data = config.get("counting_line", {})
-
-        self.line_y_ratio: float = zone_data.get("y_ratio", 0.6)
-        self.offset: float = zone_data.get("offset", 0.05)
-        self.max_inactive_seconds: float = float(zone_data.get("max_inactive_seconds", 10.0))
-
-        stats = StatsAnalyzer()
-        report = stats.get_daily_report()
+    def __init__(
+        self,
+        storage: Optional[StorageService] = None,
+        initial_counts: Optional[Dict[str, int]] = None,
+        zones_config: Optional[dict] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """
+        :param storage: Serviço de persistência (padrão: StorageService no banco local)
+        :param initial_counts: Contagens iniciais; se omitido, carrega o relatório do dia
+        :param zones_config: Configuração de zonas; se omitido, lê zones.yaml
+        :param clock: Relógio da inatividade quando `count` não recebe `now` (padrão: monotonic)
+        """
+        config = zones_config if zones_config is not None else load_zones_config()
+        self._set_zones(config)
+
+        report = initial_counts if initial_counts is not None else StatsAnalyzer().get_daily_report()
 
         self.in_count: int = report[Direction.IN.value]
         self.out_count: int = report[Direction.OUT.value]
+        # Dia a que os contadores se referem (relatório carregado na inicialização).
+        self.counts_day: date = date.today()
 
-        self.storage = StorageService()
+        self.storage = storage if storage is not None else StorageService()
 
         self.track_positions: Dict[int, Position] = {}
+        # Último topo (px) e altura do frame: permitem reclassificar as posições ao trocar as zonas.
+        self.last_y_top: Dict[int, float] = {}
+        self._frame_h: Optional[int] = None
         self.already_counted: Set[int] = set()
-        self.last_seen_at: Dict[int, float] = {}
-        self.cleanup_interval_seconds: float = 1.0
-        self._last_cleanup_at: float = monotonic()
+        # Ordenado do visto há mais tempo ao mais recente (cada avistamento move o ID para o fim):
+        # os inativos ficam sempre no início, então a expiração só visita IDs que expiram.
+        self.last_seen_at: "OrderedDict[int, float]" = OrderedDict()
+        self._clock = clock
 
         log.info(
             f"Contador inicializado | Linha: {self.line_y_ratio} | Offset: {self.offset}"
@@ -46,26 +67,56 @@ class StreamCounter:
             f"Estado carregado | IN: {self.in_count} | OUT: {self.out_count}"
         )
 
-    def count(self, results, frame_shape: Tuple[int, int, int]) -> Tuple[int, int]:
-        """Processa inferências do detector e atualiza os contadores."""
-        h = frame_shape[0]
+    def _set_zones(self, config: dict) -> None:
+        zone_data = config.get("counting_line", {})
+        self.line_y_ratio: float = zone_data.get("y_ratio", 0.6)
+        self.offset: float = zone_data.get("offset", 0.05)
+        self.max_inactive_seconds: float = float(zone_data.get("max_inactive_seconds", 10.0))
 
-        line_up = int(h * (self.line_y_ratio - self.offset))
-        line_down = int(h * (self.line_y_ratio + self.offset))
+    def apply_zones(self, config: dict) -> None:
+        """
+        Troca a geometria das zonas com o pipeline em execução (entre dois frames).
 
-        if not results.boxes or results.boxes.id is None:
-            self._cleanup_stale_tracks()
+        As posições dos tracks ativos são recalculadas na nova faixa a partir do
+        último topo observado: o salto de geometria não vira cruzamento, e um
+        cruzamento em andamento continua valendo na faixa nova.
+        """
+        self._set_zones(config)
+        if self._frame_h is None:
+            return
+        line_up, line_down = compute_line_bounds(self._frame_h, self.line_y_ratio, self.offset)
+        for obj_id, y_top in self.last_y_top.items():
+            if obj_id in self.track_positions:
+                self.track_positions[obj_id] = self._get_position(y_top, line_up, line_down)
+        log.info(f"Zonas recarregadas | Linha: {self.line_y_ratio} | Offset: {self.offset}")
+
+    def count(
+        self,
+        batch: TrackBatch,
+        frame_shape: Tuple[int, int, int],
+        now: Optional[float] = None,
+    ) -> Tuple[int, int]:
+        """
+        Processa o lote rastreado do frame e atualiza os contadores.
+
+        :param now: Instante do frame em segundos (ex.: tempo do vídeo em replays offline);
+            se omitido, usa o relógio do contador. Deve ser não decrescente.
+        """
+        self._frame_h = frame_shape[0]
+        line_up, line_down = compute_line_bounds(frame_shape[0], self.line_y_ratio, self.offset)
+        if now is None:
+            now = self._clock()
+
+        if not len(batch) or not batch.has_ids:
+            self._cleanup_stale_tracks(now)
             return self.in_count, self.out_count
 
-        boxes_obj = results.boxes
-        y_tops = boxes_obj.xyxy[:, 1].cpu().numpy()
-        ids = boxes_obj.id.int().cpu().numpy()
-        now = monotonic()
-
-        for y_top, obj_id in zip(y_tops, ids):
-            obj_id = int(obj_id)
+        last_seen_at = self.last_seen_at
+        for y_top, obj_id in zip(batch.boxes[:, 1].tolist(), batch.ids.tolist()):
             position = self._get_position(y_top, line_up, line_down)
-            self.last_seen_at[obj_id] = now
+            last_seen_at[obj_id] = now
+            last_seen_at.move_to_end(obj_id)
+            self.last_y_top[obj_id] = y_top
 
             if obj_id not in self.track_positions:
                 self.track_positions[obj_id] = position
@@ -83,7 +134,7 @@ class StreamCounter:
 
             self.track_positions[obj_id] = position
 
-        self._cleanup_stale_tracks()
+        self._cleanup_stale_tracks(now)
 
         return self.in_count, self.out_count
 
@@ -105,23 +156,21 @@ class StreamCounter:
         self.already_counted.add(obj_id)
         self.storage.save_count(direction.value, int(obj_id))
 
-        log.info(f"{direction.value} detectado | ID: {obj_id}")
-
-    def _cleanup_stale_tracks(self) -> None:
-        """Remove IDs que ficaram inativos por muito tempo para evitar crescimento de estado."""
-        now = monotonic()
-        if (now - self._last_cleanup_at) < self.cleanup_interval_seconds:
-            return
-
-        stale_ids = [
-            obj_id
-            for obj_id, last_seen in self.last_seen_at.items()
-            if (now - last_seen) > self.max_inactive_seconds
-        ]
-
-        for obj_id in stale_ids:
-            self.last_seen_at.pop(obj_id, None)
+        log.info("%s detectado | ID: %s", direction.value, obj_id)
+
+    def _cleanup_stale_tracks(self, now: float) -> None:
+        """
+        Remove IDs inativos há mais de `max_inactive_seconds` (libera o ID para nova contagem).
+
+        Custo proporcional aos IDs que expiram, não aos ativos: percorre
+        `last_seen_at` a partir do mais antigo e para no primeiro ainda ativo.
+        """
+        last_seen_at = self.last_seen_at
+        while last_seen_at:
+            obj_id, last_seen = next(iter(last_seen_at.items()))
+            if (now - last_seen) <= self.max_inactive_seconds:
+                break
+            last_seen_at.popitem(last=False)
             self.track_positions.pop(obj_id, None)
+            self.last_y_top.pop(obj_id, None)
             self.already_counted.discard(obj_id)
-
-        self._last_cleanup_at = now
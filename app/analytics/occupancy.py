@@ -0,0 +1,104 @@
+from datetime import date, time
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+MinuteLike = Union[int, time, str]
+
+
+def minute_of_day(value: MinuteLike) -> int:
+    """Converte 'HH:MM', datetime.time ou inteiro (0-1439) em índice de minuto do dia."""
+    if isinstance(value, str):
+        hours, _, minutes = value.partition(":")
+        value = int(hours) * 60 + int(minutes or 0)
+    elif isinstance(value, time):
+        value = value.hour * 60 + value.minute
+    if not 0 <= value < MINUTES_PER_DAY:
+        raise ValueError(f"Minuto fora do dia: {value}")
+    return value
+
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class OccupancyIndex:
+    """
+    Índice de ocupação intradiária com resolução de minuto.
+
+    A ocupação ao fim de cada minuto é a soma acumulada (prefix sum) do fluxo
+    líquido IN - OUT, limitada em zero como a ocupação de fechamento do dia.
+    Sobre essa curva são mantidas uma segunda soma prefixada (média em O(1)) e
+    sparse tables de mínimo/máximo (consultas de intervalo em O(1) após
+    construção O(n log n)).
+    """
+
+    def __init__(self, day: date, flows: Iterable[Tuple[int, int, int]]) -> None:
+        self.day = day
+        self.in_per_minute = np.zeros(MINUTES_PER_DAY, dtype=np.int64)
+        self.out_per_minute = np.zeros(MINUTES_PER_DAY, dtype=np.int64)
+        for minute, in_count, out_count in flows:
+            self.in_per_minute[minute] += in_count
+            self.out_per_minute[minute] += out_count
+
+        net = self.in_per_minute - self.out_per_minute
+        self.occupancy = np.maximum(np.cumsum(net), 0)
+        self._prefix = np.concatenate(([0], np.cumsum(self.occupancy)))
+        self._min_levels = self._build_sparse(np.minimum)
+        self._max_levels = self._build_sparse(np.maximum)
+
+    @classmethod
+    def from_rows(cls, day: date, rows: Iterable[Tuple[str, int, int]]) -> "OccupancyIndex":
+        """Constrói a partir de linhas (minute 'YYYY-MM-DD HH:MM', in, out) da tabela occupancy_minute."""
+        return cls(day, ((minute_of_day(minute[11:16]), in_count, out_count) for minute, in_count, out_count in rows))
+
+    def _build_sparse(self, op) -> List[np.ndarray]:
+        levels = [self.occupancy]
+        width = 1
+        while width * 2 <= MINUTES_PER_DAY:
+            prev = levels[-1]
+            levels.append(op(prev[:-width], prev[width:]))
+            width *= 2
+        return levels
+
+    def _query_sparse(self, levels: List[np.ndarray], start: int, end: int, op) -> int:
+        level = (end - start + 1).bit_length() - 1
+        return int(op(levels[level][start], levels[level][end - (1 << level) + 1]))
+
+    def _bounds(self, start: MinuteLike, end: MinuteLike) -> Tuple[int, int]:
+        start_idx, end_idx = minute_of_day(start), minute_of_day(end)
+        if end_idx < start_idx:
+            raise ValueError("Fim do intervalo anterior ao início")
+        return start_idx, end_idx
+
+    @property
+    def in_total(self) -> int:
+        return int(self.in_per_minute.sum())
+
+    @property
+    def out_total(self) -> int:
+        return int(self.out_per_minute.sum())
+
+    def at(self, minute: MinuteLike) -> int:
+        """Ocupação ao fim do minuto informado."""
+        return int(self.occupancy[minute_of_day(minute)])
+
+    def range_stats(self, start: MinuteLike, end: MinuteLike) -> Dict[str, float]:
+        """Mínimo, máximo e média da ocupação no intervalo fechado [start, end]."""
+        start_idx, end_idx = self._bounds(start, end)
+        total = self._prefix[end_idx + 1] - self._prefix[start_idx]
+        return {
+            "min": self._query_sparse(self._min_levels, start_idx, end_idx, min),
+            "max": self._query_sparse(self._max_levels, start_idx, end_idx, max),
+            "avg": round(float(total) / (end_idx - start_idx + 1), 2),
+        }
+
+    def curve(self, start: MinuteLike = 0, end: MinuteLike = MINUTES_PER_DAY - 1) -> Dict[str, list]:
+        """Curva de ocupação minuto a minuto em formato colunar (para gráficos)."""
+        start_idx, end_idx = self._bounds(start, end)
+        return {
+            "minute": [format_minute(m) for m in range(start_idx, end_idx + 1)],
+            "occupancy": self.occupancy[start_idx:end_idx + 1].tolist(),
+        }
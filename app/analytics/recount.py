@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.analytics.trajectory_store import TrajectoryArrays
+from app.core.enums import Direction
+
+TOP, MIDDLE, BOTTOM = 0, 1, 2
+
+
+@dataclass(frozen=True, eq=False)
+class PreparedTrajectories:
+    """
+    Trajetórias ordenadas por (track, tempo) e segmentadas por tempo de vida.
+
+    A preparação independe da geometria da linha e pode ser reutilizada
+    para avaliar várias configurações de zona sobre os mesmos dados.
+    """
+
+    frame_time: np.ndarray
+    track_id: np.ndarray
+    frame_h: np.ndarray
+    y_top: np.ndarray
+    segment: np.ndarray
+    segment_start: np.ndarray
+
+
+@dataclass(frozen=True, eq=False)
+class RecountResult:
+    in_count: int
+    out_count: int
+    event_time: np.ndarray
+    event_track_id: np.ndarray
+    event_direction: np.ndarray  # True = IN, False = OUT
+
+    def as_report(self) -> dict:
+        return {Direction.IN.value: self.in_count, Direction.OUT.value: self.out_count}
+
+
+def prepare_trajectories(traj: TrajectoryArrays, max_inactive_seconds: float) -> PreparedTrajectories:
+    """
+    Ordena por track e tempo e quebra cada track em segmentos de vida.
+
+    Um novo segmento começa quando o ID muda ou quando o mesmo ID fica
+    ausente por mais de `max_inactive_seconds` — equivalente à limpeza de
+    tracks inativos do StreamCounter, que libera o ID para nova contagem.
+    """
+    order = np.lexsort((np.asarray(traj.frame_time), np.asarray(traj.track_id)))
+    frame_time = np.asarray(traj.frame_time)[order]
+    track_id = np.asarray(traj.track_id)[order]
+
+    segment_start = np.ones(len(order), dtype=bool)
+    if len(order) > 1:
+        segment_start[1:] = (track_id[1:] != track_id[:-1]) | (
+            (frame_time[1:] - frame_time[:-1]) > max_inactive_seconds
+        )
+
+    return PreparedTrajectories(
+        frame_time=frame_time,
+        track_id=track_id,
+        frame_h=np.asarray(traj.frame_h)[order].astype(np.float64),
+        y_top=np.asarray(traj.y_top)[order].astype(np.float64),
+        segment=np.cumsum(segment_start) - 1,
+        segment_start=segment_start,
+    )
+
+
+def classify_positions(prepared: PreparedTrajectories, y_ratio: float, offset: float) -> np.ndarray:
+    """Zona (TOP/MIDDLE/BOTTOM) de cada linha, com o mesmo arredondamento do StreamCounter."""
+    line_up = (prepared.frame_h * (y_ratio - offset)).astype(np.int64)
+    line_down = (prepared.frame_h * (y_ratio + offset)).astype(np.int64)
+    return np.where(prepared.y_top < line_up, TOP, np.where(prepared.y_top > line_down, BOTTOM, MIDDLE))
+
+
+def count_crossings(prepared: PreparedTrajectories, y_ratio: float, offset: float) -> RecountResult:
+    """
+    Reaplica a máquina de estados de cruzamento do StreamCounter, vetorizada.
+
+    Dentro de um segmento, TOP/MIDDLE -> BOTTOM é IN e BOTTOM/MIDDLE -> TOP é
+    OUT; apenas o primeiro cruzamento de cada segmento conta (anti-duplicação).
+    """
+    position = classify_positions(prepared, y_ratio, offset)
+    prev = np.empty_like(position)
+    prev[1:] = position[:-1]
+    continuing = ~prepared.segment_start
+    if len(prev):
+        prev[0] = position[0]
+
+    is_in = continuing & (prev <= MIDDLE) & (position == BOTTOM)
+    is_out = continuing & (prev >= MIDDLE) & (position == TOP)
+
+    candidates = np.flatnonzero(is_in | is_out)
+    _, first = np.unique(prepared.segment[candidates], return_index=True)
+    events = candidates[first]
+    directions = is_in[events]
+
+    return RecountResult(
+        in_count=int(directions.sum()),
+        out_count=int(len(events) - directions.sum()),
+        event_time=prepared.frame_time[events],
+        event_track_id=prepared.track_id[events],
+        event_direction=directions,
+    )
+
+
+def recount(
+    traj: TrajectoryArrays,
+    y_ratio: float,
+    offset: float,
+    max_inactive_seconds: float = 10.0,
+) -> RecountResult:
+    """Recontagem completa de uma gravação para uma configuração de zona."""
+    return count_crossings(prepare_trajectories(traj, max_inactive_seconds), y_ratio, offset)
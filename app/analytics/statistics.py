@@ -1,36 +1,51 @@
-import sqlite3
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from app.config.settings import DB_PATH
+from app.services.database import DatabaseBackend, SqliteBackend, create_backend
+from app.services.day_summary import DaySummary, compute_day_summary, load_day_summary, save_day_summary
 from app.utils.logger import log
 from app.core.enums import Direction
 
+if TYPE_CHECKING:
+    from app.analytics.occupancy import OccupancyIndex
+
+
+# Tamanhos de bucket aceitos (as expressões SQL ficam em cada backend).
+BUCKET_EXPRESSIONS = SqliteBackend.bucket_expressions
+
+# Índices de ocupação já construídos, por (banco, dia, versão dos dados). Fica no módulo porque a
+# API cria um StatsAnalyzer por requisição; qualquer escrita muda a versão e força a reconstrução.
+OCCUPANCY_CACHE_SIZE = 8
+_OCCUPANCY_CACHE: "OrderedDict[tuple, OccupancyIndex]" = OrderedDict()
+_OCCUPANCY_CACHE_LOCK = Lock()
+
 
 class StatsAnalyzer:
     """
     Responsável por consultas analíticas do banco de dados.
-    Camada isolada para leitura — não grava nada.
+    Camada de leitura — grava apenas o cache de resumos de dias fechados (day_summary).
     """
 
-    def __init__(self, db_path: str = DB_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None, backend: Optional[DatabaseBackend] = None):
+        self.backend = backend or create_backend(db_path)
+        self.db_path = self.backend.describe()
 
     def _get_connection(self):
-        """Cria conexão segura com SQLite."""
-        try:
-            return sqlite3.connect(self.db_path)
-        except sqlite3.Error as e:
-            log.critical(f"Falha ao conectar no banco: {e}")
-            raise
+        """Abre uma sessão curta no backend configurado (commit/rollback e fechamento automáticos)."""
+        return self.backend.session()
 
-    def get_daily_report(self) -> Dict[str, int]:
+    def get_daily_report(self, day: Optional[date] = None) -> Dict[str, int]:
         """
-        Retorna total de entradas e saídas do dia atual.
+        Retorna total de entradas e saídas do dia atual (ou de um dia fechado, via day_summary).
 
         Returns:
             dict -> {"IN": int, "OUT": int}
         """
+        if day is not None and day < datetime.now().date():
+            summary = self.get_day_summary(day)
+            return {Direction.IN.value: summary.in_total, Direction.OUT.value: summary.out_total}
 
         start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         end_dt = start_dt + timedelta(days=1)
@@ -49,8 +64,7 @@ class StatsAnalyzer:
 
         try:
             with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+                cursor = conn.execute(
                     query,
                     (
                         start_dt.strftime('%Y-%m-%d %H:%M:%S'),
@@ -66,56 +80,195 @@ class StatsAnalyzer:
                     else:
                         log.warning(f"Direção desconhecida encontrada no DB: {direction}")
 
-        except sqlite3.Error as e:
+        except self.backend.errors as e:
             log.error(f"Erro ao gerar relatório diário: {e}")
 
         return report
 
-    def get_hourly_peak(self) -> Optional[Dict[str, int]]:
+    def get_hourly_peak(self, day: Optional[date] = None) -> Optional[Dict[str, int]]:
         """
-        Retorna a hora com maior volume de eventos no dia atual.
+        Retorna a hora com maior volume de eventos no dia atual (ou de um dia fechado, via day_summary).
+
+        Calculada a partir do histograma horário do resumo do dia.
 
         Returns:
             {"hour": "HH", "count": int}
             ou None se não houver dados
         """
+        summary = self.get_day_summary(day)
+        if summary.peak_hour is None:
+            return None
 
-        start_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        end_dt = start_dt + timedelta(days=1)
+        log.info(f"Pico de movimento: {summary.peak_hour:02d}h ({summary.peak_count} eventos)")
+        return {"hour": f"{summary.peak_hour:02d}", "count": summary.peak_count}
 
-        query = """
-            SELECT strftime('%H', timestamp) as hour, COUNT(*) as total
-            FROM counts
-            WHERE timestamp >= ? AND timestamp < ?
-            GROUP BY hour
-            ORDER BY total DESC
-            LIMIT 1
+    def get_day_summary(self, day: Optional[date] = None) -> DaySummary:
         """
+        Resumo do dia (totais, histogramas horários, pico e ocupação de fechamento).
 
+        Dias fechados são lidos de day_summary; na primeira consulta o resumo é
+        calculado e gravado, e a partir daí nenhuma leitura toca os eventos brutos.
+        O dia atual é sempre calculado (a partir de occupancy_minute) e não é gravado.
+        """
+        day = day or datetime.now().date()
+        closed = day < datetime.now().date()
         try:
             with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    query,
-                    (
-                        start_dt.strftime('%Y-%m-%d %H:%M:%S'),
-                        end_dt.strftime('%Y-%m-%d %H:%M:%S'),
-                    ),
-                )
-                result = cursor.fetchone()
+                if closed:
+                    cached = load_day_summary(conn, day, self.backend)
+                    if cached is not None:
+                        return cached
+                summary = compute_day_summary(conn, day, self.backend)
+                if closed:
+                    save_day_summary(conn, summary)
+                return summary
+        except self.backend.errors as e:
+            log.error(f"Erro ao obter resumo diário de {day}: {e}")
+            return DaySummary.from_hourly_rows(day, [])
 
-                if not result:
-                    return None
+    def get_occupancy_index(self, day: Optional[date] = None) -> "OccupancyIndex":
+        """
+        Retorna o índice de ocupação minuto a minuto do dia (padrão: hoje).
 
-                hour, count = result
+        Lê no máximo 1440 linhas da tabela occupancy_minute (mantida no flush
+        do StorageService). Em bancos sem essa tabela, agrega direto de counts.
+        Enquanto a versão dos dados não muda, devolve o índice já construído
+        (compartilhado: tratar como somente leitura).
+        """
+        day = day or datetime.now().date()
+        # Versão lida antes das linhas: uma escrita concorrente invalida a entrada na próxima consulta.
+        try:
+            key = (self.db_path, day, self.get_data_version())
+        except self.backend.errors as e:
+            log.error(f"Erro ao obter versão dos dados: {e}")
+            key = None
+        with _OCCUPANCY_CACHE_LOCK:
+            cached = _OCCUPANCY_CACHE.get(key)
+            if cached is not None:
+                _OCCUPANCY_CACHE.move_to_end(key)
+                return cached
 
-                log.info(f"Pico de movimento: {hour}h ({count} eventos)")
+        rows = self._occupancy_rows(day)
 
-                return {
-                    "hour": hour,
-                    "count": count
-                }
+        # NumPy só é carregado quando a curva de ocupação é pedida.
+        from app.analytics.occupancy import OccupancyIndex
 
-        except sqlite3.Error as e:
-            log.error(f"Erro ao consultar pico horário: {e}")
+        index = OccupancyIndex.from_rows(day, rows or [])
+        if key is not None and rows is not None:
+            with _OCCUPANCY_CACHE_LOCK:
+                _OCCUPANCY_CACHE[key] = index
+                while len(_OCCUPANCY_CACHE) > OCCUPANCY_CACHE_SIZE:
+                    _OCCUPANCY_CACHE.popitem(last=False)
+        return index
+
+    def _occupancy_rows(self, day: date) -> Optional[List[tuple]]:
+        """Linhas (minute, in, out) do dia; None em erro de banco (o índice vazio não entra no cache)."""
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        params = (start.strftime('%Y-%m-%d %H:%M'), end.strftime('%Y-%m-%d %H:%M'))
+
+        try:
+            with self._get_connection() as conn:
+                try:
+                    with self.backend.savepoint(conn):
+                        return conn.execute(
+                            """
+                            SELECT minute, in_count, out_count
+                            FROM occupancy_minute
+                            WHERE minute >= ? AND minute < ?
+                            """,
+                            params,
+                        ).fetchall()
+                except self.backend.operational_errors:
+                    return conn.execute(
+                        f"""
+                        SELECT {self.backend.timestamp_minute("timestamp")} AS minute,
+                               SUM(CASE WHEN direction = 'IN' THEN 1 ELSE 0 END),
+                               SUM(CASE WHEN direction = 'OUT' THEN 1 ELSE 0 END)
+                        FROM counts
+                        WHERE timestamp >= ? AND timestamp < ?
+                        GROUP BY minute
+                        """,
+                        params,
+                    ).fetchall()
+        except self.backend.errors as e:
+            log.error(f"Erro ao consultar ocupação por minuto: {e}")
             return None
+
+    def get_data_version(self) -> str:
+        """
+        Marca d'água da versão dos dados, sem agregações: no SQLite vem de os.stat
+        do banco e do WAL; no PostgreSQL, da sequência de ids de counts.
+        """
+        return self.backend.data_version()
+
+    def _aggregate_between(self, start_day: date, end_day: date, group_expr: Optional[str]) -> List[tuple]:
+        """
+        Agrega entradas/saídas no intervalo de dias [start_day, end_day].
+
+        Usa occupancy_minute (no máximo 1440 linhas/dia); em bancos sem essa
+        tabela, agrega direto de counts.
+        """
+        start = datetime.combine(start_day, datetime.min.time())
+        end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+        params = (start.strftime('%Y-%m-%d %H:%M'), end.strftime('%Y-%m-%d %H:%M'))
+        select_group = f"{group_expr} AS bucket, " if group_expr else ""
+        group_by = "GROUP BY bucket ORDER BY bucket" if group_expr else ""
+
+        sources = (
+            "SELECT minute AS ts, in_count, out_count FROM occupancy_minute WHERE minute >= ? AND minute < ?",
+            f"""
+            SELECT {self.backend.timestamp_text("timestamp")} AS ts,
+                   CASE WHEN direction = 'IN' THEN 1 ELSE 0 END AS in_count,
+                   CASE WHEN direction = 'OUT' THEN 1 ELSE 0 END AS out_count
+            FROM counts WHERE timestamp >= ? AND timestamp < ?
+            """,
+        )
+        try:
+            with self._get_connection() as conn:
+                for source in sources:
+                    query = f"""
+                        SELECT {select_group}COALESCE(SUM(in_count), 0), COALESCE(SUM(out_count), 0)
+                        FROM ({source}) AS src
+                        {group_by}
+                    """
+                    try:
+                        with self.backend.savepoint(conn):
+                            return conn.execute(query, params).fetchall()
+                    except self.backend.operational_errors:
+                        continue
+        except self.backend.errors as e:
+            log.error(f"Erro ao agregar intervalo {start_day} - {end_day}: {e}")
+        return []
+
+    def get_range_report(self, start_day: date, end_day: date, direction: Optional[str] = None) -> Dict[str, int]:
+        """Totais de entradas e saídas entre dois dias (inclusive), opcionalmente de uma direção."""
+        rows = self._aggregate_between(start_day, end_day, None)
+        in_total, out_total = rows[0] if rows else (0, 0)
+        report = {Direction.IN.value: int(in_total), Direction.OUT.value: int(out_total)}
+        if direction:
+            return {direction: report[direction]}
+        return report
+
+    def get_buckets(
+        self,
+        start_day: date,
+        end_day: date,
+        bucket: str = "hour",
+        direction: Optional[str] = None,
+    ) -> Dict[str, list]:
+        """
+        Série agregada por bucket (minute, hour, day, week) em formato colunar:
+        {"bucket": [...], "IN": [...], "OUT": [...]}. Buckets sem eventos são omitidos.
+        """
+        if bucket not in self.backend.bucket_expressions:
+            raise ValueError(f"Bucket inválido: {bucket}")
+        rows = self._aggregate_between(start_day, end_day, self.backend.bucket_expressions[bucket])
+        columns = {
+            "bucket": [row[0] for row in rows],
+            Direction.IN.value: [int(row[1]) for row in rows],
+            Direction.OUT.value: [int(row[2]) for row in rows],
+        }
+        if direction:
+            return {"bucket": columns["bucket"], direction: columns[direction]}
+        return columns
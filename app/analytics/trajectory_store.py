@@ -0,0 +1,179 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.tracking.track_batch import TrackBatch
+from app.utils.logger import log
+
+# Colunas gravadas por detecção rastreada: nome -> (dtype, largura)
+COLUMNS: Dict[str, Tuple[str, int]] = {
+    "frame_time": ("<f8", 1),
+    "track_id": ("<i8", 1),
+    "frame_h": ("<u2", 1),
+    "box": ("<f4", 4),
+}
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True, eq=False)
+class TrajectoryArrays:
+    """Trajetórias gravadas em formato colunar (uma linha por detecção rastreada)."""
+
+    frame_time: np.ndarray
+    track_id: np.ndarray
+    frame_h: np.ndarray
+    box: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.track_id)
+
+    @property
+    def y_top(self) -> np.ndarray:
+        return self.box[:, 1]
+
+    @classmethod
+    def concatenate(cls, parts: list["TrajectoryArrays"]) -> "TrajectoryArrays":
+        if not parts:
+            return cls(
+                frame_time=np.empty(0, dtype="<f8"),
+                track_id=np.empty(0, dtype="<i8"),
+                frame_h=np.empty(0, dtype="<u2"),
+                box=np.empty((0, 4), dtype="<f4"),
+            )
+        return cls(
+            frame_time=np.concatenate([p.frame_time for p in parts]),
+            track_id=np.concatenate([p.track_id for p in parts]),
+            frame_h=np.concatenate([p.frame_h for p in parts]),
+            box=np.concatenate([p.box for p in parts]),
+        )
+
+
+class TrajectoryBuffer:
+    """Acumula trajetórias em memória (mesmas colunas do TrajectoryRecorder) para análises de uma única passada."""
+
+    def __init__(self) -> None:
+        self._parts: list[TrajectoryArrays] = []
+
+    def record(self, batch: TrackBatch, frame_shape: Tuple[int, ...], frame_time: float) -> None:
+        if not len(batch) or not batch.has_ids:
+            return
+        n = len(batch)
+        self._parts.append(
+            TrajectoryArrays(
+                frame_time=np.full(n, frame_time, dtype="<f8"),
+                track_id=batch.ids.astype("<i8"),
+                frame_h=np.full(n, frame_shape[0], dtype="<u2"),
+                box=batch.boxes.astype("<f4"),
+            )
+        )
+
+    def to_arrays(self) -> TrajectoryArrays:
+        merged = TrajectoryArrays.concatenate(self._parts)
+        self._parts = [merged]
+        return merged
+
+
+def _day_dir(base_dir: Path, frame_time: float) -> Path:
+    return base_dir / datetime.fromtimestamp(frame_time).strftime("%Y-%m-%d")
+
+
+class TrajectoryRecorder:
+    """
+    Grava a saída do rastreador por frame em arquivos colunares binários.
+
+    Cada dia fica em `<base_dir>/<YYYY-MM-DD>/` com um arquivo por coluna
+    (`frame_time.bin`, `track_id.bin`, ...) e um `meta.json` com o schema,
+    permitindo leitura via `np.memmap` sem desserialização.
+    """
+
+    def __init__(self, base_dir: str | Path, flush_interval_seconds: float = 1.0) -> None:
+        self.base_dir = Path(base_dir)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.rows_written = 0
+        self._day_dir: Optional[Path] = None
+        self._files: Dict[str, object] = {}
+        self._last_flush = monotonic()
+
+    def record(self, batch: TrackBatch, frame_shape: Tuple[int, ...], frame_time: float) -> None:
+        """Acrescenta as detecções rastreadas de um frame. Falhas de I/O não interrompem a contagem."""
+        if not len(batch) or not batch.has_ids:
+            return
+        try:
+            self._ensure_day(frame_time)
+            n = len(batch)
+            self._write("frame_time", np.full(n, frame_time, dtype="<f8"))
+            self._write("track_id", batch.ids)
+            self._write("frame_h", np.full(n, frame_shape[0], dtype="<u2"))
+            self._write("box", batch.boxes)
+            self.rows_written += n
+            if (monotonic() - self._last_flush) >= self.flush_interval_seconds:
+                self.flush()
+        except OSError as e:
+            log.error(f"Falha ao gravar trajetórias: {e}")
+
+    def flush(self) -> None:
+        for handle in self._files.values():
+            handle.flush()
+        self._last_flush = monotonic()
+
+    def close(self) -> None:
+        for handle in self._files.values():
+            handle.close()
+        self._files = {}
+        self._day_dir = None
+
+    def _write(self, column: str, values: np.ndarray) -> None:
+        dtype, _ = COLUMNS[column]
+        self._files[column].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+    def _ensure_day(self, frame_time: float) -> None:
+        day_dir = _day_dir(self.base_dir, frame_time)
+        if day_dir == self._day_dir:
+            return
+
+        self.close()
+        day_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "schema_version": SCHEMA_VERSION,
+            "columns": {name: {"dtype": dtype, "width": width} for name, (dtype, width) in COLUMNS.items()},
+        }
+        (day_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        self._files = {name: open(day_dir / f"{name}.bin", "ab") for name in COLUMNS}
+        self._day_dir = day_dir
+        log.info(f"Gravando trajetórias em: {day_dir}")
+
+
+def load_trajectories(day_dir: str | Path) -> TrajectoryArrays:
+    """
+    Abre um diretório diário gravado pelo TrajectoryRecorder via memory-map.
+
+    Se a gravação estiver em andamento, as colunas são truncadas para o menor
+    número de linhas completas.
+    """
+    day_dir = Path(day_dir)
+    meta = json.loads((day_dir / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Versão de schema não suportada: {meta.get('schema_version')}")
+
+    columns = {}
+    rows = None
+    for name, spec in meta["columns"].items():
+        path = day_dir / f"{name}.bin"
+        itemsize = np.dtype(spec["dtype"]).itemsize * spec["width"]
+        n = path.stat().st_size // itemsize if path.exists() else 0
+        rows = n if rows is None else min(rows, n)
+        columns[name] = (path, spec)
+
+    arrays = {}
+    for name, (path, spec) in columns.items():
+        shape = (rows,) if spec["width"] == 1 else (rows, spec["width"])
+        if rows == 0:
+            arrays[name] = np.empty(shape, dtype=spec["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r", shape=shape)
+    return TrajectoryArrays(**arrays)
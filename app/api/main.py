@@ -1,5 +1,25 @@
-from fastapi import FastAPI, Depends
-from app.analytics.statistics import StatsAnalyzer
+import hashlib
+import hmac
+from datetime import date as date_type, datetime, timedelta
+from typing import Callable, Optional
+
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from app.analytics.statistics import BUCKET_EXPRESSIONS, StatsAnalyzer
+from app.config.settings import (
+    LIVE_STATE_MAX_AGE_SECONDS,
+    LIVE_STATE_PATH,
+    RANGE_CACHE_MAX_AGE,
+    RANGE_SETTLE_SECONDS,
+    SYNC_CENTRAL_DB_PATH,
+    SYNC_MAX_BATCH_BYTES,
+    SYNC_TOKEN,
+)
+from app.services.counts_repository import CountsRepository
+from app.services.export import EXPORT_FORMATS, MEDIA_TYPES, iter_export, parquet_available
+from app.services.live_state import LiveState, LiveStateReader
+from app.services.report_jobs import ReportJobQueue
+from app.services.sync import BatchTooLarge, CentralAggregator
 import uvicorn
 
 app = FastAPI(title="PeopleFlowMonitor API", version="1.0.0")
@@ -10,21 +30,310 @@ def get_stats_analyzer() -> StatsAnalyzer:
     return StatsAnalyzer()
 
 
+def get_counts_repository() -> CountsRepository:
+    """Dependency injection for raw event access (exports)."""
+    return CountsRepository()
+
+
+_CENTRAL_AGGREGATOR: Optional[CentralAggregator] = None
+
+
+def get_central_aggregator() -> CentralAggregator:
+    """Dependency injection for the central multi-site aggregator (schema set up once per API process)."""
+    global _CENTRAL_AGGREGATOR
+    if _CENTRAL_AGGREGATOR is None:
+        _CENTRAL_AGGREGATOR = CentralAggregator(SYNC_CENTRAL_DB_PATH)
+    return _CENTRAL_AGGREGATOR
+
+
+def get_sync_token() -> str:
+    """Dependency injection for the shared secret expected from syncing sites."""
+    return SYNC_TOKEN
+
+
+def require_sync_token(
+    authorization: Optional[str] = Header(None),
+    token: str = Depends(get_sync_token),
+) -> None:
+    """Rejects sync writes without the shared `Bearer` token; the endpoint is off until one is configured."""
+    if not token:
+        raise HTTPException(status_code=503, detail="Sync ingest disabled: set PFM_SYNC_TOKEN")
+    scheme, _, supplied = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid sync token", headers={"WWW-Authenticate": "Bearer"})
+
+
+_REPORT_QUEUE: Optional[ReportJobQueue] = None
+
+
+def get_report_queue() -> ReportJobQueue:
+    """Dependency injection for the background PDF report queue (one worker pool per API process)."""
+    global _REPORT_QUEUE
+    if _REPORT_QUEUE is None:
+        _REPORT_QUEUE = ReportJobQueue()
+    return _REPORT_QUEUE
+
+
+_LIVE_STATE_READER = LiveStateReader(LIVE_STATE_PATH)
+
+
+def get_live_state() -> Optional[LiveState]:
+    """Dependency injection for the pipeline's live counters (None when stale or not running)."""
+    return _LIVE_STATE_READER.read_fresh(LIVE_STATE_MAX_AGE_SECONDS)
+
+
 @app.get("/", tags=["System"])
 async def home():
     return {"status": "online", "service": "PeopleFlowMonitor API"}
 
 
 @app.get("/stats", tags=["Analytics"])
-async def get_stats(stats: StatsAnalyzer = Depends(get_stats_analyzer)):
-    """Returns today's people flow metrics."""
-    report = stats.get_daily_report()
+async def get_stats(
+    stats: StatsAnalyzer = Depends(get_stats_analyzer),
+    live: Optional[LiveState] = Depends(get_live_state),
+):
+    """Returns today's people flow metrics (live pipeline counters when available)."""
+    report = {"IN": live.in_count, "OUT": live.out_count} if live else stats.get_daily_report()
     return {
         "today": report,
         "unit": "people"
     }
 
 
+@app.get("/live", tags=["Analytics"])
+async def get_live(
+    stats: StatsAnalyzer = Depends(get_stats_analyzer),
+    live: Optional[LiveState] = Depends(get_live_state),
+):
+    """
+    Live counters, occupancy and active tracks published by the running pipeline.
+
+    Read from a memory-mapped state file without querying the database; when no
+    pipeline heartbeat is fresh, falls back to today's database totals.
+    """
+    if live is None:
+        report = stats.get_daily_report()
+        return {
+            "source": "database",
+            "today": report,
+            "occupancy": max(0, report["IN"] - report["OUT"]),
+            "active_tracks": None,
+            "heartbeat_age_seconds": None,
+        }
+    return {
+        "source": "live",
+        "today": {"IN": live.in_count, "OUT": live.out_count},
+        "occupancy": live.occupancy,
+        "active_tracks": live.active_tracks,
+        "heartbeat_age_seconds": round(live.age(), 3),
+    }
+
+
+SETTLED_CACHE_CONTROL = f"public, max-age={RANGE_CACHE_MAX_AGE}"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def _parse_range(start: str, end: str) -> tuple[date_type, date_type]:
+    try:
+        start_day, end_day = date_type.fromisoformat(start), date_type.fromisoformat(end)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if end_day < start_day:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+    return start_day, end_day
+
+
+def _range_cache_control(end_day: date_type, now: Optional[datetime] = None) -> str:
+    """
+    Cache-Control for a range ending on `end_day`.
+
+    A range is settled once its last day ended more than PFM_RANGE_SETTLE_SECONDS
+    ago, leaving time for buffered events to be flushed. Settled ranges get a
+    bounded max-age rather than `immutable`: late writes or a database reset can
+    still change them, and the ETag lets clients revalidate cheaply.
+    """
+    settled_at = datetime.combine(end_day + timedelta(days=1), datetime.min.time()) + timedelta(seconds=RANGE_SETTLE_SECONDS)
+    return SETTLED_CACHE_CONTROL if (now or datetime.now()) >= settled_at else REVALIDATE_CACHE_CONTROL
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110): `W/` prefixes added by proxies or compression are ignored."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _conditional_response(
+    request: Request,
+    stats: StatsAnalyzer,
+    end_day: date_type,
+    build_payload: Callable[[], dict],
+) -> Response:
+    """
+    Answers with 304 when If-None-Match matches the current data version.
+
+    The ETag combines the request URL with the backend data watermark, so a
+    matching poll is answered without aggregating.
+    """
+    version = stats.get_data_version()
+    digest = hashlib.sha1(f"{version}|{request.url.path}?{request.url.query}".encode()).hexdigest()[:20]
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": _range_cache_control(end_day)}
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build_payload(), headers=headers)
+
+
+@app.get("/stats/range", tags=["Analytics"])
+async def get_stats_range(
+    request: Request,
+    start: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    end: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    direction: Optional[str] = Query(None, pattern="^(IN|OUT)$"),
+    stats: StatsAnalyzer = Depends(get_stats_analyzer),
+):
+    """IN/OUT totals for an arbitrary date range."""
+    start_day, end_day = _parse_range(start, end)
+    return _conditional_response(
+        request,
+        stats,
+        end_day,
+        lambda: {
+            "start": start_day.isoformat(),
+            "end": end_day.isoformat(),
+            "totals": stats.get_range_report(start_day, end_day, direction),
+            "unit": "people",
+        },
+    )
+
+
+@app.get("/stats/buckets", tags=["Analytics"])
+async def get_stats_buckets(
+    request: Request,
+    start: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    end: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    bucket: str = Query("hour", pattern=f"^({'|'.join(BUCKET_EXPRESSIONS)})$"),
+    direction: Optional[str] = Query(None, pattern="^(IN|OUT)$"),
+    stats: StatsAnalyzer = Depends(get_stats_analyzer),
+):
+    """Bucketed IN/OUT series as columnar JSON (`bucket`, `IN`, `OUT` arrays)."""
+    start_day, end_day = _parse_range(start, end)
+    return _conditional_response(
+        request,
+        stats,
+        end_day,
+        lambda: {
+            "start": start_day.isoformat(),
+            "end": end_day.isoformat(),
+            "bucket_size": bucket,
+            **stats.get_buckets(start_day, end_day, bucket, direction),
+        },
+    )
+
+
+@app.get("/export", tags=["Export"])
+def export_counts(
+    start: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    end: str = Query(..., description="YYYY-MM-DD (inclusive)"),
+    fmt: str = Query("csv", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    direction: Optional[str] = Query(None, pattern="^(IN|OUT)$"),
+    repo: CountsRepository = Depends(get_counts_repository),
+):
+    """Streams raw counting events for a date range as CSV or Parquet (constant memory)."""
+    start_day, end_day = _parse_range(start, end)
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    start_dt = datetime.combine(start_day, datetime.min.time())
+    end_dt = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+    filename = f"counts_{start_day.isoformat()}_{end_day.isoformat()}.{fmt}"
+    return StreamingResponse(
+        iter_export(repo, start_dt, end_dt, fmt, direction),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post("/sync/ingest", tags=["Sync"], dependencies=[Depends(require_sync_token)])
+async def sync_ingest(request: Request, aggregator: CentralAggregator = Depends(get_central_aggregator)):
+    """Merges a gzip batch of new site events; idempotent under retries."""
+    if int(request.headers.get("content-length") or 0) > SYNC_MAX_BATCH_BYTES:
+        raise HTTPException(status_code=413, detail="Sync batch too large")
+    data = await request.body()
+    try:
+        return aggregator.ingest(data)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sync batch: {e}")
+
+
+@app.get("/occupancy", tags=["Analytics"])
+async def get_occupancy(
+    day: Optional[str] = Query(None, alias="date", description="YYYY-MM-DD (default: today)"),
+    at: Optional[str] = Query(None, description="HH:MM point-in-time query"),
+    start: Optional[str] = Query(None, description="HH:MM range start (inclusive)"),
+    end: Optional[str] = Query(None, description="HH:MM range end (inclusive)"),
+    stats: StatsAnalyzer = Depends(get_stats_analyzer),
+):
+    """
+    Intraday occupancy from the per-minute prefix-sum index.
+
+    - `at`: occupancy at the end of that minute.
+    - `start`/`end`: min/max/avg occupancy over the range.
+    - neither: the full minute-by-minute curve (columnar).
+    """
+    try:
+        selected_day = date_type.fromisoformat(day) if day else None
+        index = stats.get_occupancy_index(selected_day)
+        if at is not None:
+            return {"date": index.day.isoformat(), "at": at, "occupancy": index.at(at)}
+        if start is not None or end is not None:
+            start, end = start or "00:00", end or "23:59"
+            return {"date": index.day.isoformat(), "start": start, "end": end, **index.range_stats(start, end)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"date": index.day.isoformat(), **index.curve()}
+
+
+@app.post("/reports", tags=["Reports"], status_code=202)
+def submit_reports(
+    start: str = Query(..., description="YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="YYYY-MM-DD (inclusive, default: start)"),
+    limit: Optional[int] = Query(None, ge=1, description="Capacity limit shown in the report"),
+    queue: ReportJobQueue = Depends(get_report_queue),
+):
+    """Queues one PDF per day in the range; returns the batch id to poll."""
+    start_day, end_day = _parse_range(start, end or start)
+    try:
+        batch_id = queue.submit(start_day, end_day, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"batch_id": batch_id, "jobs": (end_day - start_day).days + 1}
+
+
+@app.get("/reports/{batch_id}", tags=["Reports"])
+def get_report_batch(batch_id: str, queue: ReportJobQueue = Depends(get_report_queue)):
+    """Per-status counts and per-day state of a report batch."""
+    status = queue.batch_status(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown report batch")
+    return status
+
+
+@app.get("/reports/{batch_id}/{day}", tags=["Reports"])
+def download_report(batch_id: str, day: str, queue: ReportJobQueue = Depends(get_report_queue)):
+    """Downloads a finished report PDF."""
+    status = queue.batch_status(batch_id)
+    job = next((job for job in (status or {}).get("jobs", []) if job["day"] == day), None)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown report")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job['status']}")
+    return FileResponse(job["output_path"], media_type="application/pdf")
+
+
 @app.get("/health", tags=["System"])
 async def health_check():
     """Lightweight endpoint for infrastructure probes."""
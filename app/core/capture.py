@@ -0,0 +1,117 @@
+from time import perf_counter
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+from app.utils.logger import log
+
+
+class FrameSource:
+    """
+    Camada de captura com anel de buffers pré-alocados.
+
+    - `read()` decodifica no próximo buffer do anel (`cap.read(buffer)`),
+      reutilizando os mesmos arrays em vez de alocar um frame novo por leitura.
+    - `skip()` usa apenas `cap.grab()`, sem `retrieve()`, para frames que não
+      serão analisados nem exibidos (modo headless/offline).
+
+    O tamanho do anel limita quantos frames lidos podem ficar vivos ao mesmo
+    tempo: um frame é sobrescrito após `ring_size` leituras.
+
+    Em câmeras e streams, `has_backlog()` mede a última leitura: se ela voltou
+    em menos de `backlog_ratio` do intervalo entre frames, o frame já estava no
+    buffer do decodificador (rajada de RTSP, inferência atrasada) em vez de ter
+    sido esperado da fonte.
+    """
+
+    def __init__(
+        self,
+        source: str | int,
+        ring_size: int = 3,
+        width: int = 640,
+        height: int = 480,
+        fps: int = 30,
+        capture_factory: Callable = cv2.VideoCapture,
+        backlog_ratio: float = 0.5,
+        clock: Callable[[], float] = perf_counter,
+    ) -> None:
+        if ring_size < 1:
+            raise ValueError("ring_size deve ser >= 1")
+        self.source = source
+        self.ring_size = ring_size
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self._capture_factory = capture_factory
+        self._clock = clock
+        self.backlog_ratio = backlog_ratio
+        self._live = not isinstance(source, str) or "://" in source
+        self._backlog_seconds = backlog_ratio / fps
+        self._last_read_seconds: Optional[float] = None
+        self._cap = None
+        self._ring: List[np.ndarray] = []
+        self._ring_idx = 0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.ring_allocations = 0
+
+    def open(self) -> bool:
+        self._cap = self._capture_factory(self.source)
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if not self._cap.isOpened():
+            return False
+        # Cadência real informada pela fonte (a pedida em CAP_PROP_FPS nem sempre é aceita).
+        source_fps = self._cap.get(cv2.CAP_PROP_FPS) or self.fps
+        self._backlog_seconds = self.backlog_ratio / source_fps
+        return True
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def read(self) -> Optional[np.ndarray]:
+        """Decodifica o próximo frame em um buffer do anel. Retorna None no fim do fluxo."""
+        buffer = self._ring[self._ring_idx] if self._ring else None
+        started = self._clock()
+        ret, frame = self._cap.read(buffer) if buffer is not None else self._cap.read()
+        self._last_read_seconds = self._clock() - started
+        if not ret or frame is None:
+            return None
+
+        if frame is not buffer:
+            # Primeira leitura ou mudança de resolução: realoca o anel uma única vez.
+            self._allocate_ring(frame)
+        self._ring_idx = (self._ring_idx + 1) % self.ring_size
+        self.frames_decoded += 1
+        return frame
+
+    def has_backlog(self) -> bool:
+        """
+        Arquivos de vídeo estão sempre "atrasados" (há frames prontos para ler).
+        Câmeras e streams têm backlog quando a última leitura não precisou
+        esperar a fonte (ver docstring da classe).
+        """
+        if not self._live:
+            return True
+        return self._last_read_seconds is not None and self._last_read_seconds < self._backlog_seconds
+
+    def skip(self) -> bool:
+        """Avança um frame sem decodificar para BGR (apenas `grab`)."""
+        ok = bool(self._cap.grab())
+        if ok:
+            self.frames_skipped += 1
+        return ok
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+        self._ring = []
+
+    def _allocate_ring(self, frame: np.ndarray) -> None:
+        if self._ring:
+            log.info(f"Resolução de captura alterada para {frame.shape[1]}x{frame.shape[0]}; realocando buffers.")
+        self._ring = [np.empty_like(frame) for _ in range(self.ring_size)]
+        self._ring[self._ring_idx] = frame
+        self.ring_allocations += 1
@@ -0,0 +1,162 @@
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.tracking.track_batch import TrackBatch
+
+BOX_COLOR = (0, 255, 255)
+LINE_UP_COLOR = (255, 0, 0)
+LINE_DOWN_COLOR = (0, 0, 255)
+
+# Altura (px de exibição) que contém título e contadores; o painel é desenhado só nessa faixa.
+PANEL_HEIGHT = 96
+
+# Recorte pré-renderizado: (y0, x0, pixels, máscara) na imagem de exibição.
+Roi = Tuple[int, int, np.ndarray, np.ndarray]
+
+
+class OverlayRenderer:
+    """
+    Renderiza o overlay de monitoramento já na resolução de exibição.
+
+    - Redimensiona o frame primeiro e desenha as boxes com coordenadas escaladas.
+    - Linhas de contagem ficam em uma camada estática pré-renderizada, reconstruída
+      só quando o tamanho de exibição ou as zonas mudam.
+    - Título e contadores formam um painel pré-renderizado, reconstruído só quando
+      IN/OUT mudam (cruzamentos são raros frente aos frames).
+    - As duas camadas são compostas por máscara apenas nas regiões (faixa de linhas
+      x extensão de colunas) onde há conteúdo; nenhum texto é desenhado por frame.
+    """
+
+    def __init__(self, display_width: int = 640) -> None:
+        self.display_width = display_width
+        self.layer_builds = 0
+        self.panel_builds = 0
+        self._cached_resize_source: Optional[Tuple[int, int]] = None
+        self._cached_resize_target: Optional[Tuple[int, int]] = None
+        self._layer_key: Optional[tuple] = None
+        self._layer_rois: List[Roi] = []
+        self._panel_key: Optional[tuple] = None
+        self._panel_rois: List[Roi] = []
+
+    def invalidate(self) -> None:
+        """Força a reconstrução das camadas pré-renderizadas no próximo frame."""
+        self._layer_key = None
+        self._panel_key = None
+
+    def render(
+        self,
+        frame,
+        batch: Optional[TrackBatch],
+        in_c: int,
+        out_c: int,
+        line_y_ratio: float,
+        offset: float,
+    ):
+        h, w = frame.shape[:2]
+        target_w, target_h = self._display_size(w, h)
+        annotated = frame if (target_w, target_h) == (w, h) else cv2.resize(frame, (target_w, target_h))
+
+        if batch is not None and len(batch):
+            self._draw_boxes(annotated, batch, target_w / w, target_h / h)
+
+        self._ensure_layer(annotated.shape, line_y_ratio, offset)
+        self._ensure_panel(annotated.shape, in_c, out_c)
+        for rois in (self._layer_rois, self._panel_rois):
+            for y0, x0, layer, mask in rois:
+                # cv2.copyTo escreve direto na view; np.copyto(where=) com máscara difundida é ~15x mais lento.
+                cv2.copyTo(layer, mask, annotated[y0:y0 + layer.shape[0], x0:x0 + layer.shape[1]])
+        return annotated
+
+    def _display_size(self, w: int, h: int) -> Tuple[int, int]:
+        if w == self.display_width:
+            return w, h
+        current_source = (w, h)
+        if self._cached_resize_source != current_source or self._cached_resize_target is None:
+            aspect_ratio = w / h
+            display_height = int(self.display_width / aspect_ratio)
+            self._cached_resize_source = current_source
+            self._cached_resize_target = (self.display_width, display_height)
+        return self._cached_resize_target
+
+    def _draw_boxes(self, annotated, batch: TrackBatch, scale_x: float, scale_y: float) -> None:
+        scaled = (batch.boxes * np.array([scale_x, scale_y, scale_x, scale_y], dtype=np.float32)).astype(int)
+        ids = batch.ids.tolist() if batch.has_ids else None
+        for idx, (x1, y1, x2, y2) in enumerate(scaled.tolist()):
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), BOX_COLOR, 2)
+            if ids is not None:
+                cv2.putText(
+                    annotated,
+                    f"ID {ids[idx]}",
+                    (x1, max(20, y1 - 8)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5,
+                    BOX_COLOR,
+                    2,
+                )
+
+    def _ensure_layer(self, shape: tuple, line_y_ratio: float, offset: float) -> None:
+        key = (shape, line_y_ratio, offset)
+        if key == self._layer_key:
+            return
+
+        h, w = shape[:2]
+        line_up_y = int(h * (line_y_ratio - offset))
+        line_down_y = int(h * (line_y_ratio + offset))
+        self._layer_rois = self._prerender(shape, lambda target, color: self._draw_lines(target, w, line_up_y, line_down_y, color))
+        self._layer_key = key
+        self.layer_builds += 1
+
+    def _ensure_panel(self, shape: tuple, in_c: int, out_c: int) -> None:
+        key = (shape, in_c, out_c)
+        if key == self._panel_key:
+            return
+        panel_shape = (min(shape[0], PANEL_HEIGHT),) + tuple(shape[1:])
+        self._panel_rois = self._prerender(panel_shape, lambda target, color: self._draw_panel(target, in_c, out_c, color))
+        self._panel_key = key
+        self.panel_builds += 1
+
+    @classmethod
+    def _prerender(cls, shape: tuple, draw: Callable[[np.ndarray, Callable], None]) -> List[Roi]:
+        """
+        Desenha uma vez em uma camada e em uma máscara (mesmas primitivas, em branco)
+        e devolve só os recortes com conteúdo, prontos para composição.
+        """
+        h, w = shape[:2]
+        layer = np.zeros(shape, dtype=np.uint8)
+        drawn = np.zeros((h, w), dtype=np.uint8)
+        draw(layer, lambda bgr: bgr)
+        draw(drawn, lambda bgr: 255)
+
+        mask = drawn > 0
+        rois = []
+        for y0, y1 in cls._row_bands(mask.any(axis=1)):
+            columns = np.flatnonzero(mask[y0:y1].any(axis=0))
+            x0, x1 = int(columns[0]), int(columns[-1]) + 1
+            rois.append((y0, x0, layer[y0:y1, x0:x1].copy(), drawn[y0:y1, x0:x1].copy()))
+        return rois
+
+    @staticmethod
+    def _draw_lines(target, w: int, line_up_y: int, line_down_y: int, color: Callable) -> None:
+        cv2.line(target, (0, line_up_y), (w, line_up_y), color(LINE_UP_COLOR), 2)
+        cv2.line(target, (0, line_down_y), (w, line_down_y), color(LINE_DOWN_COLOR), 2)
+
+    @staticmethod
+    def _draw_panel(target, in_c: int, out_c: int, color: Callable) -> None:
+        # Painel compacto sem caixa de fundo, com sombra para legibilidade
+        cv2.putText(target, "People Flow", (16, 28), cv2.FONT_HERSHEY_DUPLEX, 0.52, color((0, 0, 0)), 3)
+        cv2.putText(target, "People Flow", (16, 28), cv2.FONT_HERSHEY_DUPLEX, 0.52, color((235, 235, 235)), 1)
+
+        cv2.putText(target, f"Entradas (IN): {in_c}", (16, 52), cv2.FONT_HERSHEY_SIMPLEX, 0.62, color((0, 0, 0)), 3)
+        cv2.putText(target, f"Entradas (IN): {in_c}", (16, 52), cv2.FONT_HERSHEY_SIMPLEX, 0.62, color((30, 220, 80)), 1)
+
+        cv2.putText(target, f"Saidas (OUT): {out_c}", (16, 76), cv2.FONT_HERSHEY_SIMPLEX, 0.62, color((0, 0, 0)), 3)
+        cv2.putText(target, f"Saidas (OUT): {out_c}", (16, 76), cv2.FONT_HERSHEY_SIMPLEX, 0.62, color((70, 70, 245)), 1)
+
+    @staticmethod
+    def _row_bands(rows: np.ndarray) -> List[Tuple[int, int]]:
+        """Agrupa linhas com conteúdo em faixas contíguas [y0, y1)."""
+        padded = np.concatenate([[False], rows, [False]]).astype(np.int8)
+        edges = np.flatnonzero(np.diff(padded))
+        return [(int(y0), int(y1)) for y0, y1 in zip(edges[::2], edges[1::2])]
@@ -1,11 +1,26 @@
 import cv2
-from typing import Optional, Tuple
+from contextlib import nullcontext
+from time import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from app.detection.yolo_detector import YOLODetector
+from app.detection.cascade import create_detector
+from app.detection.loader import BackgroundModelLoader
 from app.tracking.tracker import PersonTracker
+from app.tracking.track_batch import TrackBatch
 from app.analytics.counter import StreamCounter
+from app.analytics.trajectory_store import TrajectoryRecorder
+from app.config.settings import CAPTURE_PROCESS, MICRO_BATCH
+from app.core.capture import FrameSource
+from app.core.shm_capture import SharedFrameSource
+from app.core.overlay import OverlayRenderer
+from app.core.runtime import StartupTimer
+from app.core.zones_watcher import ZonesWatcher
+from app.services.live_state import LiveStateWriter
 from app.utils.logger import log
 
+if TYPE_CHECKING:
+    from app.detection.yolo_detector import YOLODetector
+
 
 class ProcessingPipeline:
     """
@@ -16,138 +31,251 @@ class ProcessingPipeline:
     def __init__(
         self,
         source: str | int,
-        detector: Optional[YOLODetector] = None,
+        detector: Optional["YOLODetector"] = None,
         tracker: Optional[PersonTracker] = None,
         counter: Optional[StreamCounter] = None,
+        headless: bool = False,
+        recorder: Optional[TrajectoryRecorder] = None,
+        live_state: Optional[LiveStateWriter] = None,
+        capture_process: bool = CAPTURE_PROCESS,
+        micro_batch: int = MICRO_BATCH,
+        zones_watcher: Optional[ZonesWatcher] = None,
+        detector_loader: Optional[BackgroundModelLoader] = None,
+        initial_counts: Optional[Dict[str, int]] = None,
+        startup_timer: Optional[StartupTimer] = None,
     ) -> None:
+        """
+        :param headless: Sem janela de exibição; frames fora do ciclo de IA
+            são apenas avançados com `grab()`, sem decodificação para BGR.
+        :param recorder: Gravador opcional das trajetórias por frame (recontagem offline)
+        :param live_state: Publicador opcional dos contadores ao vivo (lidos pela API/dashboard)
+        :param capture_process: Decodifica em processo separado (SharedFrameSource) em vez de FrameSource
+        :param micro_batch: Em headless, agrupa até N frames analisados já disponíveis em um forward
+        :param zones_watcher: Observador opcional do zones.yaml; troca as zonas sem reiniciar o pipeline
+        :param detector_loader: Carga do detector já iniciada em segundo plano (sem `detector`,
+            o pipeline inicia a sua); a captura abre enquanto o modelo carrega
+        :param initial_counts: Relatório do dia já consultado pelo chamador (evita repetir a consulta)
+        :param startup_timer: Cronômetro da inicialização; o resumo é registrado na primeira contagem
+        """
         log.info("Inicializando Pipeline de Processamento...")
         self.source = source
-        self.detector = detector if detector is not None else YOLODetector()
+        self.headless = headless
+        self.recorder = recorder
+        self.live_state = live_state
+        self.capture_process = capture_process
+        self.micro_batch = max(1, micro_batch)
+        self.zones_watcher = zones_watcher
+        self.startup_timer = startup_timer
+        self.detector = detector
+        self.detector_loader = None
+        if detector is None:
+            self.detector_loader = detector_loader or BackgroundModelLoader(create_detector, timer=startup_timer).start()
         self.tracker = tracker if tracker is not None else PersonTracker()
-        self.counter = counter if counter is not None else StreamCounter()
+        self.counter = counter if counter is not None else StreamCounter(initial_counts=initial_counts)
 
         self.skip_frames = 2  # Processa IA a cada X frames
         self.win_name = "PeopleFlowMonitor - Monitoramento"
         self.display_width = 640
-        self._last_boxes = None
-        self._last_ids = None
-        self._cached_resize_source: Optional[Tuple[int, int]] = None
-        self._cached_resize_target: Optional[Tuple[int, int]] = None
+        self.overlay = OverlayRenderer(self.display_width)
+        self.capture_ring_size = 3
+
+    def _use_micro_batch(self) -> bool:
+        if self.micro_batch <= 1 or not self.headless:
+            return False
+        if not getattr(self.tracker, "supports_batch", False):
+            log.info("Micro-batching requer o tracker native; processando frame a frame.")
+            return False
+        return True
+
+    def _reload_zones(self) -> None:
+        """Aplica um zones.yaml alterado entre dois frames: contador, faixa da cascata e overlay."""
+        if self.zones_watcher is None:
+            return
+        config = self.zones_watcher.poll()
+        if config is None:
+            return
+        self.counter.apply_zones(config)
+        if hasattr(self.detector, "band"):
+            self.detector.band = (self.counter.line_y_ratio, self.counter.offset)
+        self.overlay.invalidate()
+
+    def _startup_phase(self, name: str):
+        return self.startup_timer.phase(name) if self.startup_timer is not None else nullcontext()
+
+    def _report_startup(self) -> None:
+        """Resumo das fases de inicialização, uma vez, na primeira contagem."""
+        log.info(self.startup_timer.summary())
+        self.startup_timer = None
 
     def run(self) -> None:
         """Executa o pipeline completo de monitoramento."""
-        cap = cv2.VideoCapture(self.source)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+        batched = self._use_micro_batch()
+        # Frames pendentes de um lote precisam continuar válidos no anel de captura.
+        ring_size = max(self.capture_ring_size, self.micro_batch) if batched else self.capture_ring_size
+        if self.capture_process:
+            capture = SharedFrameSource(self.source, slots=2 * ring_size, hold=ring_size)
+        else:
+            capture = FrameSource(self.source, ring_size=ring_size)
 
-        if not cap.isOpened():
+        with self._startup_phase("captura"):
+            opened = capture.open()
+        if not opened:
             log.error(f"Não foi possível abrir a fonte de vídeo: {self.source}")
             return
         log.info("Captura de vídeo iniciada com sucesso.")
-        try:
-            cv2.moveWindow(self.win_name, 40, 40)
-        except Exception:
-            pass
+        if self.detector is None:
+            try:
+                with self._startup_phase("espera do modelo"):
+                    self.detector = self.detector_loader.result()
+            except Exception:
+                capture.release()
+                raise
+        if not self.headless:
+            try:
+                cv2.moveWindow(self.win_name, 40, 40)
+            except Exception:
+                pass
+
+        frame_nmr = self._run_micro_batched(capture) if batched else self._run_frames(capture)
+
+        capture.release()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.live_state is not None:
+            self.live_state.close()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        log.info(f"Pipeline finalizado. Frames processados: {frame_nmr}")
 
+    def _run_frames(self, capture) -> int:
+        """Laço frame a frame (com exibição opcional). Retorna o número de frames lidos."""
         frame_nmr = 0
-        results: Optional[object] = None
+        batch: Optional[TrackBatch] = None
         in_c, out_c = 0, 0
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+        while capture.is_opened():
+            self._reload_zones()
+            analyze = frame_nmr % self.skip_frames == 0
+            if self.headless and not analyze:
+                if not capture.skip():
+                    log.warning("Fim do fluxo de vídeo ou falha na leitura do frame.")
+                    break
+                frame_nmr += 1
+                continue
+
+            frame = capture.read()
+            if frame is None:
                 log.warning("Fim do fluxo de vídeo ou falha na leitura do frame.")
                 break
 
-            if frame_nmr % self.skip_frames == 0:
-                results, in_c, out_c = self._process_frame(frame, results, (in_c, out_c))
+            if analyze:
+                batch, in_c, out_c = self._process_frame(frame, batch, (in_c, out_c))
+                if self.startup_timer is not None:
+                    self._report_startup()
 
-            annotated_frame = self._draw_overlay(frame, results, in_c, out_c)
-            cv2.imshow(self.win_name, annotated_frame)
+            if not self.headless:
+                annotated_frame = self._draw_overlay(frame, batch, in_c, out_c)
+                cv2.imshow(self.win_name, annotated_frame)
 
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                log.info("Tecla 'Q' pressionada. Encerrando monitoramento...")
-                break
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    log.info("Tecla 'Q' pressionada. Encerrando monitoramento...")
+                    break
 
             frame_nmr += 1
 
-        cap.release()
-        cv2.destroyAllWindows()
-        log.info(f"Pipeline finalizado. Frames processados: {frame_nmr}")
+        return frame_nmr
+
+    def _run_micro_batched(self, capture) -> int:
+        """
+        Laço headless em micro-lotes: acumula frames analisados enquanto a fonte
+        tem backlog (até `micro_batch`) e processa o lote assim que a fila esvazia,
+        sem esperar frames futuros de fontes ao vivo.
+        """
+        frame_nmr = 0
+        batch: Optional[TrackBatch] = None
+        counts = (0, 0)
+        pending = []
+
+        while capture.is_opened():
+            self._reload_zones()
+            if frame_nmr % self.skip_frames != 0:
+                if not capture.skip():
+                    log.warning("Fim do fluxo de vídeo ou falha na leitura do frame.")
+                    break
+                frame_nmr += 1
+                continue
+
+            frame = capture.read()
+            if frame is None:
+                log.warning("Fim do fluxo de vídeo ou falha na leitura do frame.")
+                break
+            pending.append(frame)
+            frame_nmr += 1
+            if len(pending) >= self.micro_batch or not capture.has_backlog():
+                batch, counts = self._process_batch(pending, batch, counts)
+                pending = []
+                if self.startup_timer is not None:
+                    self._report_startup()
+
+        if pending:
+            self._process_batch(pending, batch, counts)
+        return frame_nmr
 
     def _process_frame(
         self,
         frame,
-        last_results,
+        last_results: Optional[TrackBatch],
         last_counts: Tuple[int, int],
-    ) -> Tuple[Optional[object], int, int]:
+    ) -> Tuple[Optional[TrackBatch], int, int]:
         """
         Atualiza rastreador, realiza detecção e atualiza contadores.
+
+        O TrackBatch retornado é a única representação mantida entre frames;
+        contador e overlay leem os mesmos arrays.
         """
         try:
-            results = self.tracker.update(self.detector, frame)
-            self._cache_draw_data(results)
-            in_c, out_c = self.counter.count(results, frame.shape)
-            return results, in_c, out_c
+            batch = self.tracker.update(self.detector, frame)
+            in_c, out_c = self.counter.count(batch, frame.shape)
+            if self.recorder is not None:
+                self.recorder.record(batch, frame.shape, time())
+            if self.live_state is not None:
+                self.live_state.publish(in_c, out_c, len(batch), self.counter.counts_day)
+            return batch, in_c, out_c
         except Exception as e:
-            log.error(f"Erro durante o processamento de IA: {e}")
+            log.error("Erro durante o processamento de IA: %s", e)
             return last_results, last_counts[0], last_counts[1]
 
-    def _cache_draw_data(self, results) -> None:
-        """Converte boxes/ids uma única vez por ciclo de IA para reduzir custo no draw."""
-        self._last_boxes = None
-        self._last_ids = None
-        if results is None or not results.boxes:
-            return
+    def _process_batch(
+        self,
+        frames: list,
+        last_results: Optional[TrackBatch],
+        last_counts: Tuple[int, int],
+    ) -> Tuple[Optional[TrackBatch], Tuple[int, int]]:
+        """
+        Detecção em um único forward para o lote; rastreador e contador seguem
+        frame a frame, na ordem de captura (mesma semântica de `_process_frame`).
+        """
+        try:
+            batches = self.tracker.update_batch(self.detector, frames)
+        except Exception as e:
+            log.error("Erro durante o processamento de IA em lote: %s", e)
+            return last_results, last_counts
 
-        self._last_boxes = results.boxes.xyxy.cpu().numpy().astype(int)
-        if results.boxes.id is not None:
-            self._last_ids = results.boxes.id.cpu().numpy().astype(int)
+        counts = last_counts
+        for frame, batch in zip(frames, batches):
+            try:
+                counts = self.counter.count(batch, frame.shape)
+                if self.recorder is not None:
+                    self.recorder.record(batch, frame.shape, time())
+                if self.live_state is not None:
+                    self.live_state.publish(counts[0], counts[1], len(batch), self.counter.counts_day)
+            except Exception as e:
+                log.error("Erro durante a contagem do lote: %s", e)
+        return (batches[-1] if batches else last_results), counts
 
-    def _draw_overlay(self, frame, results, in_c: int, out_c: int):
+    def _draw_overlay(self, frame, batch: Optional[TrackBatch], in_c: int, out_c: int):
         """
-        Adiciona linhas de contagem, painel de estatísticas e retorna frame anotado.
+        Adiciona linhas de contagem, painel de estatísticas e retorna frame anotado
+        já na resolução de exibição.
         """
-        annotated = frame
-        if self._last_boxes is not None:
-            for idx, box in enumerate(self._last_boxes):
-                x1, y1, x2, y2 = box[:4]
-                cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 255), 2)
-                if self._last_ids is not None and idx < len(self._last_ids):
-                    cv2.putText(
-                        annotated,
-                        f"ID {self._last_ids[idx]}",
-                        (x1, max(20, y1 - 8)),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.5,
-                        (0, 255, 255),
-                        2,
-                    )
-        h, w = frame.shape[:2]
-
-        line_up_y = int(h * (self.counter.line_y_ratio - self.counter.offset))
-        line_down_y = int(h * (self.counter.line_y_ratio + self.counter.offset))
-        cv2.line(annotated, (0, line_up_y), (w, line_up_y), (255, 0, 0), 2)
-        cv2.line(annotated, (0, line_down_y), (w, line_down_y), (0, 0, 255), 2)
-
-        # Painel compacto sem caixa de fundo, com sombra para legibilidade
-        cv2.putText(annotated, "People Flow", (16, 28), cv2.FONT_HERSHEY_DUPLEX, 0.52, (0, 0, 0), 3)
-        cv2.putText(annotated, "People Flow", (16, 28), cv2.FONT_HERSHEY_DUPLEX, 0.52, (235, 235, 235), 1)
-
-        cv2.putText(annotated, f"Entradas (IN): {in_c}", (16, 52), cv2.FONT_HERSHEY_SIMPLEX, 0.62, (0, 0, 0), 3)
-        cv2.putText(annotated, f"Entradas (IN): {in_c}", (16, 52), cv2.FONT_HERSHEY_SIMPLEX, 0.62, (30, 220, 80), 1)
-
-        cv2.putText(annotated, f"Saidas (OUT): {out_c}", (16, 76), cv2.FONT_HERSHEY_SIMPLEX, 0.62, (0, 0, 0), 3)
-        cv2.putText(annotated, f"Saidas (OUT): {out_c}", (16, 76), cv2.FONT_HERSHEY_SIMPLEX, 0.62, (70, 70, 245), 1)
-
-        display_width = self.display_width
-        if w == display_width:
-            return annotated
-        current_source = (w, h)
-        if self._cached_resize_source != current_source or self._cached_resize_target is None:
-            aspect_ratio = w / h
-            display_height = int(display_width / aspect_ratio)
-            self._cached_resize_source = current_source
-            self._cached_resize_target = (display_width, display_height)
-        return cv2.resize(annotated, self._cached_resize_target)
+        return self.overlay.render(frame, batch, in_c, out_c, self.counter.line_y_ratio, self.counter.offset)
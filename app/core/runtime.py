@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Iterator, Mapping, Optional
+
+from app.config import settings
+from app.utils.logger import log
+
+# Estágios que podem ser fixados em núcleos: loop de captura/IA, workers de decodificação e flush do banco.
+STAGES = ("pipeline", "decode", "flush")
+
+# Pools nativos lidos na importação de torch/numpy; só valem se definidos antes.
+_NATIVE_POOL_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def parse_cpu_list(spec: str) -> frozenset[int]:
+    """'0-2,5' -> {0, 1, 2, 5}."""
+    cpus: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return frozenset(cpus)
+
+
+def parse_affinity(spec: str) -> dict[str, frozenset[int]]:
+    """'pipeline=0-2;decode=3' -> {"pipeline": {0, 1, 2}, "decode": {3}}."""
+    affinity: dict[str, frozenset[int]] = {}
+    for item in spec.split(";"):
+        if not item.strip():
+            continue
+        stage, _, cpus = item.partition("=")
+        stage = stage.strip()
+        if stage not in STAGES:
+            raise ValueError(f"Estágio de afinidade desconhecido: {stage} (use {', '.join(STAGES)})")
+        affinity[stage] = parse_cpu_list(cpus)
+    return affinity
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    """
+    Orçamento de threads do processo de monitoramento.
+
+    Campos None mantêm o padrão da biblioteca. `affinity` fixa cada estágio
+    (ver STAGES) em um conjunto de núcleos; threads criadas depois herdam a
+    afinidade da thread que as criou (ex.: o pool intra-op do torch herda a do
+    estágio "pipeline").
+    """
+
+    cv2_threads: Optional[int] = None
+    torch_threads: Optional[int] = None
+    torch_interop_threads: Optional[int] = None
+    affinity: Mapping[str, frozenset[int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> "ThreadBudget":
+        return cls(
+            cv2_threads=_optional_int(settings.CV2_THREADS),
+            torch_threads=_optional_int(settings.TORCH_THREADS),
+            torch_interop_threads=_optional_int(settings.TORCH_INTEROP_THREADS),
+            affinity=parse_affinity(settings.CPU_AFFINITY),
+        )
+
+    def describe(self) -> str:
+        affinity = " ".join(f"{stage}={sorted(cpus)}" for stage, cpus in self.affinity.items()) or "-"
+        return (
+            f"cv2={self.cv2_threads or 'padrão'} torch={self.torch_threads or 'padrão'} "
+            f"interop={self.torch_interop_threads or 'padrão'} afinidade={affinity}"
+        )
+
+
+def pin_current_thread(cpus: frozenset[int]) -> bool:
+    """Fixa a thread atual (no Linux, cada thread tem sua própria máscara) nos núcleos informados."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(threading.get_native_id(), cpus)
+        return True
+    except OSError as e:
+        log.warning(f"Não foi possível aplicar afinidade {sorted(cpus)}: {e}")
+        return False
+
+
+def apply_stage_affinity(stage: str, budget: Optional[ThreadBudget] = None) -> bool:
+    """
+    Chamado no início de cada estágio (thread/processo) para aplicar sua afinidade, se configurada.
+
+    Sem `budget`, lê só PFM_CPU_AFFINITY; um valor inválido é registrado e o
+    estágio segue sem afinidade, em vez de derrubar a thread de flush/decodificação.
+    """
+    if budget is not None:
+        affinity = budget.affinity
+    else:
+        try:
+            affinity = parse_affinity(settings.CPU_AFFINITY)
+        except ValueError as e:
+            log.error(f"PFM_CPU_AFFINITY inválido; estágio {stage} sem afinidade: {e}")
+            return False
+    cpus = affinity.get(stage)
+    return pin_current_thread(cpus) if cpus else False
+
+
+def apply_thread_budget(budget: Optional[ThreadBudget] = None) -> ThreadBudget:
+    """
+    Aplica o orçamento ao processo de monitoramento. Chamar antes de carregar o
+    modelo: o número de threads inter-op do torch só pode ser definido uma vez,
+    antes do primeiro uso.
+    """
+    budget = budget or ThreadBudget.from_settings()
+
+    if budget.torch_threads is not None and "torch" not in sys.modules:
+        for var in _NATIVE_POOL_VARS:
+            os.environ.setdefault(var, str(budget.torch_threads))
+
+    apply_stage_affinity("pipeline", budget)
+
+    if budget.cv2_threads is not None:
+        try:
+            import cv2
+
+            cv2.setNumThreads(budget.cv2_threads)
+        except ImportError:
+            pass
+
+    if budget.torch_threads is not None or budget.torch_interop_threads is not None:
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            if budget.torch_threads is not None:
+                torch.set_num_threads(budget.torch_threads)
+            if budget.torch_interop_threads is not None:
+                try:
+                    torch.set_num_interop_threads(budget.torch_interop_threads)
+                except RuntimeError as e:
+                    log.warning(f"Threads inter-op do torch já inicializadas: {e}")
+
+    log.info(f"Orçamento de threads | {budget.describe()}")
+    return budget
+
+
+class StartupTimer:
+    """
+    Cronometra as fases da inicialização (algumas rodam em paralelo, ex.: carga
+    do modelo em segundo plano) e registra o resumo uma única vez, na primeira
+    contagem.
+    """
+
+    def __init__(self, clock: Callable[[], float] = perf_counter) -> None:
+        self._clock = clock
+        self.started = clock()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + self._clock() - started
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def summary(self, milestone: str = "primeira contagem") -> str:
+        phases = " | ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        return f"Inicialização | {phases or '-'} | {milestone} em {self.elapsed():.2f}s"
@@ -0,0 +1,265 @@
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Callable, Deque, Optional
+
+import cv2
+import numpy as np
+
+from app.core.runtime import apply_stage_affinity
+from app.utils.logger import log
+
+# Mensagens worker -> consumidor: ("shape", shape) | (slot, frame_idx, timestamp) | (END_OF_STREAM, frame_idx, 0.0)
+END_OF_STREAM = -1
+
+
+class SharedFrameRing:
+    """
+    Anel de frames em `multiprocessing.shared_memory`.
+
+    Cada slot é uma visão NumPy sobre o mesmo bloco compartilhado: o processo
+    de decodificação escreve direto no slot (`cap.read(view)`) e o processo de
+    inferência lê a mesma memória, sem pickle nem cópia.
+    """
+
+    def __init__(self, shape: tuple, slots: int, name: Optional[str] = None, dtype=np.uint8) -> None:
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        frame_nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=frame_nbytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._frames = np.ndarray((slots, *self.shape), dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def slot(self, index: int) -> np.ndarray:
+        return self._frames[index]
+
+    def close(self) -> None:
+        """Desfaz o mapeamento; o dono também remove o bloco do sistema."""
+        self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Ainda há visões vivas (ex.: último frame retido pelo chamador); o SO libera ao sair.
+            log.debug("Memória compartilhada de captura ainda referenciada; fechamento adiado.")
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _decode_worker(
+    source,
+    slots: int,
+    ready_q,
+    free_q,
+    control_q,
+    stop_event,
+    capture_factory: Callable,
+    width: int,
+    height: int,
+    fps: int,
+) -> None:
+    """Processo de decodificação: lê frames da fonte direto nos slots livres do anel compartilhado."""
+    apply_stage_affinity("decode")
+    cap = capture_factory(source)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    ring = None
+    frame_idx = 0
+    try:
+        ret, first = cap.read() if cap.isOpened() else (False, None)
+        if not ret or first is None:
+            ready_q.put(("shape", None))
+            return
+
+        # Handshake: o consumidor cria o anel com a resolução real e devolve o nome.
+        ready_q.put(("shape", first.shape))
+        name = control_q.get()
+        if name is None:
+            return
+        ring = SharedFrameRing(first.shape, slots, name=name)
+        ring.slot(0)[...] = first
+        ready_q.put((0, frame_idx, time.time()))
+        del first
+
+        while not stop_event.is_set():
+            try:
+                slot = free_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            view = ring.slot(slot)
+            ret, frame = cap.read(view)
+            if not ret or frame is None:
+                break
+            if frame is not view:
+                log.warning("Resolução da fonte mudou durante a captura em processo separado; encerrando o worker.")
+                break
+            frame_idx += 1
+            ready_q.put((slot, frame_idx, time.time()))
+    finally:
+        ready_q.put((END_OF_STREAM, frame_idx, 0.0))
+        cap.release()
+        if ring is not None:
+            ring.close()
+
+
+class SharedFrameSource:
+    """
+    Captura em processo separado com a mesma interface de FrameSource
+    (`open`, `is_opened`, `read`, `skip`, `release`).
+
+    Um processo por fonte decodifica os frames em um SharedFrameRing; pela
+    fila trafegam apenas (slot, índice do frame, timestamp). Assim a
+    decodificação de várias câmeras usa núcleos distintos e não disputa o GIL
+    com a inferência.
+
+    O frame devolvido por `read()` continua válido até `hold` leituras
+    seguintes; depois o slot volta ao worker e é sobrescrito. Com o anel
+    cheio o worker espera (back-pressure), sem descartar frames.
+    """
+
+    def __init__(
+        self,
+        source: str | int,
+        slots: int = 4,
+        hold: int = 2,
+        width: int = 640,
+        height: int = 480,
+        fps: int = 30,
+        capture_factory: Callable = cv2.VideoCapture,
+        open_timeout: float = 15.0,
+    ) -> None:
+        if hold < 1 or slots <= hold:
+            raise ValueError("slots deve ser maior que hold (>= 1)")
+        self.source = source
+        self.slots = slots
+        self.hold = hold
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.open_timeout = open_timeout
+        self._capture_factory = capture_factory
+        self._ctx = mp.get_context("spawn")
+        self._process = None
+        self._ring: Optional[SharedFrameRing] = None
+        self._ready_q = None
+        self._free_q = None
+        self._stop_event = None
+        self._held: Deque[int] = deque()
+        self._ended = False
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.last_frame_index = -1
+        self.last_timestamp = 0.0
+
+    def open(self) -> bool:
+        self._ready_q = self._ctx.Queue()
+        self._free_q = self._ctx.Queue()
+        control_q = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._process = self._ctx.Process(
+            target=_decode_worker,
+            args=(
+                self.source,
+                self.slots,
+                self._ready_q,
+                self._free_q,
+                control_q,
+                self._stop_event,
+                self._capture_factory,
+                self.width,
+                self.height,
+                self.fps,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+
+        try:
+            _, shape = self._ready_q.get(timeout=self.open_timeout)
+        except queue.Empty:
+            log.error(f"Worker de captura não respondeu em {self.open_timeout}s: {self.source}")
+            shape = None
+        if shape is None:
+            control_q.put(None)
+            self._ended = True
+            return False
+
+        self._ring = SharedFrameRing(shape, self.slots)
+        control_q.put(self._ring.name)
+        for slot in range(1, self.slots):
+            self._free_q.put(slot)
+        return True
+
+    def is_opened(self) -> bool:
+        return self._ring is not None and not self._ended
+
+    def _next_slot(self) -> Optional[int]:
+        while self._held and len(self._held) >= self.hold:
+            self._free_q.put(self._held.popleft())
+        while True:
+            try:
+                slot, frame_idx, timestamp = self._ready_q.get(timeout=0.5)
+            except queue.Empty:
+                if self._process is None or not self._process.is_alive():
+                    self._ended = True
+                    return None
+                continue
+            if slot == END_OF_STREAM:
+                self._ended = True
+                return None
+            self.last_frame_index = frame_idx
+            self.last_timestamp = timestamp
+            return slot
+
+    def read(self) -> Optional[np.ndarray]:
+        """Próximo frame (visão sobre a memória compartilhada). Retorna None no fim do fluxo."""
+        if not self.is_opened():
+            return None
+        slot = self._next_slot()
+        if slot is None:
+            return None
+        self._held.append(slot)
+        self.frames_decoded += 1
+        return self._ring.slot(slot)
+
+    def has_backlog(self) -> bool:
+        """True se o worker já deixou frames decodificados na fila."""
+        return self.is_opened() and not self._ready_q.empty()
+
+    def skip(self) -> bool:
+        """Descarta o próximo frame (a decodificação já ocorreu no worker; aqui só devolve o slot)."""
+        if not self.is_opened():
+            return False
+        slot = self._next_slot()
+        if slot is None:
+            return False
+        self._free_q.put(slot)
+        self.frames_skipped += 1
+        return True
+
+    def release(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        self._held.clear()
+        self._ended = True
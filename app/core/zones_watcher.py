@@ -0,0 +1,56 @@
+from pathlib import Path
+from time import monotonic
+from typing import Callable, Optional
+
+from app.config.settings import ZONES_PATH, ZONES_RELOAD_SECONDS, read_zones_file
+from app.utils.logger import log
+
+
+class ZonesWatcher:
+    """
+    Detecta alterações no zones.yaml por polling de mtime/tamanho.
+
+    `poll()` é chamado no próprio laço de frames: custa um `os.stat` a cada
+    `interval` segundos e devolve a nova configuração só quando o arquivo
+    mudou e foi lido por completo. Um arquivo inválido (ex.: no meio da
+    escrita) é ignorado e relido no próximo poll, mantendo as zonas atuais.
+    """
+
+    def __init__(
+        self,
+        path: Path = ZONES_PATH,
+        interval: float = ZONES_RELOAD_SECONDS,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self._clock = clock
+        self._last_check = clock()
+        self._signature = self._stat()
+        self.reloads = 0
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> Optional[dict]:
+        """Nova configuração de zonas se o arquivo mudou desde a última leitura; senão None."""
+        now = self._clock()
+        if now - self._last_check < self.interval:
+            return None
+        self._last_check = now
+
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        try:
+            config = read_zones_file(self.path)
+        except Exception as e:
+            log.warning(f"zones.yaml alterado mas inválido ({e}); mantendo as zonas atuais.")
+            return None
+        self._signature = signature
+        self.reloads += 1
+        return config
@@ -0,0 +1,177 @@
+from typing import Any, Optional
+
+from app.analytics.counter import compute_line_bounds
+from app.config.settings import (
+    CASCADE_CROWD_THRESHOLD,
+    CASCADE_HOLD_FRAMES,
+    CASCADE_IMGSZ,
+    CASCADE_MODEL_PATH,
+    DETECTOR_CASCADE,
+    DETECTOR_IMGSZ,
+    TRACKER_CONFIG,
+    load_zones_config,
+)
+from app.tracking.track_batch import TrackBatch
+from app.utils.logger import log
+
+
+def needs_escalation(
+    batch: TrackBatch,
+    frame_h: int,
+    band: tuple[float, float],
+    uncertain_conf: float = 0.5,
+    min_uncertain: int = 2,
+    crowd_threshold: int = 8,
+) -> bool:
+    """
+    Decide se o frame merece o modelo/resolução maior.
+
+    Gatilhos: muitas pessoas no quadro (`crowd_threshold`) ou ao menos
+    `min_uncertain` caixas de baixa confiança com o topo na faixa de contagem
+    (ampliada por um `offset` de cada lado), onde um erro vira contagem errada.
+    """
+    if len(batch) >= crowd_threshold:
+        return True
+    if not len(batch):
+        return False
+
+    y_ratio, offset = band
+    line_up, line_down = compute_line_bounds(frame_h, y_ratio, 2 * offset)
+    y_top = batch.boxes[:, 1]
+    near_band = (y_top >= line_up) & (y_top <= line_down)
+    uncertain = batch.confs < uncertain_conf
+    return int((near_band & uncertain).sum()) >= min_uncertain
+
+
+class CascadeDetector:
+    """
+    Detector em cascata com a mesma interface de YOLODetector (`track`/`detect`).
+
+    Normalmente roda o estágio leve (modelo pequeno, entrada reduzida). Quando
+    `needs_escalation` dispara, passa ao estágio pesado e permanece nele por
+    `hold_frames` frames (histerese), evitando alternar a cada frame.
+
+    - `detect` não tem estado: o próprio frame que disparou é refeito no estágio pesado.
+    - `track` mantém o estado do tracker no modelo; a escalada vale a partir do
+      frame seguinte, e o estágio pesado precisa compartilhar o modelo do leve
+      (apenas outra resolução, via `YOLODetector.with_imgsz`) para não perder IDs.
+    """
+
+    def __init__(
+        self,
+        light: Any,
+        heavy: Any,
+        band: Optional[tuple[float, float]] = None,
+        uncertain_conf: float = 0.5,
+        min_uncertain: int = 2,
+        crowd_threshold: int = CASCADE_CROWD_THRESHOLD,
+        hold_frames: int = CASCADE_HOLD_FRAMES,
+    ) -> None:
+        if band is None:
+            zone = load_zones_config().get("counting_line", {})
+            band = (zone.get("y_ratio", 0.6), zone.get("offset", 0.05))
+        self.light = light
+        self.heavy = heavy
+        self.band = band
+        self.uncertain_conf = uncertain_conf
+        self.min_uncertain = min_uncertain
+        self.crowd_threshold = crowd_threshold
+        self.hold_frames = hold_frames
+        self.frames_light = 0
+        self.frames_heavy = 0
+        self.escalations = 0
+        self._hold_left = 0
+
+    @property
+    def imgsz(self) -> int:
+        return self.light.imgsz
+
+    @property
+    def escalated(self) -> bool:
+        return self._hold_left > 0
+
+    def _triggers(self, result: Any, frame: Any) -> bool:
+        return needs_escalation(
+            TrackBatch.from_results(result),
+            frame.shape[0],
+            self.band,
+            self.uncertain_conf,
+            self.min_uncertain,
+            self.crowd_threshold,
+        )
+
+    def _escalate(self) -> None:
+        if not self.escalated:
+            self.escalations += 1
+            log.debug("Cascata: escalando para o estágio pesado.")
+        self._hold_left = self.hold_frames
+
+    def _next_stage(self) -> Any:
+        if self.escalated:
+            self._hold_left -= 1
+            self.frames_heavy += 1
+            return self.heavy
+        self.frames_light += 1
+        return self.light
+
+    def warmup(self, shape: tuple = (480, 640, 3)) -> None:
+        """Aquece os dois estágios (mesmo com pesos compartilhados, cada imgsz tem sua forma de entrada)."""
+        self.light.warmup(shape)
+        self.heavy.warmup(shape)
+
+    def detect(self, frame: Any, conf: Optional[float] = None) -> Any:
+        was_escalated = self.escalated
+        result = self._next_stage().detect(frame, conf=conf)
+        if not self._triggers(result, frame):
+            return result
+        self._escalate()
+        if was_escalated:
+            return result
+        # Sem estado de tracking: o próprio frame que disparou é refeito no estágio pesado.
+        self.frames_heavy += 1
+        return self.heavy.detect(frame, conf=conf)
+
+    def track(self, frame: Any, tracker: str = "botsort.yaml", conf: float = 0.3, iou: float = 0.5) -> Any:
+        result = self._next_stage().track(frame, tracker=tracker, conf=conf, iou=iou)
+        if self._triggers(result, frame):
+            self._escalate()
+        return result
+
+    def stats(self) -> dict:
+        # Frames refeitos no estágio pesado contam nos dois estágios (custo real).
+        total = max(1, self.frames_light + self.frames_heavy)
+        return {
+            "frames_light": self.frames_light,
+            "frames_heavy": self.frames_heavy,
+            "escalations": self.escalations,
+            "heavy_ratio": round(self.frames_heavy / total, 3),
+        }
+
+
+def validate_stage_sizes(light_imgsz: int, heavy_imgsz: int, heavy_model: str = "") -> None:
+    """Recusa uma cascata sem ganho: com os mesmos pesos, o estágio pesado precisa de imgsz maior que o leve."""
+    if not heavy_model and heavy_imgsz <= light_imgsz:
+        raise ValueError(
+            f"PFM_CASCADE_IMGSZ ({heavy_imgsz}) deve ser maior que PFM_DETECTOR_IMGSZ ({light_imgsz}) "
+            "quando PFM_CASCADE_MODEL não é definido"
+        )
+
+
+def create_detector(cascade: bool = DETECTOR_CASCADE) -> Any:
+    """YOLODetector padrão ou, com PFM_DETECTOR_CASCADE=1, a cascata configurada nas settings."""
+    from app.detection.yolo_detector import YOLODetector
+    from app.tracking.tracker import NATIVE_TRACKER
+
+    if cascade:
+        validate_stage_sizes(DETECTOR_IMGSZ, CASCADE_IMGSZ, CASCADE_MODEL_PATH)
+    light = YOLODetector()
+    if not cascade:
+        return light
+    if CASCADE_MODEL_PATH:
+        if TRACKER_CONFIG != NATIVE_TRACKER:
+            raise ValueError("PFM_CASCADE_MODEL exige PFM_TRACKER=native (IDs não migram entre modelos no BoT-SORT)")
+        heavy = YOLODetector(model_path=CASCADE_MODEL_PATH, imgsz=CASCADE_IMGSZ)
+    else:
+        heavy = light.with_imgsz(CASCADE_IMGSZ)
+    log.info(f"Cascata ativa | leve: imgsz {light.imgsz} | pesado: {heavy.model_path} imgsz {heavy.imgsz}")
+    return CascadeDetector(light, heavy)
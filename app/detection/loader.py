@@ -0,0 +1,62 @@
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+from app.config.settings import MODEL_WARMUP
+from app.core.runtime import StartupTimer
+from app.utils.logger import log
+
+
+class BackgroundModelLoader:
+    """
+    Carrega (e aquece) o detector em uma thread de fundo.
+
+    A importação de ultralytics/torch, a leitura dos pesos e o primeiro forward
+    acontecem enquanto a captura e o banco são abertos; `result()` só bloqueia
+    pelo tempo que ainda faltar.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        warmup: bool = MODEL_WARMUP,
+        timer: Optional[StartupTimer] = None,
+    ) -> None:
+        self._factory = factory
+        self.warmup = warmup
+        self.timer = timer
+        self._detector: Any = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._load, name="pfm-model-loader", daemon=True)
+
+    def start(self) -> "BackgroundModelLoader":
+        self._thread.start()
+        return self
+
+    def _phase(self, name: str):
+        return self.timer.phase(name) if self.timer is not None else nullcontext()
+
+    def _load(self) -> None:
+        try:
+            with self._phase("modelo"):
+                detector = self._factory()
+            if self.warmup and hasattr(detector, "warmup"):
+                with self._phase("warmup"):
+                    detector.warmup()
+            self._detector = detector
+        except BaseException as e:
+            self._error = e
+
+    def ready(self) -> bool:
+        return not self._thread.is_alive() and self._error is None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Detector pronto (aguarda a thread). Relança a falha de carregamento, se houver."""
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError(f"Modelo não carregou em {timeout}s")
+        if self._error is not None:
+            log.error(f"Falha ao carregar o detector em segundo plano: {self._error}")
+            raise self._error
+        return self._detector
+
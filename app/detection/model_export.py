@@ -0,0 +1,76 @@
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from app.utils.logger import log
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "openvino")
+
+
+def exported_model_path(model_path: str | Path, backend: str, imgsz: int, int8: bool = False) -> Path:
+    """
+    Caminho de cache do modelo exportado para o backend informado.
+
+    O nome inclui tamanho de entrada e precisão para que configurações
+    diferentes não sobrescrevam umas às outras.
+    """
+    model_path = Path(model_path)
+    if backend == "torch":
+        return model_path
+
+    variant = f"{model_path.stem}_{imgsz}{'_int8' if int8 else ''}"
+    if backend == "onnx":
+        return model_path.with_name(f"{variant}.onnx")
+    if backend == "openvino":
+        return model_path.with_name(f"{variant}_openvino_model")
+    raise ValueError(f"Backend de inferência não suportado: {backend}")
+
+
+def ensure_exported_model(
+    model_path: str | Path,
+    backend: str,
+    imgsz: int,
+    int8: bool = False,
+    calibration_data: Optional[str] = None,
+) -> Path:
+    """
+    Exporta o modelo PyTorch para ONNX/OpenVINO apenas na primeira execução.
+
+    Execuções seguintes reutilizam o artefato em cache ao lado dos pesos.
+    INT8 em OpenVINO usa a quantização pós-treino do próprio Ultralytics;
+    em ONNX usa quantização dinâmica do onnxruntime (dependência opcional).
+    """
+    target = exported_model_path(model_path, backend, imgsz, int8)
+    if backend == "torch" or target.exists():
+        return target
+
+    from ultralytics import YOLO
+
+    log.info(f"Exportando modelo para {backend} (imgsz={imgsz}, int8={int8})...")
+    export_kwargs = {"format": backend, "imgsz": imgsz}
+    if backend == "openvino" and int8:
+        export_kwargs["int8"] = True
+        if calibration_data:
+            export_kwargs["data"] = calibration_data
+
+    exported = Path(YOLO(str(model_path)).export(**export_kwargs))
+
+    if backend == "onnx" and int8:
+        _quantize_onnx_dynamic(exported, target)
+        exported.unlink(missing_ok=True)
+    else:
+        if target.exists():
+            shutil.rmtree(target) if target.is_dir() else target.unlink()
+        shutil.move(str(exported), str(target))
+
+    log.info(f"Modelo exportado e armazenado em cache: {target}")
+    return target
+
+
+def _quantize_onnx_dynamic(source: Path, target: Path) -> None:
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise RuntimeError("Quantização INT8 em ONNX requer o pacote 'onnxruntime'.") from e
+
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QUInt8)
@@ -1,40 +1,104 @@
+import copy
+import numpy as np
 from ultralytics import YOLO
-from typing import Any
-from app.config.settings import MODEL_PATH
+from typing import Any, Optional
+from app.config.settings import DETECTOR_BACKEND, DETECTOR_IMGSZ, DETECTOR_INT8, MODEL_PATH
+from app.detection.model_export import SUPPORTED_BACKENDS, ensure_exported_model
 from app.utils.logger import log
 
 class YOLODetector:
     """
     Detector de pessoas utilizando o modelo YOLOv8.
     Filtra apenas a classe 'person' (classe 0).
+
+    O backend de inferência é plugável: "torch" carrega os pesos `.pt`
+    diretamente; "onnx" e "openvino" exportam (e mantêm em cache) o modelo
+    na primeira execução, opcionalmente quantizado em INT8.
     """
 
+    backend: str = "torch"
+    imgsz: int = DETECTOR_IMGSZ
+
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        backend: str = DETECTOR_BACKEND,
+        imgsz: int = DETECTOR_IMGSZ,
+        int8: bool = DETECTOR_INT8,
+    ) -> None:
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Backend de inferência não suportado: {backend}")
 
-    def __init__(self, model_path: str = MODEL_PATH) -> None:
         self.model_path = model_path
+        self.backend = backend
+        self.imgsz = imgsz
+        self.int8 = int8
         try:
-            self.model = YOLO(model_path)
-            log.info(f"YOLO Detector carregado com sucesso: {model_path}")
+            if backend == "torch":
+                self.model = YOLO(model_path)
+            else:
+                weights = ensure_exported_model(model_path, backend, imgsz, int8)
+                self.model = YOLO(str(weights), task="detect")
+            log.info(f"YOLO Detector carregado com sucesso: {model_path} | Backend: {backend} | imgsz: {imgsz}")
         except Exception as e:
             log.error(f"Falha ao carregar o modelo YOLO: {e}")
             raise
 
+    def with_imgsz(self, imgsz: int) -> "YOLODetector":
+        """
+        Mesmo modelo carregado (e o mesmo estado de tracking) com outro tamanho
+        de entrada. Só no backend torch: modelos exportados têm entrada fixa.
+        """
+        if self.backend != "torch":
+            raise ValueError(f"Backend {self.backend} usa entrada fixa; exporte um modelo por imgsz")
+        variant = copy.copy(self)
+        variant.imgsz = imgsz
+        return variant
 
-    def detect(self, frame: Any) -> Any:
+
+    def warmup(self, shape: tuple = (480, 640, 3)) -> None:
+        """
+        Um forward em um frame preto na resolução da captura: cria o predictor,
+        funde Conv+BN e aloca os buffers uma única vez, fora do primeiro frame real.
+        O predictor (com o modelo já fundido) é reaproveitado por `detect` e `track`.
+        """
+        self.detect(np.zeros(shape, dtype=np.uint8))
+
+
+    def detect(self, frame: Any, conf: Optional[float] = None) -> Any:
         """
         Realiza a detecção de pessoas no frame.
 
         :param frame: Frame de vídeo (numpy array BGR)
+        :param conf: Confiança mínima (padrão do Ultralytics quando omitido)
         :return: Resultados da detecção do frame atual
         """
         try:
-            results = self.model(frame, classes=[0], verbose=False)
+            kwargs = {} if conf is None else {"conf": conf}
+            results = self.model(frame, classes=[0], imgsz=self.imgsz, verbose=False, **kwargs)
             return results[0]  # Retorna apenas o resultado do frame
         except Exception as e:
             log.error(f"Erro durante detecção no frame: {e}")
             return None
 
 
+    def detect_batch(self, frames: list, conf: Optional[float] = None) -> list:
+        """
+        Detecção de vários frames em um único forward (backend torch).
+
+        Modelos exportados têm lote fixo em 1; nesses backends os frames são
+        processados um a um. Retorna um resultado por frame, na mesma ordem.
+        """
+        if self.backend != "torch":
+            return [self.detect(frame, conf=conf) for frame in frames]
+        try:
+            kwargs = {} if conf is None else {"conf": conf}
+            return list(self.model(list(frames), classes=[0], imgsz=self.imgsz, verbose=False, **kwargs))
+        except Exception as e:
+            log.error(f"Erro durante detecção em lote ({len(frames)} frames): {e}")
+            return [None] * len(frames)
+
+
     def track(
         self,
         frame: Any,
@@ -53,6 +117,7 @@ class YOLODetector:
                 classes=[0],
                 conf=conf,
                 iou=iou,
+                imgsz=self.imgsz,
                 verbose=False,
             )
             return results[0]
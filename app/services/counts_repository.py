@@ -1,27 +1,144 @@
-import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 
-import pandas as pd
+from app.services.database import DatabaseBackend, create_backend
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class CountsPage:
+    """Uma página de eventos (id, timestamp, direction, object_id), do mais recente ao mais antigo."""
+
+    rows: List[tuple]
+    # (timestamp, id) da última linha; None na última página.
+    next_cursor: Optional[Tuple[str, int]]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
 
 
 class CountsRepository:
     """Camada de acesso a dados da tabela counts."""
 
-    def __init__(self, db_path: str | Path):
-        self.db_path = str(db_path)
+    def __init__(self, db_path: Optional[str | Path] = None, backend: Optional[DatabaseBackend] = None):
+        self.backend = backend or create_backend(db_path)
+        self.db_path = self.backend.describe()
+
+    def fetch_counts_between(self, start_dt: datetime, end_dt: datetime) -> "pd.DataFrame":
+        # pandas só é carregado aqui: a API (streaming/agregados) não depende dele.
+        import pandas as pd
 
-    def fetch_counts_between(self, start_dt: datetime, end_dt: datetime) -> pd.DataFrame:
-        with sqlite3.connect(self.db_path) as conn:
-            return pd.read_sql_query(
-                """
-                SELECT direction, timestamp
+        with self.backend.session() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT direction, {self.backend.timestamp_text("timestamp")} AS timestamp
                 FROM counts
                 WHERE timestamp >= ? AND timestamp < ?
                 """,
-                conn,
-                params=(
+                (
                     start_dt.strftime("%Y-%m-%d %H:%M:%S"),
                     end_dt.strftime("%Y-%m-%d %H:%M:%S"),
                 ),
-            )
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["direction", "timestamp"])
+
+    def fetch_page(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        direction: Optional[str] = None,
+        before: Optional[Tuple[str, int]] = None,
+        page_size: int = 100,
+    ) -> CountsPage:
+        """
+        Página de eventos do intervalo por keyset (timestamp, id), mais recentes primeiro.
+
+        A próxima página é pedida com `before=page.next_cursor`. Sem OFFSET, o
+        custo não cresce com a profundidade da página, e só `page_size` linhas
+        saem do banco. A ordem segue os índices (timestamp) e (direction,
+        timestamp), que já terminam em id, então o banco não ordena o dia inteiro.
+        """
+        query, params = self._page_query(start_dt, end_dt, direction, before, page_size)
+        with self.backend.session() as conn:
+            rows = conn.execute(query, params).fetchall()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return CountsPage(rows=[tuple(row) for row in rows], next_cursor=(rows[-1][1], int(rows[-1][0])))
+        return CountsPage(rows=[tuple(row) for row in rows], next_cursor=None)
+
+    def _page_query(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        direction: Optional[str],
+        before: Optional[Tuple[str, int]],
+        page_size: int,
+    ) -> Tuple[str, list]:
+        """
+        Monta a consulta de `fetch_page`.
+
+        Com cursor, o limite superior do intervalo passa a ser `timestamp <= cursor`
+        (o menor entre o cursor e o fim), que o índice usa como limite de busca;
+        `(timestamp < ? OR id < ?)` só desempata as linhas do próprio instante do
+        cursor. Um OR solto no WHERE não vira limite de índice, e cada página
+        voltaria a varrer desde o fim do intervalo.
+        """
+        start_text = start_dt.strftime("%Y-%m-%d %H:%M:%S")
+        end_text = end_dt.strftime("%Y-%m-%d %H:%M:%S")
+        query = f"""
+            SELECT id, {self.backend.timestamp_text("timestamp")}, direction, object_id
+            FROM counts
+            WHERE timestamp >= ?
+        """
+        params: list = [start_text]
+        if before is not None and before[0] < end_text:
+            query += " AND timestamp <= ? AND (timestamp < ? OR id < ?)"
+            params.extend([before[0], before[0], int(before[1])])
+        else:
+            query += " AND timestamp < ?"
+            params.append(end_text)
+            if before is not None:
+                query += " AND (timestamp < ? OR id < ?)"
+                params.extend([before[0], int(before[1])])
+        if direction:
+            query += " AND direction = ?"
+            params.append(direction)
+        # Uma linha extra indica se existe página seguinte, sem COUNT(*).
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(page_size + 1)
+        return query, params
+
+    def iter_counts_between(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        direction: Optional[str] = None,
+        chunk_size: int = 5000,
+    ) -> Iterator[list[tuple]]:
+        """
+        Percorre os eventos do intervalo em blocos de `chunk_size` linhas (id, timestamp, direction, object_id).
+
+        Usa um cursor com fetchmany (server-side no PostgreSQL), mantendo memória constante
+        independentemente do tamanho do intervalo.
+        """
+        query = f"""
+            SELECT id, {self.backend.timestamp_text("timestamp")}, direction, object_id
+            FROM counts
+            WHERE timestamp >= ? AND timestamp < ?
+        """
+        params = [start_dt.strftime("%Y-%m-%d %H:%M:%S"), end_dt.strftime("%Y-%m-%d %H:%M:%S")]
+        if direction:
+            query += " AND direction = ?"
+            params.append(direction)
+        query += " ORDER BY timestamp, id"
+
+        conn = self.backend.stream_connect()
+        try:
+            yield from self.backend.iter_query(conn, query, params, chunk_size)
+        finally:
+            conn.close()
@@ -2,71 +2,91 @@ import os
 import tempfile
 from datetime import datetime
 import unicodedata
+from functools import lru_cache
 
-from fpdf import FPDF
+from app.services.day_summary import DaySummary
 
 
 def normalize_text(txt: str) -> str:
     return "".join(c for c in unicodedata.normalize("NFD", txt) if unicodedata.category(c) != "Mn")
 
 
-def compute_kpis(df_filtered) -> dict:
-    in_total = int((df_filtered["direction"] == "IN").sum())
-    out_total = int((df_filtered["direction"] == "OUT").sum())
-    occupancy = max(0, in_total - out_total)
-    avg_h = round((in_total + out_total) / 24, 2)
-    return {
-        "in_total": in_total,
-        "out_total": out_total,
-        "occupancy": occupancy,
-        "avg_h": avg_h,
-    }
-
-
-def build_insight(df_filtered) -> str:
-    if df_filtered.empty:
+def build_insight(summary: DaySummary) -> str:
+    if not summary.total:
         return "Aguardando dados para análise..."
 
-    kpis = compute_kpis(df_filtered)
-    pico_hora = int(df_filtered["timestamp"].dt.hour.mode().iloc[0])
-    total_hoje = len(df_filtered)
-
+    kpis = summary.kpis()
     return (
-        f"**Resumo Diário:** Total de **{total_hoje}** movimentações "
+        f"**Resumo Diário:** Total de **{summary.total}** movimentações "
         f"(**IN {kpis['in_total']}** | **OUT {kpis['out_total']}**). "
-        f"Pico de atividade às **{pico_hora}:00h**. "
+        f"Pico de atividade às **{summary.peak_hour}:00h**. "
         f"Ocupação estimada no fechamento: **{kpis['occupancy']}**."
     )
 
 
-class PDFReport(FPDF):
-    def header(self):
-        self.set_fill_color(24, 52, 90)
-        self.rect(0, 0, 210, 35, "F")
-        self.set_y(10)
-        self.set_font("Arial", "B", 18)
-        self.set_text_color(255, 255, 255)
-        self.cell(0, 10, "PEOPLE FLOW MONITOR", ln=True, align="L")
-        self.set_font("Arial", "", 10)
-        self.cell(0, 5, "SISTEMA DE MONITORAMENTO E INTELIGENCIA DE FLUXO", ln=True, align="L")
+def hourly_chart_data(summary: DaySummary, value_name: str):
+    """Linhas (Hora, direction, valor) das horas com movimento, para os gráficos por hora."""
+    import pandas as pd
+
+    rows = [
+        {"Hora": hour, "direction": direction, value_name: count}
+        for direction, hourly in (("IN", summary.in_hourly), ("OUT", summary.out_hourly))
+        for hour, count in enumerate(hourly)
+        if summary.in_hourly[hour] or summary.out_hourly[hour]
+    ]
+    return pd.DataFrame(rows, columns=["Hora", "direction", value_name])
+
+
+def build_report_chart(summary: DaySummary):
+    """Gráfico de barras por hora embutido no PDF."""
+    import plotly.express as px
+
+    return px.bar(
+        hourly_chart_data(summary, "Qtde"),
+        x="Hora",
+        y="Qtde",
+        color="direction",
+        barmode="group",
+        color_discrete_map={"IN": "#18345A", "OUT": "#A4B0BE"},
+        template="plotly_white",
+    )
+
+
+@lru_cache(maxsize=1)
+def _pdf_report_class():
+    """Classe do relatório; fpdf só é importado quando um PDF é gerado."""
+    from fpdf import FPDF
+
+    class PDFReport(FPDF):
+        def header(self):
+            self.set_fill_color(24, 52, 90)
+            self.rect(0, 0, 210, 35, "F")
+            self.set_y(10)
+            self.set_font("Arial", "B", 18)
+            self.set_text_color(255, 255, 255)
+            self.cell(0, 10, "PEOPLE FLOW MONITOR", ln=True, align="L")
+            self.set_font("Arial", "", 10)
+            self.cell(0, 5, "SISTEMA DE MONITORAMENTO E INTELIGENCIA DE FLUXO", ln=True, align="L")
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font("Arial", "I", 8)
+            self.set_text_color(128, 128, 128)
+            self.cell(0, 10, f"Pagina {self.page_no()} | Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", align="C")
 
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, f"Pagina {self.page_no()} | Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", align="C")
+    return PDFReport
 
 
-def generate_pdf_report(df_filtered, date_selected, chart_fig, limit, output_dir):
+def generate_pdf_report(summary: DaySummary, date_selected, chart_fig, limit, output_dir):
     fd, img_path = tempfile.mkstemp(prefix="pfm_chart_", suffix=".png", dir=output_dir)
     os.close(fd)
     try:
         chart_fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
         chart_fig.write_image(img_path, engine="kaleido", width=1200, height=700, scale=2)
 
-        kpis = compute_kpis(df_filtered)
+        kpis = summary.kpis()
 
-        pdf = PDFReport()
+        pdf = _pdf_report_class()()
         pdf.add_page()
         pdf.set_margins(15, 40, 15)
 
@@ -116,13 +136,8 @@ def generate_pdf_report(df_filtered, date_selected, chart_fig, limit, output_dir
 
         pdf.set_font("Arial", "", 10)
         pdf.set_text_color(0, 0, 0)
-        df_h = df_filtered.copy()
-        df_h["h"] = df_h["timestamp"].dt.hour
         fill = False
-        for h in range(24):
-            mask = df_h["h"] == h
-            h_in = int((df_h[mask]["direction"] == "IN").sum())
-            h_out = int((df_h[mask]["direction"] == "OUT").sum())
+        for h, (h_in, h_out) in enumerate(zip(summary.in_hourly, summary.out_hourly)):
             if h_in > 0 or h_out > 0:
                 pdf.set_fill_color(248, 249, 250) if fill else pdf.set_fill_color(255, 255, 255)
                 pdf.cell(50, 8, f"{h:02d}:00 - {h:02d}:59", 1, 0, "C", True)
@@ -0,0 +1,330 @@
+import hashlib
+import os
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+from app.config.settings import DATABASE_URL, DB_PATH
+from app.services.day_summary import CREATE_DAY_SUMMARY_SQL
+from app.services.occupancy_store import CREATE_OCCUPANCY_MINUTE_SQL, ensure_occupancy_table
+from app.services.sync import reset_sync_state
+
+# Agrupamentos sobre a coluna texto `ts` ("YYYY-MM-DD HH:MM[:SS]"); semana inicia na segunda-feira.
+PORTABLE_BUCKET_EXPRESSIONS = {
+    "minute": "substr(ts, 1, 16)",
+    "hour": "substr(ts, 1, 13) || ':00'",
+    "day": "substr(ts, 1, 10)",
+}
+
+INSERT_COUNTS_SQL = "INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)"
+
+# Literais, identificadores entre aspas e comentários são copiados sem trocar `?`;
+# só `?` fora deles é placeholder.
+_SQL_TOKENS = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|\$(\w*)\$.*?\$\1\$|--[^\n]*|/\*.*?\*/|\?|%""",
+    re.DOTALL,
+)
+
+
+class DatabaseBackend(ABC):
+    """
+    Contrato comum de persistência usado por StorageService, StatsAnalyzer,
+    CountsRepository e scripts de manutenção.
+
+    As consultas da aplicação usam SQL portável com placeholders `?`; cada
+    backend concentra apenas o que é específico do banco: conexão, schema,
+    carga em lote, leitura em streaming e marca d'água de versão.
+    """
+
+    name = "base"
+    errors: tuple = ()
+    operational_errors: tuple = ()
+    bucket_expressions: dict = PORTABLE_BUCKET_EXPRESSIONS
+
+    @abstractmethod
+    def connect(self, persistent: bool = False):
+        """Nova conexão com a interface execute/executemany/commit/rollback/close e placeholders `?`."""
+
+    def stream_connect(self):
+        """Conexão dedicada a leituras em streaming (iterador consumido fora da thread de criação)."""
+        return self.connect()
+
+    @contextmanager
+    def session(self):
+        """Conexão curta: commit ao final, rollback em erro e fechamento sempre."""
+        conn = self.connect()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @abstractmethod
+    def create_schema(self, conn) -> bool:
+        """Cria o schema completo (idempotente); True indica que occupancy_minute foi reconstruída a partir de counts."""
+
+    def insert_events(self, conn, events: Sequence[tuple[str, str, int]]) -> None:
+        conn.executemany(INSERT_COUNTS_SQL, events)
+
+    def iter_query(self, conn, query: str, params: Sequence, chunk_size: int) -> Iterator[list[tuple]]:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def timestamp_text(self, column: str) -> str:
+        """Expressão que devolve o timestamp como texto 'YYYY-MM-DD HH:MM:SS'."""
+        return column
+
+    def timestamp_hour(self, column: str) -> str:
+        """Expressão com a hora (0-23) do timestamp, como inteiro."""
+        return f"CAST(substr({self.timestamp_text(column)}, 12, 2) AS INTEGER)"
+
+    def timestamp_minute(self, column: str) -> str:
+        """Expressão com o minuto do timestamp como texto 'YYYY-MM-DD HH:MM' (mesmo formato de occupancy_minute)."""
+        return f"substr({self.timestamp_text(column)}, 1, 16)"
+
+    @contextmanager
+    def savepoint(self, conn) -> Iterator[None]:
+        """
+        Isola uma consulta que pode falhar (ex.: tabela derivada ausente) para
+        que a consulta alternativa rode na mesma transação. No SQLite um erro
+        não aborta a transação; ver PostgresBackend.
+        """
+        yield
+
+    def reset(self, conn) -> None:
+        conn.execute("DELETE FROM counts")
+        conn.execute("DELETE FROM occupancy_minute")
+        conn.execute("DELETE FROM day_summary")
+
+    @abstractmethod
+    def data_version(self) -> str:
+        """Marca d'água barata que muda a cada escrita em counts (chave de cache)."""
+
+    def is_available(self) -> bool:
+        return True
+
+    def describe(self) -> str:
+        return self.name
+
+
+class SqliteBackend(DatabaseBackend):
+    """Backend padrão: arquivo SQLite local em modo WAL."""
+
+    name = "sqlite"
+    errors = (sqlite3.Error,)
+    operational_errors = (sqlite3.OperationalError,)
+    bucket_expressions = {**PORTABLE_BUCKET_EXPRESSIONS, "week": "date(ts, '-6 days', 'weekday 1')"}
+
+    def __init__(self, db_path: str | Path = DB_PATH) -> None:
+        self.db_path = str(db_path)
+
+    def connect(self, persistent: bool = False) -> sqlite3.Connection:
+        """Conexões persistentes (StorageService) são compartilhadas entre threads e ativam WAL."""
+        if not persistent:
+            return sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def stream_connect(self) -> sqlite3.Connection:
+        # Servidores ASGI podem avançar um iterador de streaming em threads distintas.
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def create_schema(self, conn: sqlite3.Connection) -> bool:
+        """Cria counts, índices e tabelas derivadas; retorna True se occupancy_minute foi reconstruída."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS counts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME NOT NULL,
+                direction TEXT NOT NULL,
+                object_id INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_counts_timestamp ON counts(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_counts_direction_timestamp ON counts(direction, timestamp)")
+        backfilled = ensure_occupancy_table(conn)
+        conn.execute(CREATE_DAY_SUMMARY_SQL)
+        return backfilled
+
+    def reset(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM counts")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name='counts'")
+        reset_sync_state(conn)
+        conn.execute(CREATE_OCCUPANCY_MINUTE_SQL)
+        conn.execute("DELETE FROM occupancy_minute")
+        conn.execute(CREATE_DAY_SUMMARY_SQL)
+        conn.execute("DELETE FROM day_summary")
+
+    def data_version(self) -> str:
+        """
+        Derivada apenas de os.stat do banco e do WAL, sem executar consultas.
+
+        Muda a cada commit (o WAL cresce ou o checkpoint reescreve o banco).
+        """
+        parts = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                st = os.stat(path)
+                parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+            except FileNotFoundError:
+                parts.append("-")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+    def is_available(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def describe(self) -> str:
+        return self.db_path
+
+
+class _PostgresConnection:
+    """Adapta uma conexão psycopg à interface usada pela aplicação (placeholders `?`, execute/executemany)."""
+
+    def __init__(self, raw) -> None:
+        self.raw = raw
+
+    @staticmethod
+    def _sql(query: str) -> str:
+        """Converte placeholders `?` em `%s` fora de literais e comentários; `%` vira `%%` em todo lugar."""
+
+        def _token(match: "re.Match[str]") -> str:
+            token = match.group(0)
+            if token == "?":
+                return "%s"
+            return token.replace("%", "%%")
+
+        return _SQL_TOKENS.sub(_token, query)
+
+    def execute(self, query: str, params: Sequence = ()):
+        return self.raw.execute(self._sql(query), params)
+
+    def executemany(self, query: str, rows: Iterable[Sequence]):
+        cursor = self.raw.cursor()
+        cursor.executemany(self._sql(query), list(rows))
+        return cursor
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+class PostgresBackend(DatabaseBackend):
+    """
+    Backend PostgreSQL (psycopg 3, dependência opcional).
+
+    Flushes usam COPY em vez de INSERTs individuais; agregações rodam no
+    servidor sobre occupancy_minute/counts.
+    """
+
+    name = "postgresql"
+    bucket_expressions = {
+        **PORTABLE_BUCKET_EXPRESSIONS,
+        "week": "to_char(date_trunc('week', ts::timestamp), 'YYYY-MM-DD')",
+    }
+
+    def __init__(self, dsn: str) -> None:
+        import psycopg
+
+        self._psycopg = psycopg
+        self.dsn = dsn
+        self.errors = (psycopg.Error,)
+        # Tabela ausente é OperationalError no SQLite e UndefinedTable (ProgrammingError) aqui.
+        self.operational_errors = (psycopg.OperationalError, psycopg.errors.UndefinedTable)
+
+    def connect(self, persistent: bool = False) -> _PostgresConnection:
+        return _PostgresConnection(self._psycopg.connect(self.dsn))
+
+    def create_schema(self, conn: _PostgresConnection) -> bool:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS counts (
+                id BIGSERIAL PRIMARY KEY,
+                timestamp TIMESTAMP NOT NULL,
+                direction TEXT NOT NULL,
+                object_id BIGINT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_counts_timestamp ON counts(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_counts_direction_timestamp ON counts(direction, timestamp)")
+        exists = conn.execute("SELECT to_regclass('occupancy_minute') IS NOT NULL").fetchone()[0]
+        conn.execute(CREATE_OCCUPANCY_MINUTE_SQL)
+        if not exists:
+            conn.execute("""
+                INSERT INTO occupancy_minute (minute, in_count, out_count)
+                SELECT to_char(date_trunc('minute', timestamp), 'YYYY-MM-DD HH24:MI'),
+                       COUNT(*) FILTER (WHERE direction = 'IN'),
+                       COUNT(*) FILTER (WHERE direction = 'OUT')
+                FROM counts
+                GROUP BY 1
+            """)
+        conn.execute(CREATE_DAY_SUMMARY_SQL)
+        return not exists
+
+    def insert_events(self, conn: _PostgresConnection, events: Sequence[tuple[str, str, int]]) -> None:
+        with conn.raw.cursor() as cursor:
+            with cursor.copy("COPY counts (timestamp, direction, object_id) FROM STDIN") as copy:
+                for event in events:
+                    copy.write_row(event)
+
+    def iter_query(self, conn: _PostgresConnection, query: str, params: Sequence, chunk_size: int) -> Iterator[list[tuple]]:
+        # Cursor nomeado (server-side): o servidor entrega `chunk_size` linhas por vez.
+        with conn.raw.cursor(name="pfm_stream") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(conn._sql(query), params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+
+    def timestamp_text(self, column: str) -> str:
+        return f"to_char({column}, 'YYYY-MM-DD HH24:MI:SS')"
+
+    @contextmanager
+    def savepoint(self, conn: _PostgresConnection) -> Iterator[None]:
+        # Um erro aborta a transação inteira; o savepoint devolve a conexão ao estado anterior à consulta.
+        conn.execute("SAVEPOINT pfm_fallback")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK TO SAVEPOINT pfm_fallback")
+            raise
+        conn.execute("RELEASE SAVEPOINT pfm_fallback")
+
+    def reset(self, conn: _PostgresConnection) -> None:
+        conn.execute("TRUNCATE counts, occupancy_minute, day_summary RESTART IDENTITY")
+
+    def data_version(self) -> str:
+        """Último id emitido pela sequência de counts (consulta de uma linha, sem varrer tabelas)."""
+        with self.session() as conn:
+            last_value, is_called = conn.execute("SELECT last_value, is_called FROM counts_id_seq").fetchone()
+        return hashlib.sha1(f"{last_value}:{is_called}".encode()).hexdigest()[:16]
+
+    def describe(self) -> str:
+        return f"postgresql ({self.dsn.split('@')[-1]})"
+
+
+def create_backend(db_path: Optional[str | Path] = None) -> DatabaseBackend:
+    """
+    Seleciona o backend: caminho explícito -> SQLite; senão PFM_DATABASE_URL
+    (postgresql://...) -> PostgreSQL; senão o SQLite padrão em data/.
+    """
+    if db_path is None and DATABASE_URL.startswith(("postgresql://", "postgres://")):
+        return PostgresBackend(DATABASE_URL)
+    return SqliteBackend(db_path or DB_PATH)
@@ -0,0 +1,167 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.services.database import DatabaseBackend
+
+HOURS = 24
+
+CREATE_DAY_SUMMARY_SQL = """
+    CREATE TABLE IF NOT EXISTS day_summary (
+        day TEXT PRIMARY KEY,
+        in_total INTEGER NOT NULL,
+        out_total INTEGER NOT NULL,
+        in_hourly TEXT NOT NULL,
+        out_hourly TEXT NOT NULL,
+        peak_hour INTEGER,
+        peak_count INTEGER NOT NULL,
+        closing_occupancy INTEGER NOT NULL,
+        created_at TEXT NOT NULL
+    )
+"""
+
+
+@dataclass(frozen=True)
+class DaySummary:
+    """Resumo imutável de um dia: histogramas horários de entradas/saídas e métricas derivadas."""
+
+    day: date
+    in_hourly: Tuple[int, ...]
+    out_hourly: Tuple[int, ...]
+
+    @classmethod
+    def from_hourly_rows(cls, day: date, rows: Iterable[Tuple[int, int, int]]) -> "DaySummary":
+        """rows: (hora 0-23, entradas, saídas)."""
+        in_hourly, out_hourly = [0] * HOURS, [0] * HOURS
+        for hour, in_count, out_count in rows:
+            in_hourly[int(hour)] += int(in_count)
+            out_hourly[int(hour)] += int(out_count)
+        return cls(day, tuple(in_hourly), tuple(out_hourly))
+
+    @property
+    def in_total(self) -> int:
+        return sum(self.in_hourly)
+
+    @property
+    def out_total(self) -> int:
+        return sum(self.out_hourly)
+
+    @property
+    def total(self) -> int:
+        return self.in_total + self.out_total
+
+    @property
+    def peak_hour(self) -> Optional[int]:
+        """Hora com mais movimentações (a primeira em caso de empate), ou None sem eventos."""
+        volumes = [i + o for i, o in zip(self.in_hourly, self.out_hourly)]
+        peak = max(volumes)
+        return volumes.index(peak) if peak > 0 else None
+
+    @property
+    def peak_count(self) -> int:
+        hour = self.peak_hour
+        return 0 if hour is None else self.in_hourly[hour] + self.out_hourly[hour]
+
+    @property
+    def closing_occupancy(self) -> int:
+        return max(0, self.in_total - self.out_total)
+
+    def kpis(self) -> dict:
+        """KPIs exibidos no dashboard e no relatório PDF."""
+        return {
+            "in_total": self.in_total,
+            "out_total": self.out_total,
+            "occupancy": self.closing_occupancy,
+            "avg_h": round(self.total / HOURS, 2),
+        }
+
+
+def _day_bounds(day: date) -> Tuple[str, str]:
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    return start.strftime("%Y-%m-%d %H:%M"), end.strftime("%Y-%m-%d %H:%M")
+
+
+def compute_day_summary(conn, day: date, backend: "DatabaseBackend") -> DaySummary:
+    """Agrega o dia por hora a partir de occupancy_minute (ou de counts, se a tabela não existir)."""
+    params = _day_bounds(day)
+    try:
+        with backend.savepoint(conn):
+            rows = conn.execute(
+                """
+                SELECT CAST(substr(minute, 12, 2) AS INTEGER) AS hour, SUM(in_count), SUM(out_count)
+                FROM occupancy_minute
+                WHERE minute >= ? AND minute < ?
+                GROUP BY hour
+                """,
+                params,
+            ).fetchall()
+    except backend.operational_errors:
+        rows = conn.execute(
+            f"""
+            SELECT {backend.timestamp_hour("timestamp")} AS hour,
+                   SUM(CASE WHEN direction = 'IN' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN direction = 'OUT' THEN 1 ELSE 0 END)
+            FROM counts
+            WHERE timestamp >= ? AND timestamp < ?
+            GROUP BY hour
+            """,
+            params,
+        ).fetchall()
+    return DaySummary.from_hourly_rows(day, rows)
+
+
+def load_day_summary(conn, day: date, backend: "DatabaseBackend") -> Optional[DaySummary]:
+    try:
+        with backend.savepoint(conn):
+            row = conn.execute(
+                "SELECT in_hourly, out_hourly FROM day_summary WHERE day = ?",
+                (day.isoformat(),),
+            ).fetchone()
+    except backend.operational_errors:
+        return None
+    if row is None:
+        return None
+    return DaySummary(day, tuple(json.loads(row[0])), tuple(json.loads(row[1])))
+
+
+def save_day_summary(conn, summary: DaySummary) -> None:
+    """Grava (ou substitui) o resumo de um dia fechado. Não faz commit."""
+    conn.execute(CREATE_DAY_SUMMARY_SQL)
+    conn.execute(
+        """
+        INSERT INTO day_summary (
+            day, in_total, out_total, in_hourly, out_hourly,
+            peak_hour, peak_count, closing_occupancy, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            in_total = excluded.in_total,
+            out_total = excluded.out_total,
+            in_hourly = excluded.in_hourly,
+            out_hourly = excluded.out_hourly,
+            peak_hour = excluded.peak_hour,
+            peak_count = excluded.peak_count,
+            closing_occupancy = excluded.closing_occupancy,
+            created_at = excluded.created_at
+        """,
+        (
+            summary.day.isoformat(),
+            summary.in_total,
+            summary.out_total,
+            json.dumps(list(summary.in_hourly)),
+            json.dumps(list(summary.out_hourly)),
+            summary.peak_hour,
+            summary.peak_count,
+            summary.closing_occupancy,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        ),
+    )
+
+
+def invalidate_day_summaries(conn, events: Iterable[tuple[str, str, int]], today: date) -> None:
+    """Remove resumos de dias fechados que receberam eventos tardios (ex.: flush após a meia-noite)."""
+    closed_days = {timestamp[:10] for timestamp, _, _ in events if timestamp[:10] < today.isoformat()}
+    if closed_days:
+        conn.executemany("DELETE FROM day_summary WHERE day = ?", [(d,) for d in sorted(closed_days)])
@@ -0,0 +1,119 @@
+import csv
+import importlib.util
+import io
+from datetime import datetime
+from typing import Iterator, Optional
+
+from app.services.counts_repository import CountsRepository
+
+EXPORT_COLUMNS = ("id", "timestamp", "direction", "object_id")
+EXPORT_FORMATS = ("csv", "parquet")
+MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Destino só-escrita que acumula bytes até `drain()`.
+
+    `tell()` reporta o total já escrito (não o tamanho do buffer atual), pois o
+    rodapé do Parquet registra offsets absolutos dos row groups.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._written += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._written
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def iter_csv(
+    repo: CountsRepository,
+    start_dt: datetime,
+    end_dt: datetime,
+    direction: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[bytes]:
+    """Gera o CSV do intervalo em blocos (cabeçalho + um bloco por fetchmany)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for rows in repo.iter_counts_between(start_dt, end_dt, direction, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_parquet(
+    repo: CountsRepository,
+    start_dt: datetime,
+    end_dt: datetime,
+    direction: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[bytes]:
+    """
+    Gera o Parquet do intervalo em blocos: cada fetchmany vira um row group.
+
+    O writer grava sequencialmente em um sink que é esvaziado a cada row
+    group, então o arquivo completo nunca fica em memória.
+    Requer `pyarrow` (dependência opcional).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("timestamp", pa.string()),
+            ("direction", pa.string()),
+            ("object_id", pa.int64()),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in repo.iter_counts_between(start_dt, end_dt, direction, chunk_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays([pa.array(c) for c in columns], schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(
+    repo: CountsRepository,
+    start_dt: datetime,
+    end_dt: datetime,
+    fmt: str = "csv",
+    direction: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido: {fmt}")
+    if fmt == "parquet":
+        return iter_parquet(repo, start_dt, end_dt, direction, chunk_size)
+    return iter_csv(repo, start_dt, end_dt, direction, chunk_size)
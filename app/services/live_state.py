@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+# Cabeçalho fixo + payload protegido por seqlock (seq ímpar = escrita em andamento).
+_MAGIC = b"PFMLIVE1"
+_SEQ = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<qqqqd")  # in_count, out_count, active_tracks, day (ordinal), heartbeat (epoch)
+_SEQ_OFFSET = len(_MAGIC)
+_PAYLOAD_OFFSET = _SEQ_OFFSET + _SEQ.size
+STATE_SIZE = _PAYLOAD_OFFSET + _PAYLOAD.size
+
+
+@dataclass(frozen=True)
+class LiveState:
+    """Contadores ao vivo publicados pelo pipeline."""
+
+    in_count: int
+    out_count: int
+    active_tracks: int
+    day: date
+    heartbeat: float
+
+    @property
+    def occupancy(self) -> int:
+        return max(0, self.in_count - self.out_count)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.heartbeat
+
+
+class LiveStateWriter:
+    """
+    Publica o estado ao vivo do pipeline em um arquivo mapeado em memória.
+
+    Escritor único: incrementa `seq` (ímpar), grava o payload e incrementa de
+    novo (par). Leitores em outros processos (API, dashboard) copiam o payload
+    sem locks e descartam leituras em que `seq` mudou ou estava ímpar.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, STATE_SIZE)
+            self._mm = mmap.mmap(fd, STATE_SIZE)
+        finally:
+            os.close(fd)
+        self._mm[: len(_MAGIC)] = _MAGIC
+        seq = _SEQ.unpack_from(self._mm, _SEQ_OFFSET)[0]
+        # Um estado deixado no meio de uma escrita (processo morto) volta a ser par.
+        self._seq = seq + 1 if seq % 2 else seq
+
+    def publish(
+        self,
+        in_count: int,
+        out_count: int,
+        active_tracks: int,
+        day: Optional[date] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        day = day or date.today()
+        _SEQ.pack_into(self._mm, _SEQ_OFFSET, self._seq + 1)
+        _PAYLOAD.pack_into(
+            self._mm,
+            _PAYLOAD_OFFSET,
+            in_count,
+            out_count,
+            active_tracks,
+            day.toordinal(),
+            time.time() if now is None else now,
+        )
+        self._seq += 2
+        _SEQ.pack_into(self._mm, _SEQ_OFFSET, self._seq)
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+
+
+class LiveStateReader:
+    """
+    Lê o estado publicado pelo LiveStateWriter (sem consultas ao banco).
+
+    O arquivo é mapeado sob demanda: enquanto nenhum pipeline o tiver criado,
+    `read()` devolve None e quem chama recorre ao banco.
+    """
+
+    def __init__(self, path: str | Path, max_retries: int = 100) -> None:
+        self.path = Path(path)
+        self.max_retries = max_retries
+        self._mm: Optional[mmap.mmap] = None
+
+    def _map(self) -> Optional[mmap.mmap]:
+        if self._mm is None:
+            try:
+                with open(self.path, "rb") as handle:
+                    self._mm = mmap.mmap(handle.fileno(), STATE_SIZE, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError, OSError):
+                return None
+            if self._mm[: len(_MAGIC)] != _MAGIC:
+                self.close()
+        return self._mm
+
+    def read(self) -> Optional[LiveState]:
+        """Leitura consistente (seqlock); None se não houver estado ou a escrita não estabilizar."""
+        mm = self._map()
+        if mm is None:
+            return None
+        for _ in range(self.max_retries):
+            before = _SEQ.unpack_from(mm, _SEQ_OFFSET)[0]
+            if before == 0:
+                return None  # arquivo criado, nada publicado ainda
+            if before % 2:
+                continue
+            in_count, out_count, active_tracks, day, heartbeat = _PAYLOAD.unpack_from(mm, _PAYLOAD_OFFSET)
+            if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] == before:
+                return LiveState(in_count, out_count, active_tracks, date.fromordinal(day), heartbeat)
+        return None
+
+    def read_fresh(self, max_age_seconds: float, now: Optional[float] = None) -> Optional[LiveState]:
+        """Estado ao vivo apenas se o heartbeat for recente e os contadores forem de hoje."""
+        state = self.read()
+        if state is None or state.age(now) > max_age_seconds or state.day != date.today():
+            # Remapeia na próxima leitura: um novo pipeline pode ter recriado o arquivo.
+            self.close()
+            return None
+        return state
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
@@ -0,0 +1,63 @@
+import sqlite3
+from collections import Counter
+from typing import Iterable
+
+# Fluxo líquido por minuto ("YYYY-MM-DD HH:MM"), mantido junto com a tabela counts.
+CREATE_OCCUPANCY_MINUTE_SQL = """
+    CREATE TABLE IF NOT EXISTS occupancy_minute (
+        minute TEXT PRIMARY KEY,
+        in_count INTEGER NOT NULL DEFAULT 0,
+        out_count INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+UPSERT_OCCUPANCY_MINUTE_SQL = """
+    INSERT INTO occupancy_minute (minute, in_count, out_count) VALUES (?, ?, ?)
+    ON CONFLICT(minute) DO UPDATE SET
+        in_count = occupancy_minute.in_count + excluded.in_count,
+        out_count = occupancy_minute.out_count + excluded.out_count
+"""
+
+BACKFILL_OCCUPANCY_MINUTE_SQL = """
+    INSERT INTO occupancy_minute (minute, in_count, out_count)
+    SELECT substr(timestamp, 1, 16),
+           SUM(CASE WHEN direction = 'IN' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN direction = 'OUT' THEN 1 ELSE 0 END)
+    FROM counts
+    GROUP BY substr(timestamp, 1, 16)
+"""
+
+
+def ensure_occupancy_table(conn: sqlite3.Connection) -> bool:
+    """
+    Cria a tabela occupancy_minute (SQLite) e, se ela acabou de ser criada,
+    reconstrói o fluxo por minuto a partir dos eventos já existentes em counts.
+
+    Retorna True quando houve backfill. Não faz commit.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='occupancy_minute'"
+    ).fetchone()
+    conn.execute(CREATE_OCCUPANCY_MINUTE_SQL)
+    if exists:
+        return False
+    conn.execute(BACKFILL_OCCUPANCY_MINUTE_SQL)
+    return True
+
+
+def minute_flows(events: Iterable[tuple[str, str, int]]) -> list[tuple[str, int, int]]:
+    """Agrega eventos (timestamp, direction, object_id) em linhas (minute, in, out) para o upsert."""
+    ins: Counter = Counter()
+    outs: Counter = Counter()
+    for timestamp, direction, _ in events:
+        minute = timestamp[:16]
+        if direction == "IN":
+            ins[minute] += 1
+        elif direction == "OUT":
+            outs[minute] += 1
+    return [(minute, ins[minute], outs[minute]) for minute in sorted(ins.keys() | outs.keys())]
+
+
+def apply_minute_flows(conn, events: Iterable[tuple[str, str, int]]) -> None:
+    """Acumula um lote de eventos no fluxo por minuto (na mesma transação do INSERT em counts)."""
+    conn.executemany(UPSERT_OCCUPANCY_MINUTE_SQL, minute_flows(events))
@@ -0,0 +1,275 @@
+import multiprocessing as mp
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from threading import Event, Thread
+from typing import Callable, Iterable, Optional
+
+from app.config.settings import REPORT_JOB_STALE_SECONDS, REPORT_WORKERS, REPORTS_DIR
+from app.services.database import DatabaseBackend, SqliteBackend, create_backend
+from app.utils.logger import log
+
+CREATE_REPORT_JOBS_SQL = """
+    CREATE TABLE IF NOT EXISTS report_jobs (
+        id TEXT PRIMARY KEY,
+        batch_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        capacity_limit INTEGER,
+        status TEXT NOT NULL,
+        output_path TEXT,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+"""
+
+# queued -> running -> done | empty (sem eventos no dia) | failed
+JOB_STATUSES = ("queued", "running", "done", "empty", "failed")
+FINISHED_STATUSES = ("done", "empty", "failed")
+MAX_RANGE_DAYS = 93
+
+
+def _now(delta_seconds: float = 0.0) -> str:
+    return (datetime.now() + timedelta(seconds=delta_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _update_job(
+    backend: DatabaseBackend,
+    job_id: str,
+    status: str,
+    output_path: Optional[str] = None,
+    error: Optional[str] = None,
+) -> None:
+    with backend.session() as conn:
+        conn.execute(
+            "UPDATE report_jobs SET status = ?, output_path = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, output_path, error, _now(), job_id),
+        )
+
+
+def render_day_report(backend: DatabaseBackend, day: date, capacity_limit: Optional[int], output_dir: str) -> Optional[str]:
+    """Gera o PDF de um dia; None quando o dia não tem eventos. fpdf/plotly só carregam no worker."""
+    from app.analytics.statistics import StatsAnalyzer
+    from app.services.dashboard_reporting import build_report_chart, generate_pdf_report
+
+    summary = StatsAnalyzer(backend=backend).get_day_summary(day)
+    if not summary.total:
+        return None
+    return generate_pdf_report(summary, day, build_report_chart(summary), capacity_limit, output_dir)
+
+
+def run_report_job(
+    job_id: str,
+    day_iso: str,
+    capacity_limit: Optional[int],
+    output_dir: str,
+    db_path: Optional[str],
+    render: Callable = render_day_report,
+) -> str:
+    """Executa um job no processo worker; o próprio worker grava o andamento em report_jobs."""
+    backend = create_backend(db_path)
+    _update_job(backend, job_id, "running")
+    try:
+        output = render(backend, date.fromisoformat(day_iso), capacity_limit, output_dir)
+    except Exception as e:
+        _update_job(backend, job_id, "failed", error=str(e))
+        return "failed"
+    status = "done" if output else "empty"
+    _update_job(backend, job_id, status, output_path=output)
+    return status
+
+
+class ReportJobQueue:
+    """
+    Fila de relatórios PDF processada por um pool de processos.
+
+    Cada dia de um pedido (dia único ou intervalo) vira uma linha em
+    `report_jobs`, agrupada por `batch_id`. Os workers atualizam o status no
+    banco, então qualquer sessão do dashboard ou a API consultam o andamento
+    sem depender do processo que enviou o pedido.
+
+    Jobs "queued"/"running" que ninguém atualiza há `stale_after` segundos
+    (servidor reiniciado, worker morto) são marcados como "failed" na criação
+    da fila e a cada consulta de lote, para que o andamento sempre termine.
+    Enquanto a fila está viva, uma thread renova `updated_at` dos seus jobs
+    pendentes, então uma fila longa não é tomada como órfã por outro processo
+    (API e dashboard compartilham o banco).
+    """
+
+    def __init__(
+        self,
+        backend: Optional[DatabaseBackend] = None,
+        output_dir: str | Path = REPORTS_DIR,
+        workers: int = REPORT_WORKERS,
+        executor: Optional[Executor] = None,
+        render: Callable = render_day_report,
+        stale_after: float = REPORT_JOB_STALE_SECONDS,
+        heartbeat_interval: Optional[float] = None,
+    ) -> None:
+        """
+        :param executor: Executor alternativo (padrão: ProcessPoolExecutor com `workers` processos, criado sob demanda)
+        :param render: Função de geração de um dia, executada no worker (precisa ser serializável)
+        :param stale_after: Segundos sem atualização para um job pendente ser considerado órfão
+        :param heartbeat_interval: Intervalo de renovação dos jobs pendentes desta fila (padrão: stale_after / 3)
+        """
+        self.backend = backend or create_backend()
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers)
+        self.render = render
+        self.stale_after = stale_after
+        self._executor = executor
+        # Jobs enviados por esta fila e ainda não concluídos: nunca são tratados como órfãos aqui.
+        self._active: set[str] = set()
+        self._pool_broken = False
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else stale_after / 3
+        self._heartbeat: Optional[Thread] = None
+        self._stop_heartbeat = Event()
+        # Workers recriam o backend: caminho do SQLite ou, para PostgreSQL, PFM_DATABASE_URL herdado.
+        self._db_path = self.backend.db_path if isinstance(self.backend, SqliteBackend) else None
+        with self.backend.session() as conn:
+            conn.execute(CREATE_REPORT_JOBS_SQL)
+        self._fail_stale_jobs()
+
+    def _fail_stale_jobs(self, batch_id: Optional[str] = None) -> None:
+        """Marca como "failed" os jobs pendentes sem atualização há `stale_after` segundos (opcionalmente de um lote)."""
+        query = "SELECT id FROM report_jobs WHERE status IN ('queued', 'running') AND updated_at < ?"
+        params: tuple = (_now(-self.stale_after),)
+        if batch_id is not None:
+            query += " AND batch_id = ?"
+            params += (batch_id,)
+        with self.backend.session() as conn:
+            stale = [row[0] for row in conn.execute(query, params).fetchall() if row[0] not in self._active]
+        if stale:
+            log.warning(f"Relatórios interrompidos marcados como falha: {len(stale)} job(s)")
+            self._fail_jobs(stale, "interrompido (reinício do servidor ou worker encerrado)")
+
+    def _touch_active_jobs(self) -> None:
+        """Renova `updated_at` dos jobs pendentes enviados por esta fila (sem alterar o status)."""
+        job_ids = list(self._active)
+        if not job_ids:
+            return
+        now = _now()
+        try:
+            with self.backend.session() as conn:
+                conn.executemany(
+                    "UPDATE report_jobs SET updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                    [(now, job_id) for job_id in job_ids],
+                )
+        except self.backend.errors as e:
+            log.warning(f"Falha ao renovar jobs de relatório pendentes: {e}")
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop_heartbeat.wait(self.heartbeat_interval):
+            self._touch_active_jobs()
+
+    def _ensure_heartbeat(self) -> None:
+        if self._heartbeat is None or not self._heartbeat.is_alive():
+            self._stop_heartbeat.clear()
+            self._heartbeat = Thread(target=self._heartbeat_loop, daemon=True)
+            self._heartbeat.start()
+
+    def _fail_jobs(self, job_ids: Iterable[str], error: str) -> None:
+        with self.backend.session() as conn:
+            conn.executemany(
+                "UPDATE report_jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                [(error, _now(), job_id) for job_id in job_ids],
+            )
+
+    def _pool(self) -> Executor:
+        if self._pool_broken:
+            self._discard_pool()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"))
+        return self._executor
+
+    def submit(self, start: date, end: Optional[date] = None, capacity_limit: Optional[int] = None) -> str:
+        """Enfileira um relatório por dia de `start` a `end` (inclusive) e retorna o batch_id."""
+        end = end or start
+        if end < start:
+            raise ValueError("A data final não pode ser anterior à inicial")
+        n_days = (end - start).days + 1
+        if n_days > MAX_RANGE_DAYS:
+            raise ValueError(f"Intervalo máximo de {MAX_RANGE_DAYS} dias por pedido")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        batch_id = uuid.uuid4().hex[:12]
+        now = _now()
+        jobs = [
+            (uuid.uuid4().hex[:12], batch_id, (start + timedelta(days=i)).isoformat(), capacity_limit, "queued", now, now)
+            for i in range(n_days)
+        ]
+        with self.backend.session() as conn:
+            conn.executemany(
+                """
+                INSERT INTO report_jobs (id, batch_id, day, capacity_limit, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                jobs,
+            )
+
+        pool = self._pool()
+        self._ensure_heartbeat()
+        for index, (job_id, _, day_iso, *_) in enumerate(jobs):
+            try:
+                future = pool.submit(
+                    run_report_job, job_id, day_iso, capacity_limit, str(self.output_dir), self._db_path, self.render
+                )
+            except BrokenProcessPool as e:
+                # Um worker morreu e o pool não aceita mais tarefas: o restante do lote falha e o próximo pedido cria outro pool.
+                log.error(f"Pool de relatórios quebrado; lote {batch_id} interrompido: {e}")
+                self._fail_jobs([job[0] for job in jobs[index:]], f"pool de workers indisponível: {e}")
+                self._discard_pool()
+                break
+            self._active.add(job_id)
+            future.add_done_callback(partial(self._on_job_finished, job_id))
+        log.info(f"Relatórios enfileirados | lote {batch_id} | {start} a {end} ({n_days} dia(s))")
+        return batch_id
+
+    def _discard_pool(self) -> None:
+        self._pool_broken = False
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _on_job_finished(self, job_id: str, future: Future) -> None:
+        # Falhas dentro do render já foram gravadas pelo worker; aqui só o processo que morreu.
+        self._active.discard(job_id)
+        error = future.exception()
+        if error is not None:
+            # Pool quebrado (worker morto) é descartado no próximo pedido, fora da thread do executor.
+            self._pool_broken = self._pool_broken or isinstance(error, BrokenProcessPool)
+            log.error(f"Worker de relatório falhou (job {job_id}): {error}")
+            _update_job(self.backend, job_id, "failed", error=str(error) or type(error).__name__)
+
+    def batch_status(self, batch_id: str) -> Optional[dict]:
+        """Andamento de um lote: contagem por status e a situação de cada dia. None se não existir."""
+        self._fail_stale_jobs(batch_id)
+        with self.backend.session() as conn:
+            rows = conn.execute(
+                "SELECT day, status, output_path, error FROM report_jobs WHERE batch_id = ? ORDER BY day",
+                (batch_id,),
+            ).fetchall()
+        if not rows:
+            return None
+        counts = {status: 0 for status in JOB_STATUSES}
+        for _, status, _, _ in rows:
+            counts[status] = counts.get(status, 0) + 1
+        return {
+            "batch_id": batch_id,
+            "total": len(rows),
+            "finished": sum(counts[status] for status in FINISHED_STATUSES),
+            **counts,
+            "jobs": [
+                {"day": day, "status": status, "output_path": output_path, "error": error}
+                for day, status, output_path, error in rows
+            ],
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._stop_heartbeat.set()
@@ -1,25 +1,31 @@
-import sqlite3
 import os
 import atexit
-from datetime import datetime
+from datetime import date, datetime
 from time import monotonic
 from threading import Lock, Event, Thread
 import time
 from collections import deque
 from typing import Optional
+from app.core.runtime import apply_stage_affinity
+from app.services.database import DatabaseBackend, SqliteBackend, create_backend
+from app.services.day_summary import compute_day_summary, invalidate_day_summaries, save_day_summary
+from app.services.occupancy_store import apply_minute_flows
 from app.utils.logger import log
 
 class StorageService:
     """
-    Serviço responsável por persistência de contagens no SQLite.
-    Cria automaticamente a tabela 'counts' caso não exista.
+    Serviço responsável por persistência de contagens (SQLite por padrão, ou
+    PostgreSQL via PFM_DATABASE_URL / `backend`).
+    Cria automaticamente a tabela 'counts' caso não exista e mantém o fluxo
+    líquido por minuto ('occupancy_minute') na mesma transação de cada flush.
     """
 
-    def __init__(self, db_path: Optional[str] = None) -> None:
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.db_path = db_path or os.path.join(base_dir, "data", "PeopleFlowMonitor.db")
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self._conn: Optional[sqlite3.Connection] = None
+    def __init__(self, db_path: Optional[str] = None, backend: Optional[DatabaseBackend] = None) -> None:
+        self.backend = backend or create_backend(db_path)
+        if isinstance(self.backend, SqliteBackend):
+            os.makedirs(os.path.dirname(os.path.abspath(self.backend.db_path)), exist_ok=True)
+        self.db_path = self.backend.describe()
+        self._conn = None
         self._lock = Lock()
         self._conn_lock = Lock()
         self._buffer = deque()
@@ -37,6 +43,7 @@ class StorageService:
         self._retry_backoff_seconds = 0.05
         self._last_flush = monotonic()
         self._started_at = datetime.now()
+        self._current_day: date = self._started_at.date()
         self._last_flush_at: Optional[str] = None
         self._metrics_log_interval_seconds = 60.0
         self._last_metrics_log = monotonic()
@@ -49,11 +56,8 @@ class StorageService:
         atexit.register(self.close)
 
     def _connect(self) -> None:
-        """Abre conexão persistente com SQLite e ativa WAL."""
-        self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
-        self._conn.execute("PRAGMA busy_timeout=5000")
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA synchronous=NORMAL")
+        """Abre a conexão persistente do backend (no SQLite, compartilhada entre threads e em WAL)."""
+        self._conn = self.backend.connect(persistent=True)
 
     def _start_flush_worker(self) -> None:
         """Inicia worker leve para flush periódico independente de novas gravações."""
@@ -61,31 +65,19 @@ class StorageService:
         self._flush_thread.start()
 
     def _flush_worker_loop(self) -> None:
+        apply_stage_affinity("flush")
         while not self._stop_event.wait(self._flush_interval_seconds):
             self._flush_if_needed(force=True)
+            self._close_day_if_needed()
             self._maybe_log_metrics()
 
     def _create_table(self) -> None:
-        """Cria a tabela counts se não existir."""
+        """Cria a tabela counts (e tabelas derivadas) se não existir."""
         try:
             assert self._conn is not None
             with self._conn_lock:
-                self._conn.execute("""
-                    CREATE TABLE IF NOT EXISTS counts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp DATETIME NOT NULL,
-                        direction TEXT NOT NULL,
-                        object_id INTEGER NOT NULL
-                    )
-                """)
-                self._conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_counts_timestamp
-                    ON counts(timestamp)
-                """)
-                self._conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_counts_direction_timestamp
-                    ON counts(direction, timestamp)
-                """)
+                if self.backend.create_schema(self._conn):
+                    log.info("Fluxo por minuto (occupancy_minute) reconstruído a partir de counts.")
                 self._conn.commit()
             log.info(f"Banco de dados inicializado com sucesso: {self.db_path}")
         except Exception as e:
@@ -106,7 +98,7 @@ class StorageService:
                 should_flush = len(self._buffer) >= self._batch_size
             if should_flush:
                 self._flush_if_needed()
-        except sqlite3.OperationalError as e:
+        except self.backend.operational_errors as e:
             log.error(f"ERRO OPERACIONAL: Banco bloqueado ou inacessível: {e}")
         except Exception as e:
             log.error(f"ERRO AO SALVAR NO BANCO: {e}")
@@ -152,10 +144,9 @@ class StorageService:
         for attempt in range(1, self._max_retries + 1):
             try:
                 with self._conn_lock:
-                    self._conn.executemany(
-                        "INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)",
-                        pending,
-                    )
+                    self.backend.insert_events(self._conn, pending)
+                    apply_minute_flows(self._conn, pending)
+                    invalidate_day_summaries(self._conn, pending, datetime.now().date())
                     self._conn.commit()
                 self._last_flush = monotonic()
                 self._last_flush_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -165,7 +156,8 @@ class StorageService:
                 self._last_flush_error = None
                 log.debug(f"?? {len(pending)} evento(s) persistido(s) com sucesso.")
                 return
-            except sqlite3.OperationalError as e:
+            except self.backend.operational_errors as e:
+                self._rollback()
                 if attempt >= self._max_retries:
                     log.error(f"ERRO OPERACIONAL no flush em lote (tentativa final): {e}")
                     self._flush_failure_count += 1
@@ -174,12 +166,39 @@ class StorageService:
                     return
                 time.sleep(self._retry_backoff_seconds * attempt)
             except Exception as e:
+                self._rollback()
                 log.error(f"ERRO no flush em lote: {e}")
                 self._flush_failure_count += 1
                 self._last_flush_error = str(e)
                 self._requeue_front(pending)
                 return
 
+    def _rollback(self) -> None:
+        """Descarta a transação parcial do lote para que a nova tentativa não duplique eventos."""
+        try:
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.rollback()
+        except Exception as e:
+            log.error(f"Falha no rollback do lote: {e}")
+
+    def _close_day_if_needed(self) -> None:
+        """Na virada do dia, grava o resumo imutável do dia encerrado (após o flush dos eventos pendentes)."""
+        today = datetime.now().date()
+        if today == self._current_day:
+            return
+
+        closed_day, self._current_day = self._current_day, today
+        try:
+            assert self._conn is not None
+            with self._conn_lock:
+                save_day_summary(self._conn, compute_day_summary(self._conn, closed_day, self.backend))
+                self._conn.commit()
+            log.info(f"Resumo diário gravado: {closed_day}")
+        except Exception as e:
+            self._rollback()
+            log.error(f"Falha ao gravar resumo diário de {closed_day}: {e}")
+
     def _maybe_log_metrics(self) -> None:
         now = monotonic()
         if (now - self._last_metrics_log) < self._metrics_log_interval_seconds:
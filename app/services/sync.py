@@ -0,0 +1,340 @@
+import gzip
+import io
+import json
+import os
+import sqlite3
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Optional, Protocol
+
+from app.config.settings import SYNC_MAX_BATCH_BYTES
+from app.utils.logger import log
+
+CREATE_SYNC_WATERMARK_SQL = """
+    CREATE TABLE IF NOT EXISTS sync_watermark (
+        target TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL
+    )
+"""
+
+# Geração do banco do site: muda quando counts é zerado (os ids recomeçam em 1).
+CREATE_SYNC_EPOCH_SQL = """
+    CREATE TABLE IF NOT EXISTS sync_epoch (
+        epoch TEXT NOT NULL
+    )
+"""
+
+CREATE_SITE_COUNTS_SQL = """
+    CREATE TABLE IF NOT EXISTS site_counts (
+        site_id TEXT NOT NULL,
+        epoch TEXT NOT NULL DEFAULT '',
+        source_id INTEGER NOT NULL,
+        timestamp DATETIME NOT NULL,
+        direction TEXT NOT NULL,
+        object_id INTEGER NOT NULL,
+        PRIMARY KEY (site_id, epoch, source_id)
+    )
+"""
+
+CREATE_SITE_WATERMARK_SQL = """
+    CREATE TABLE IF NOT EXISTS site_watermark (
+        site_id TEXT NOT NULL,
+        epoch TEXT NOT NULL DEFAULT '',
+        last_id INTEGER NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (site_id, epoch)
+    )
+"""
+
+
+def reset_sync_state(conn: sqlite3.Connection) -> None:
+    """
+    Chamado ao zerar counts no banco do site: a marca d'água volta a 0 e a
+    próxima sincronização abre uma nova geração, para que os ids reaproveitados
+    não colidam com as linhas já consolidadas no central.
+    """
+    conn.execute(CREATE_SYNC_WATERMARK_SQL)
+    conn.execute("DELETE FROM sync_watermark")
+    conn.execute(CREATE_SYNC_EPOCH_SQL)
+    conn.execute("DELETE FROM sync_epoch")
+
+
+def _migrate_to_epochs(conn: sqlite3.Connection) -> None:
+    """Centrais criados antes das gerações: as linhas existentes ficam na geração ''."""
+    for table, create_sql in (("site_counts", CREATE_SITE_COUNTS_SQL), ("site_watermark", CREATE_SITE_WATERMARK_SQL)):
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if not columns or "epoch" in columns:
+            continue
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_pre_epoch")
+        conn.execute(create_sql)
+        names = ", ".join(columns)
+        conn.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_pre_epoch")
+        conn.execute(f"DROP TABLE {table}_pre_epoch")
+        log.info(f"Tabela {table} do central migrada para gerações de site.")
+
+
+def encode_batch(site_id: str, rows: list[tuple], epoch: str = "") -> bytes:
+    """Lote compactado: JSON {site_id, epoch, rows: [[id, timestamp, direction, object_id], ...]} em gzip."""
+    payload = {"site_id": site_id, "epoch": epoch, "rows": [list(row) for row in rows]}
+    return gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+class BatchTooLarge(ValueError):
+    """Lote acima de SYNC_MAX_BATCH_BYTES (compactado ou descompactado)."""
+
+
+def _decompress(data: bytes, max_bytes: int) -> bytes:
+    """Descompacta lendo no máximo `max_bytes` + 1 bytes: um gzip-bomba não chega a ser expandido."""
+    if len(data) > max_bytes:
+        raise BatchTooLarge(f"Lote compactado acima de {max_bytes} bytes")
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as stream:
+        raw = stream.read(max_bytes + 1)
+    if len(raw) > max_bytes:
+        raise BatchTooLarge(f"Lote descompactado acima de {max_bytes} bytes")
+    return raw
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _validate_row(index: int, row) -> tuple:
+    """[id, timestamp, direction, object_id] -> tupla pronta para o INSERT; ValueError se malformada."""
+    if not isinstance(row, list) or len(row) != 4:
+        raise ValueError(f"Linha {index}: esperado [id, timestamp, direction, object_id]")
+    source_id, timestamp, direction, object_id = row
+    if not _is_int(source_id) or not _is_int(object_id):
+        raise ValueError(f"Linha {index}: id e object_id devem ser inteiros")
+    if not isinstance(timestamp, str):
+        raise ValueError(f"Linha {index}: timestamp deve ser texto")
+    if direction not in ("IN", "OUT"):
+        raise ValueError(f"Linha {index}: direction deve ser IN ou OUT")
+    return source_id, timestamp, direction, object_id
+
+
+def decode_batch(data: bytes, max_bytes: int = SYNC_MAX_BATCH_BYTES) -> dict:
+    """Descompacta (com limite de tamanho) e valida um lote; qualquer problema de formato vira ValueError."""
+    try:
+        payload = json.loads(_decompress(data, max_bytes).decode("utf-8"))
+    except (OSError, EOFError) as e:
+        raise ValueError(f"Lote não é gzip válido: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Lote de sincronização inválido")
+    site_id, epoch, rows = payload.get("site_id"), payload.get("epoch", ""), payload.get("rows")
+    if not site_id or not isinstance(site_id, str) or not isinstance(epoch, str) or not isinstance(rows, list):
+        raise ValueError("Lote de sincronização inválido")
+    return {"site_id": site_id, "epoch": epoch, "rows": [_validate_row(i, row) for i, row in enumerate(rows)]}
+
+
+class CentralAggregator:
+    """
+    Banco central que consolida eventos de vários sites.
+
+    Cada linha é identificada por (site_id, epoch, source_id = id no banco do
+    site), então reenvios após falhas são ignorados (INSERT OR IGNORE) e o
+    merge custa proporcionalmente ao tamanho do lote. A geração (`epoch`) muda
+    quando o site zera counts, e os ids reaproveitados entram como linhas novas.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _migrate_to_epochs(conn)
+            conn.execute(CREATE_SITE_COUNTS_SQL)
+            conn.execute(CREATE_SITE_WATERMARK_SQL)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_site_counts_timestamp ON site_counts(timestamp)")
+
+    def ingest(self, data: bytes) -> dict:
+        """Aplica um lote compactado; retorna {site_id, received, inserted, last_id}."""
+        payload = decode_batch(data)
+        site_id, epoch, rows = payload["site_id"], payload["epoch"], payload["rows"]
+        with sqlite3.connect(self.db_path, timeout=5) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO site_counts (site_id, epoch, source_id, timestamp, direction, object_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(site_id, epoch, *row) for row in rows],
+            )
+            inserted = conn.total_changes - before
+            if rows:
+                conn.execute(
+                    """
+                    INSERT INTO site_watermark (site_id, epoch, last_id, updated_at)
+                    VALUES (?, ?, ?, datetime('now'))
+                    ON CONFLICT(site_id, epoch) DO UPDATE SET
+                        last_id = MAX(last_id, excluded.last_id),
+                        updated_at = excluded.updated_at
+                    """,
+                    (site_id, epoch, max(row[0] for row in rows)),
+                )
+        return {
+            "site_id": site_id,
+            "epoch": epoch,
+            "received": len(rows),
+            "inserted": inserted,
+            "last_id": self.watermark(site_id, epoch),
+        }
+
+    def watermark(self, site_id: str, epoch: Optional[str] = None) -> int:
+        """Último id consolidado do site na geração `epoch` (None = geração atualizada por último)."""
+        query = "SELECT last_id FROM site_watermark WHERE site_id = ?"
+        params: tuple = (site_id,)
+        if epoch is not None:
+            query += " AND epoch = ?"
+            params += (epoch,)
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(query + " ORDER BY updated_at DESC, rowid DESC LIMIT 1", params).fetchone()
+        return row[0] if row else 0
+
+    def ingest_directory(self, inbox: str | Path) -> int:
+        """Processa os lotes deixados por DirectoryTransport (em ordem) e os remove após o commit."""
+        ingested = 0
+        for path in sorted(Path(inbox).glob("*.json.gz")):
+            result = self.ingest(path.read_bytes())
+            ingested += result["inserted"]
+            path.unlink()
+        return ingested
+
+
+class SyncTransport(Protocol):
+    def send(self, data: bytes) -> dict:
+        """Entrega um lote; retorna o ack do agregador ({..., "last_id": int}) ou {} se assíncrono."""
+
+
+class LoopbackTransport:
+    """Entrega direta a um CentralAggregator no mesmo processo (testes e instalação única)."""
+
+    def __init__(self, aggregator: CentralAggregator) -> None:
+        self.aggregator = aggregator
+
+    def send(self, data: bytes) -> dict:
+        return self.aggregator.ingest(data)
+
+
+class DirectoryTransport:
+    """
+    Grava cada lote como arquivo em uma pasta compartilhada (rsync, SMB, pendrive...).
+
+    A escrita é atômica (arquivo temporário + rename); o central consome com
+    `CentralAggregator.ingest_directory`.
+    """
+
+    def __init__(self, outbox: str | Path) -> None:
+        self.outbox = Path(outbox)
+        self.outbox.mkdir(parents=True, exist_ok=True)
+
+    def send(self, data: bytes) -> dict:
+        payload = decode_batch(data)
+        first_id, last_id = payload["rows"][0][0], payload["rows"][-1][0]
+        name = f"{payload['site_id']}_{payload['epoch']}_{first_id:012d}_{last_id:012d}.json.gz"
+        tmp_path = self.outbox / f".{name}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.outbox / name)
+        return {"last_id": last_id}
+
+
+class HttpTransport:
+    """Envia lotes via POST para o endpoint `/sync/ingest` do agregador central, autenticado por `token`."""
+
+    def __init__(self, url: str, token: str = "", timeout: float = 10.0) -> None:
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, data: bytes) -> dict:
+        headers = {"Content-Type": "application/gzip"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(self.url, data=data, method="POST", headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+
+class SyncAgent:
+    """
+    Envia apenas os eventos novos de `counts` de um site.
+
+    A marca d'água (último id confirmado) fica na tabela sync_watermark do
+    banco do site e só avança após o ack do transporte; uma falha no meio do
+    envio reenvia o lote, que o agregador descarta como duplicado.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        site_id: str,
+        transport: SyncTransport,
+        batch_size: int = 5000,
+        target: str = "central",
+    ) -> None:
+        if not site_id:
+            raise ValueError("site_id é obrigatório para sincronização")
+        self.db_path = str(db_path)
+        self.site_id = site_id
+        self.transport = transport
+        self.batch_size = batch_size
+        self.target = target
+        self.bytes_sent = 0
+        self.epoch: Optional[str] = None
+
+    def _epoch(self, conn: sqlite3.Connection) -> str:
+        """Geração atual do banco do site; criada na primeira sincronização e após cada reset."""
+        conn.execute(CREATE_SYNC_EPOCH_SQL)
+        row = conn.execute("SELECT epoch FROM sync_epoch").fetchone()
+        if row:
+            return row[0]
+        epoch = uuid.uuid4().hex[:12]
+        conn.execute("INSERT INTO sync_epoch (epoch) VALUES (?)", (epoch,))
+        conn.commit()
+        return epoch
+
+    def _watermark(self, conn: sqlite3.Connection) -> int:
+        conn.execute(CREATE_SYNC_WATERMARK_SQL)
+        row = conn.execute("SELECT last_id FROM sync_watermark WHERE target = ?", (self.target,)).fetchone()
+        return row[0] if row else 0
+
+    def run_once(self, max_batches: Optional[int] = None) -> int:
+        """Envia lotes até alcançar o último evento (ou `max_batches`); retorna as linhas enviadas."""
+        sent = 0
+        batches = 0
+        with sqlite3.connect(self.db_path, timeout=5) as conn:
+            epoch = self.epoch = self._epoch(conn)
+            last_id = self._watermark(conn)
+            while max_batches is None or batches < max_batches:
+                rows = conn.execute(
+                    """
+                    SELECT id, timestamp, direction, object_id
+                    FROM counts
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (last_id, self.batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+
+                data = encode_batch(self.site_id, rows, epoch)
+                ack = self.transport.send(data)
+                acked_id = int(ack.get("last_id", rows[-1][0]))
+                if acked_id < rows[-1][0]:
+                    raise RuntimeError(f"Ack incompleto do agregador: {acked_id} < {rows[-1][0]}")
+
+                last_id = rows[-1][0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_watermark (target, last_id) VALUES (?, ?)",
+                    (self.target, last_id),
+                )
+                conn.commit()
+                self.bytes_sent += len(data)
+                sent += len(rows)
+                batches += 1
+
+        if sent:
+            log.info(f"Sincronização {self.site_id}: {sent} evento(s) enviados até id {last_id}")
+        return sent
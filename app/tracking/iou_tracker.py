@@ -0,0 +1,159 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Matriz de IoU (N x M) entre dois conjuntos de boxes xyxy, totalmente vetorizada."""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0).astype(np.float32)
+
+
+def greedy_match(iou: np.ndarray, min_iou: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Associação gulosa pelo maior IoU.
+
+    Para câmeras fixas com poucas pessoas por frame o resultado é praticamente
+    idêntico ao húngaro, com custo bem menor e sem depender de scipy.
+    """
+    if iou.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    rows, cols = np.nonzero(iou >= min_iou)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows = np.zeros(iou.shape[0], dtype=bool)
+    used_cols = np.zeros(iou.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for r, c in zip(rows[order], cols[order]):
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = True
+        used_cols[c] = True
+        matched_rows.append(r)
+        matched_cols.append(c)
+    return np.asarray(matched_rows, dtype=np.intp), np.asarray(matched_cols, dtype=np.intp)
+
+
+class IoUTracker:
+    """
+    Rastreador leve em NumPy no estilo ByteTrack para câmeras fixas.
+
+    - Movimento: filtro alfa-beta (Kalman simplificado) sobre as coordenadas xyxy.
+    - Associação em duas etapas: detecções de alta confiança primeiro e,
+      para os tracks restantes, detecções de baixa confiança.
+    - Sem compensação de movimento de câmera nem ReID (desnecessários em câmera fixa).
+    """
+
+    def __init__(
+        self,
+        high_conf: float = 0.5,
+        low_conf: float = 0.1,
+        match_iou: float = 0.3,
+        low_match_iou: float = 0.5,
+        max_age: int = 30,
+        alpha: float = 0.7,
+        beta: float = 0.2,
+    ) -> None:
+        """
+        :param high_conf: Confiança mínima para a primeira associação e para abrir novos tracks
+        :param low_conf: Confiança mínima para a segunda associação (recuperação de oclusões)
+        :param match_iou: IoU mínimo na associação de alta confiança
+        :param low_match_iou: IoU mínimo na associação de baixa confiança
+        :param max_age: Número de atualizações sem associação antes de descartar o track
+        :param alpha: Ganho de posição do filtro alfa-beta
+        :param beta: Ganho de velocidade do filtro alfa-beta
+        """
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_age = max_age
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+
+    def reset(self) -> None:
+        self._boxes = np.empty((0, 4), dtype=np.float32)
+        self._velocity = np.empty((0, 4), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._misses = np.empty(0, dtype=np.int32)
+        self._confs = np.empty(0, dtype=np.float32)
+        self._next_id = 1
+
+    @property
+    def active_tracks(self) -> int:
+        return len(self._ids)
+
+    def update(self, boxes: np.ndarray, confs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Associa as detecções do frame aos tracks existentes.
+
+        :param boxes: Array (N, 4) xyxy das detecções
+        :param confs: Array (N,) de confiança
+        :return: (boxes, ids, confs) dos tracks associados neste frame
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        confs = np.asarray(confs, dtype=np.float32).reshape(-1)
+
+        predicted = self._boxes + self._velocity
+        matched = np.zeros(len(self._ids), dtype=bool)
+        # Tracks sem associação ficam com a própria predição: resíduo exatamente zero.
+        measured = predicted.copy()
+        matched_confs = self._confs.copy()
+
+        high = np.flatnonzero(confs >= self.high_conf)
+        low = np.flatnonzero((confs >= self.low_conf) & (confs < self.high_conf))
+
+        track_rows, det_rows = greedy_match(iou_matrix(predicted, boxes[high]), self.match_iou)
+        matched[track_rows] = True
+        measured[track_rows] = boxes[high[det_rows]]
+        matched_confs[track_rows] = confs[high[det_rows]]
+        unmatched_high = np.setdiff1d(np.arange(len(high)), det_rows, assume_unique=True)
+
+        remaining = np.flatnonzero(~matched)
+        track_rows, det_rows = greedy_match(iou_matrix(predicted[remaining], boxes[low]), self.low_match_iou)
+        matched[remaining[track_rows]] = True
+        measured[remaining[track_rows]] = boxes[low[det_rows]]
+        matched_confs[remaining[track_rows]] = confs[low[det_rows]]
+
+        residual = measured - predicted
+        self._boxes = predicted + self.alpha * residual
+        self._velocity = self._velocity + self.beta * residual
+        self._misses = np.where(matched, 0, self._misses + 1).astype(np.int32)
+        self._confs = matched_confs
+
+        keep = self._misses <= self.max_age
+        out_mask = matched.copy()
+        self._drop_lost(keep)
+        out_mask = out_mask[keep]
+
+        new_boxes = boxes[high[unmatched_high]]
+        new_confs = confs[high[unmatched_high]]
+        new_ids = np.arange(self._next_id, self._next_id + len(new_boxes), dtype=np.int64)
+        self._next_id += len(new_boxes)
+
+        self._boxes = np.concatenate([self._boxes, new_boxes])
+        self._velocity = np.concatenate([self._velocity, np.zeros_like(new_boxes)])
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._misses = np.concatenate([self._misses, np.zeros(len(new_ids), dtype=np.int32)])
+        self._confs = np.concatenate([self._confs, new_confs])
+        out_mask = np.concatenate([out_mask, np.ones(len(new_ids), dtype=bool)])
+
+        return self._boxes[out_mask].copy(), self._ids[out_mask].copy(), self._confs[out_mask].copy()
+
+    def _drop_lost(self, keep: np.ndarray) -> None:
+        self._boxes = self._boxes[keep]
+        self._velocity = self._velocity[keep]
+        self._ids = self._ids[keep]
+        self._misses = self._misses[keep]
+        self._confs = self._confs[keep]
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from app.utils.arrays import as_numpy
+
+
+@dataclass(frozen=True, eq=False)
+class TrackBatch:
+    """
+    Saída compacta do estágio de rastreamento para um frame.
+
+    Arrays NumPy contíguos (boxes xyxy, ids e confianças) consumidos por
+    contador, overlay e armazenamento. A conversão tensor -> NumPy ocorre
+    uma única vez, e o objeto `Results` do Ultralytics pode ser descartado
+    logo em seguida.
+    """
+
+    boxes: np.ndarray
+    ids: Optional[np.ndarray]
+    confs: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "TrackBatch":
+        return cls(
+            boxes=np.empty((0, 4), dtype=np.float32),
+            ids=None,
+            confs=np.empty(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_arrays(cls, boxes: Any, ids: Any, confs: Any) -> "TrackBatch":
+        return cls(
+            boxes=np.ascontiguousarray(boxes, dtype=np.float32).reshape(-1, 4),
+            ids=None if ids is None else np.ascontiguousarray(ids, dtype=np.int64).reshape(-1),
+            confs=np.ascontiguousarray(confs, dtype=np.float32).reshape(-1),
+        )
+
+    @classmethod
+    def from_results(cls, results: Any) -> "TrackBatch":
+        """Converte um `Results` do Ultralytics (ou compatível) em TrackBatch."""
+        if results is None or not results.boxes:
+            return cls.empty()
+
+        boxes = results.boxes
+        ids = getattr(boxes, "id", None)
+        confs = getattr(boxes, "conf", None)
+        xyxy = as_numpy(boxes.xyxy)
+        return cls.from_arrays(
+            xyxy,
+            None if ids is None else as_numpy(ids),
+            np.ones(len(xyxy), dtype=np.float32) if confs is None else as_numpy(confs),
+        )
+
+    @property
+    def has_ids(self) -> bool:
+        return self.ids is not None and len(self.ids) == len(self.boxes)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
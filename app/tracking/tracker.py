@@ -1,40 +1,84 @@
-from typing import Any, Protocol
+from typing import Any, Optional, Protocol
+
+from app.config.settings import TRACKER_CONFIG
+from app.tracking.track_batch import TrackBatch
+
+NATIVE_TRACKER = "native"
+
 
 class DetectorProtocol(Protocol):
     def track(self, frame: Any, tracker: str, conf: float, iou: float) -> Any:
         ...
 
+    def detect(self, frame: Any, conf: Optional[float] = None) -> Any:
+        ...
+
 
 class PersonTracker:
     """
     Rastreador de pessoas usando BOT-SORT com YOLO.
     Mantém IDs consistentes mesmo em sobreposição ou movimento rápido.
+
+    Com `tracker_config="native"`, usa o `IoUTracker` em NumPy sobre as saídas
+    de `detector.detect`, dispensando CMC/ReID do BoT-SORT em câmeras fixas.
     """
 
 
-    def __init__(self, tracker_config: str = "botsort.yaml", conf: float = 0.3, iou: float = 0.5):
+    def __init__(self, tracker_config: str = TRACKER_CONFIG, conf: float = 0.3, iou: float = 0.5):
         """
-        :param tracker_config: Arquivo de configuração do BOT-SORT
+        :param tracker_config: Arquivo de configuração do BOT-SORT ou "native"
         :param conf: Limite mínimo de confiança para considerar detecção
         :param iou: Limite de IOU para associar boxes entre frames
         """
         self.tracker_type = tracker_config
         self.conf = conf
         self.iou = iou
+        self._native = None
+        if tracker_config == NATIVE_TRACKER:
+            from app.tracking.iou_tracker import IoUTracker
+
+            self._native = IoUTracker(high_conf=conf)
 
 
-    def update(self, detector: DetectorProtocol, frame: Any) -> Any:
+    def update(self, detector: DetectorProtocol, frame: Any) -> TrackBatch:
         """
         Atualiza o rastreamento de pessoas no frame atual.
 
         :param detector: Instância compatível com DetectorProtocol
         :param frame: Frame atual (BGR)
-        :return: Resultados do rastreador para o frame
+        :return: TrackBatch compacto; o `Results` do Ultralytics é descartado aqui
         """
+        if self._native is not None:
+            detections = detector.detect(frame, conf=self._native.low_conf)
+            return self._update_native(detections)
+
         result = detector.track(
             frame,
             tracker=self.tracker_type,
             conf=self.conf,      # Confiança mínima
             iou=self.iou,        # Sobreposição mínima para manter IDs
         )
-        return result
+        return TrackBatch.from_results(result)
+
+    @property
+    def supports_batch(self) -> bool:
+        """Só o tracker nativo separa detecção (em lote) de associação (sequencial)."""
+        return self._native is not None
+
+    def update_batch(self, detector: DetectorProtocol, frames: list) -> list[TrackBatch]:
+        """
+        Atualiza o rastreamento para vários frames consecutivos de uma fonte.
+
+        Com o tracker nativo, a detecção roda em um único forward
+        (`detector.detect_batch`) e a associação segue frame a frame, em ordem.
+        O BoT-SORT do Ultralytics trata um lote como fontes distintas, então
+        nesse caso (ou sem `detect_batch`) cai para `update` por frame.
+        """
+        if self._native is None or not hasattr(detector, "detect_batch"):
+            return [self.update(detector, frame) for frame in frames]
+        detections = detector.detect_batch(frames, conf=self._native.low_conf)
+        return [self._update_native(result) for result in detections]
+
+    def _update_native(self, detections: Any) -> TrackBatch:
+        detected = TrackBatch.from_results(detections)
+        return TrackBatch.from_arrays(*self._native.update(detected.boxes, detected.confs))
@@ -1,12 +1,16 @@
 import os
 from datetime import datetime, timedelta
 
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+from app.analytics.statistics import StatsAnalyzer
 from app.services.counts_repository import CountsRepository
-from app.services.dashboard_reporting import build_insight, compute_kpis, generate_pdf_report
+from app.config.settings import LIVE_STATE_MAX_AGE_SECONDS, LIVE_STATE_PATH
+from app.services.database import create_backend
+from app.services.live_state import LiveStateReader
+# Só texto; PDF (fpdf/kaleido), plotly e pandas são importados quando um relatório, gráfico ou tabela é pedido.
+from app.services.dashboard_reporting import build_insight, hourly_chart_data
+from app.services.report_jobs import ReportJobQueue
 
 
 st.set_page_config(
@@ -17,34 +21,78 @@ st.set_page_config(
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(os.path.dirname(CURRENT_DIR))
-DB_PATH = os.path.join(ROOT_DIR, "data", "PeopleFlowMonitor.db")
 DOCS_DIR = os.path.join(ROOT_DIR, "docs")
 os.makedirs(DOCS_DIR, exist_ok=True)
-COUNTS_REPO = CountsRepository(DB_PATH)
+BACKEND = create_backend()
+COUNTS_REPO = CountsRepository(backend=BACKEND)
+STATS = StatsAnalyzer(backend=BACKEND)
+LIVE_STATE = LiveStateReader(LIVE_STATE_PATH)
 
 
-def get_data(start_dt: datetime, end_dt: datetime):
-    if not os.path.exists(DB_PATH):
-        return pd.DataFrame(columns=["direction", "timestamp"]), "Arquivo nao encontrado"
+def get_raw_page(start_dt: datetime, end_dt: datetime, direction, before, page_size: int):
+    """Uma página de eventos brutos (keyset no banco); só as linhas visíveis saem do banco."""
+    if not BACKEND.is_available():
+        return None, "Arquivo nao encontrado"
 
     try:
-        df = COUNTS_REPO.fetch_counts_between(start_dt, end_dt)
-        if df.empty:
-            return df, "Banco vazio"
-
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-        df = df.dropna(subset=["timestamp"])
-        df["data_referencia"] = df["timestamp"].dt.date
-        return df, "Conectado"
+        return COUNTS_REPO.fetch_page(start_dt, end_dt, direction, before, page_size), "Conectado"
     except Exception as e:
-        return pd.DataFrame(columns=["direction", "timestamp"]), f"Erro: {str(e)}"
-
-
-def render_kpi_block(df_filtered, ativar_limite: bool, limit_val):
-    kpis = compute_kpis(df_filtered)
-    in_total = kpis["in_total"]
-    out_total = kpis["out_total"]
-    current_occ = kpis["occupancy"]
+        return None, f"Erro: {str(e)}"
+
+
+def render_raw_log(day):
+    """Logs brutos paginados: filtros de direção/horário e navegação por cursor guardada na sessão."""
+    col_dir, col_hours, col_size = st.columns([1, 2, 1])
+    direction = col_dir.selectbox("Direcao", ["Todas", "IN", "OUT"])
+    hours = col_hours.slider("Horario", 0, 24, (0, 24))
+    page_size = col_size.selectbox("Linhas por pagina", [50, 100, 250], index=1)
+
+    start_dt = datetime.combine(day, datetime.min.time()) + timedelta(hours=hours[0])
+    end_dt = datetime.combine(day, datetime.min.time()) + timedelta(hours=hours[1])
+    filters = (day, direction, hours, page_size)
+    # Pilha de cursores: o topo é o início da página atual (None = mais recentes); zera se os filtros mudarem.
+    if st.session_state.get("raw_log_filters") != filters:
+        st.session_state["raw_log_filters"] = filters
+        st.session_state["raw_log_cursors"] = [None]
+    cursors = st.session_state["raw_log_cursors"]
+
+    page, status = get_raw_page(start_dt, end_dt, None if direction == "Todas" else direction, cursors[-1], page_size)
+    if page is None:
+        st.warning(f"Status da Conexao: {status}")
+        return
+
+    import pandas as pd
+
+    st.dataframe(
+        pd.DataFrame(page.rows, columns=["id", "timestamp", "direction", "object_id"]),
+        use_container_width=True,
+        hide_index=True,
+    )
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button("Mais recentes", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    col_info.caption(f"Pagina {len(cursors)} | {len(page.rows)} evento(s)")
+    if col_next.button("Mais antigos", disabled=not page.has_more):
+        cursors.append(page.next_cursor)
+        st.rerun()
+
+
+def get_summary(day):
+    """Resumo do dia: dias fechados vêm do cache day_summary, o dia atual de occupancy_minute."""
+    if not BACKEND.is_available():
+        return None, "Arquivo nao encontrado"
+
+    summary = STATS.get_day_summary(day)
+    return summary, ("Conectado" if summary.total else "Banco vazio")
+
+
+def render_kpi_block(summary, ativar_limite: bool, limit_val, live=None):
+    """KPIs do resumo; com `live` (pipeline ativo), totais e ocupação vêm dos contadores ao vivo."""
+    kpis = summary.kpis()
+    in_total = live.in_count if live else kpis["in_total"]
+    out_total = live.out_count if live else kpis["out_total"]
+    current_occ = live.occupancy if live else kpis["occupancy"]
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Entradas Totais", f"{in_total}")
@@ -61,6 +109,8 @@ def render_kpi_block(df_filtered, ativar_limite: bool, limit_val):
         c3.metric("Ocupacao Atual", f"{current_occ}", delta=delta_msg)
 
     c4.metric("Media Mov./Hora", f"{kpis['avg_h']}")
+    if live:
+        st.caption(f"Ao vivo: {live.active_tracks} pessoa(s) rastreada(s) | heartbeat há {live.age():.1f}s")
 
 
 st.sidebar.title("Filtros e BI")
@@ -69,78 +119,106 @@ ativar_limite = st.sidebar.toggle("Habilitar Controle de Capacidade", value=Fals
 limit_val = st.sidebar.number_input("Limite de Pessoas", min_value=1, value=50) if ativar_limite else None
 live_kpi_interval = 5
 
-period_start = datetime.combine(date_selected, datetime.min.time())
-period_end = period_start + timedelta(days=1)
+@st.cache_resource
+def get_report_queue() -> ReportJobQueue:
+    """Um pool de workers de relatório por servidor Streamlit, compartilhado entre sessões."""
+    return ReportJobQueue(backend=BACKEND, output_dir=DOCS_DIR)
 
+
+st.sidebar.markdown("---")
+report_period = st.sidebar.date_input("Periodo do Relatorio", (date_selected, date_selected))
 if st.sidebar.button("Gerar Relatorio Executivo"):
-    df_all, _ = get_data(period_start, period_end)
-    df_f = df_all[df_all["data_referencia"] == date_selected].copy()
-    if not df_f.empty:
-        df_f["Hora"] = df_f["timestamp"].dt.hour
-        chart_data = df_f.groupby(["Hora", "direction"]).size().reset_index(name="Qtde")
-        fig_pdf = px.bar(
-            chart_data,
-            x="Hora",
-            y="Qtde",
-            color="direction",
-            barmode="group",
-            color_discrete_map={"IN": "#18345A", "OUT": "#A4B0BE"},
-            template="plotly_white",
-        )
-        with st.spinner("Construindo documento..."):
-            try:
-                res = generate_pdf_report(df_f, date_selected, fig_pdf, limit_val, DOCS_DIR)
-                if res:
-                    st.sidebar.success("Relatorio Pronto")
-            except Exception as e:
-                st.sidebar.error(f"Erro no PDF: {e}")
-    else:
-        st.sidebar.warning("Sem dados para esta data.")
+    period = tuple(report_period) if isinstance(report_period, (tuple, list)) else (report_period,)
+    report_start, report_end = (period[0], period[-1]) if period else (date_selected, date_selected)
+    try:
+        batch_id = get_report_queue().submit(report_start, report_end, limit_val)
+        st.session_state.setdefault("report_batches", []).insert(0, batch_id)
+    except Exception as e:
+        st.sidebar.error(f"Erro ao enfileirar relatorio: {e}")
+
+
+def render_report_jobs():
+    """Andamento dos relatórios pedidos nesta sessão; os PDFs são gerados pelos workers em segundo plano."""
+    for batch_id in st.session_state.get("report_batches", [])[:3]:
+        status = get_report_queue().batch_status(batch_id)
+        if status is None:
+            continue
+        first, last = status["jobs"][0]["day"], status["jobs"][-1]["day"]
+        label = first if first == last else f"{first} a {last}"
+        st.progress(status["finished"] / status["total"], text=f"Relatorio {label}")
+        if status["finished"] == status["total"]:
+            st.caption(f"{status['done']} PDF(s) em docs/ | {status['empty']} sem dados | {status['failed']} com erro")
+
+
+if st.session_state.get("report_batches"):
+    with st.sidebar:
+        if hasattr(st, "fragment"):
+            st.fragment(run_every="2s")(render_report_jobs)()
+        else:
+            render_report_jobs()
 
 
 st.title("📊 PeopleFlowMonitor")
 st.markdown(f"Painel de BI - Data: **{date_selected.strftime('%d/%m/%Y')}**")
 
-df_all, status = get_data(period_start, period_end)
+summary, status = get_summary(date_selected)
 
-if not df_all.empty:
-    df_filtered = df_all.copy()
-    st.info(build_insight(df_filtered))
+if summary is not None and summary.total:
+    st.info(build_insight(summary))
 
-    if not df_filtered.empty:
-        if hasattr(st, "fragment"):
-            @st.fragment(run_every=f"{int(live_kpi_interval)}s")
-            def _live_kpis():
-                fresh_df_all, _ = get_data(period_start, period_end)
-                fresh_df_filtered = fresh_df_all
-                if fresh_df_filtered.empty:
-                    st.info("Sem novos registros para atualizar KPIs.")
-                    return
-                render_kpi_block(fresh_df_filtered, ativar_limite, limit_val)
-
-            _live_kpis()
-        else:
-            render_kpi_block(df_filtered, ativar_limite, limit_val)
-
-        st.markdown("---")
-
-        df_filtered["Hora"] = df_filtered["timestamp"].dt.hour
-        chart_data = df_filtered.groupby(["Hora", "direction"]).size().reset_index(name="Quantidade")
-        fig = px.bar(
-            chart_data,
-            x="Hora",
-            y="Quantidade",
-            color="direction",
-            barmode="group",
-            title="Mapa de Atividade por Faixa Horaria",
-            color_discrete_map={"IN": "#18345A", "OUT": "#A4B0BE"},
-            template="plotly_white",
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        with st.expander("Logs Brutos do Banco de Dados"):
-            st.dataframe(df_filtered.sort_values("timestamp", ascending=False), use_container_width=True)
+    if hasattr(st, "fragment") and date_selected == datetime.now().date():
+        @st.fragment(run_every=f"{int(live_kpi_interval)}s")
+        def _live_kpis():
+            fresh_summary, _ = get_summary(date_selected)
+            if fresh_summary is None or not fresh_summary.total:
+                st.info("Sem novos registros para atualizar KPIs.")
+                return
+            live = LIVE_STATE.read_fresh(LIVE_STATE_MAX_AGE_SECONDS)
+            render_kpi_block(fresh_summary, ativar_limite, limit_val, live)
+
+        _live_kpis()
     else:
-        st.info(f"Nenhum registro encontrado para {date_selected.strftime('%d/%m/%Y')}.")
+        render_kpi_block(summary, ativar_limite, limit_val)
+
+    st.markdown("---")
+
+    import pandas as pd
+    import plotly.express as px
+
+    chart_data = hourly_chart_data(summary, "Quantidade")
+    fig = px.bar(
+        chart_data,
+        x="Hora",
+        y="Quantidade",
+        color="direction",
+        barmode="group",
+        title="Mapa de Atividade por Faixa Horaria",
+        color_discrete_map={"IN": "#18345A", "OUT": "#A4B0BE"},
+        template="plotly_white",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    occupancy_curve = pd.DataFrame(STATS.get_occupancy_index(date_selected).curve())
+    if date_selected == datetime.now().date():
+        occupancy_curve = occupancy_curve[occupancy_curve["minute"] <= datetime.now().strftime("%H:%M")]
+    fig_occ = px.line(
+        occupancy_curve,
+        x="minute",
+        y="occupancy",
+        title="Ocupacao ao Longo do Dia",
+        labels={"minute": "Horario", "occupancy": "Pessoas"},
+        template="plotly_white",
+    )
+    fig_occ.update_traces(line_color="#18345A", line_shape="hv")
+    if ativar_limite:
+        fig_occ.add_hline(y=limit_val, line_dash="dash", line_color="#C0392B")
+    st.plotly_chart(fig_occ, use_container_width=True)
+
+    with st.expander("Logs Brutos do Banco de Dados"):
+        # Eventos brutos só são lidos sob demanda, uma página por vez; KPIs e gráficos usam os resumos.
+        if st.toggle("Carregar eventos do dia", value=False):
+            render_raw_log(date_selected)
+elif summary is not None:
+    st.info(f"Nenhum registro encontrado para {date_selected.strftime('%d/%m/%Y')}.")
 else:
     st.warning(f"Status da Conexao: {status}")
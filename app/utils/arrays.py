@@ -0,0 +1,10 @@
+from typing import Any
+
+import numpy as np
+
+
+def as_numpy(value: Any) -> np.ndarray:
+    """Converte tensores (torch/ultralytics) ou sequências para ndarray sem cópias desnecessárias."""
+    if hasattr(value, "cpu"):
+        value = value.cpu().numpy()
+    return np.asarray(value)
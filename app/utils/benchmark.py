@@ -0,0 +1,52 @@
+from statistics import mean
+from typing import Iterator, Optional, Sequence
+
+from app.core.enums import Direction
+
+
+class NullStorage:
+    """Storage descartável para benchmarks: mantém os eventos em memória sem tocar no banco."""
+
+    def __init__(self) -> None:
+        self.saved_events: list[tuple[str, int]] = []
+
+    def save_count(self, direction: str, object_id: int) -> None:
+        self.saved_events.append((direction, object_id))
+
+
+ZERO_COUNTS = {Direction.IN.value: 0, Direction.OUT.value: 0}
+
+
+def iter_clip_frames(source: str | int, max_frames: Optional[int] = None) -> Iterator:
+    """Itera os frames de um vídeo/câmera até o fim ou até `max_frames`."""
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Não foi possível abrir a fonte de vídeo: {source}")
+    try:
+        produced = 0
+        while max_frames is None or produced < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            produced += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+def summarize_latencies(latencies_s: Sequence[float]) -> dict:
+    """Resume latências por frame (segundos) em FPS médio, média e p95 em milissegundos."""
+    if not latencies_s:
+        return {"frames": 0, "fps": 0.0, "mean_ms": 0.0, "p95_ms": 0.0}
+
+    ordered = sorted(latencies_s)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    total = sum(latencies_s)
+    return {
+        "frames": len(latencies_s),
+        "fps": round(len(latencies_s) / total, 2) if total > 0 else 0.0,
+        "mean_ms": round(mean(latencies_s) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+    }
@@ -1,5 +1,17 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+# Formato uniforme: [DATA HORA] [NÍVEL] Mensagem
+_CONSOLE_FORMAT = '[%(asctime)s] [%(levelname)s] %(message)s'
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 
 class SafeStreamHandler(logging.StreamHandler):
     """Stream handler que evita falha de encoding em consoles legados."""
@@ -8,9 +20,10 @@ class SafeStreamHandler(logging.StreamHandler):
         try:
             msg = self.format(record)
             stream = self.stream
-            encoding = getattr(stream, "encoding", None) or "utf-8"
-            safe_msg = msg.encode(encoding, errors="replace").decode(encoding, errors="replace")
-            stream.write(safe_msg + self.terminator)
+            encoding = (getattr(stream, "encoding", None) or "utf-8").lower()
+            if encoding.replace("-", "") != "utf8":
+                msg = msg.encode(encoding, errors="replace").decode(encoding, errors="replace")
+            stream.write(msg + self.terminator)
             self.flush()
         except Exception:
             self.handleError(record)
@@ -29,18 +42,162 @@ def setup_logger(name: str = "PeopleFlowMonitor", level: int = logging.INFO) ->
     if not logger.handlers:
         logger.setLevel(level)
 
-        # Formato uniforme: [DATA HORA] [NÍVEL] Mensagem
-        formatter = logging.Formatter(
-            '[%(asctime)s] [%(levelname)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        formatter = logging.Formatter(_CONSOLE_FORMAT, datefmt=_DATE_FORMAT)
 
         console_handler = SafeStreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
         logger.addHandler(console_handler)
 
-        # Possível extensão futura: FileHandler, RotatingFileHandler etc.
+        # Fila assíncrona, limite por chave e arquivo JSON-lines: ver configure_logging.
+
+    return logger
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita mensagens repetidas: no máximo `burst` registros por chave a cada
+    `window` segundos. A chave é o template da mensagem (`record.msg`, antes
+    da formatação) ou `extra={"log_key": ...}`; com formatação preguiçosa
+    (`log.info("... %s", valor)`) todas as repetições caem na mesma chave.
+
+    O total suprimido é anexado ao primeiro registro aceito na janela seguinte.
+    """
+
+    def __init__(self, burst: int = 20, window: float = 10.0, clock=time.monotonic) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        # chave -> [início da janela, aceitos na janela, suprimidos desde o último aceito]
+        self._windows: dict = {}
+        self.max_keys = 1024
+
+    def _prune(self, now: float) -> None:
+        """Descarta janelas expiradas (mensagens com f-string geram uma chave por valor)."""
+        self._windows = {k: v for k, v in self._windows.items() if now - v[0] < self.window}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        msg_key = getattr(record, "log_key", record.msg)
+        if not isinstance(msg_key, str):
+            msg_key = str(msg_key)
+        key = (record.levelno, msg_key)
+        now = self._clock()
+        with self._lock:
+            if len(self._windows) > self.max_keys:
+                self._prune(now)
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif state[1] < self.burst:
+                state[1] += 1
+                suppressed, state[2] = state[2], 0
+            else:
+                state[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Formato do console acrescido do aviso de mensagens suprimidas pelo RateLimitFilter."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (+{suppressed} suprimidas)" if suppressed else text
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Um objeto JSON compacto por linha: ts, level, msg (+ suppressed/exc quando houver)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
 
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enfileira o registro sem formatá-lo: a montagem da mensagem (args, exceção)
+    fica para a thread do QueueListener, fora do loop de frames.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e encerra a thread de escrita (modo assíncrono)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(
+    logger: Optional[logging.Logger] = None,
+    async_mode: bool = False,
+    json_path: Optional[str] = None,
+    json_max_bytes: int = 10 * 1024 * 1024,
+    json_backups: int = 3,
+    rate_limit: int = 0,
+    rate_window: float = 10.0,
+) -> logging.Logger:
+    """
+    Reconfigura os destinos do logger do projeto.
+
+    :param async_mode: Escrita em uma thread de fundo (QueueHandler/QueueListener); o chamador só enfileira
+    :param json_path: Arquivo JSON-lines adicional, com rotação por tamanho
+    :param rate_limit: Máximo de registros por chave de mensagem a cada `rate_window` segundos (0 = sem limite)
+    :return: O logger reconfigurado
+    """
+    global _listener
+    logger = logger or log
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    for existing in [f for f in logger.filters if isinstance(f, RateLimitFilter)]:
+        logger.removeFilter(existing)
+
+    console_handler = SafeStreamHandler(sys.stdout)
+    console_handler.setFormatter(SuppressedCountFormatter(_CONSOLE_FORMAT, datefmt=_DATE_FORMAT))
+    handlers: list[logging.Handler] = [console_handler]
+    if json_path:
+        file_handler = RotatingFileHandler(
+            json_path, maxBytes=json_max_bytes, backupCount=json_backups, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    if rate_limit > 0:
+        logger.addFilter(RateLimitFilter(burst=rate_limit, window=rate_window))
+
+    if async_mode:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logger.addHandler(DeferredQueueHandler(log_queue))
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     return logger
 
+
+atexit.register(stop_logging)
+
 log = setup_logger()
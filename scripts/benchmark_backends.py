@@ -0,0 +1,68 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.analytics.counter import StreamCounter
+from app.detection.yolo_detector import YOLODetector
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import NullStorage, ZERO_COUNTS, iter_clip_frames, summarize_latencies
+from app.utils.logger import log
+
+
+def run_backend(clip: str, backend: str, imgsz: int, int8: bool, max_frames: int | None) -> dict:
+    """Processa o clipe com um backend e retorna FPS, latências e contagens finais."""
+    detector = YOLODetector(backend=backend, imgsz=imgsz, int8=int8)
+    tracker = PersonTracker()
+    counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS))
+
+    latencies = []
+    in_c, out_c = 0, 0
+    for frame in iter_clip_frames(clip, max_frames):
+        started = perf_counter()
+        batch = tracker.update(detector, frame)
+        in_c, out_c = counter.count(batch, frame.shape)
+        latencies.append(perf_counter() - started)
+
+    summary = summarize_latencies(latencies)
+    summary.update({"backend": backend, "imgsz": imgsz, "int8": int8, "in": in_c, "out": out_c})
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara backends de inferência do YOLODetector em um clipe gravado.")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "openvino"])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true", help="Inclui variantes INT8 dos backends exportados")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    configs = [(backend, False) for backend in args.backends]
+    if args.int8:
+        configs += [(backend, True) for backend in args.backends if backend != "torch"]
+
+    rows = []
+    for backend, int8 in configs:
+        log.info(f"Benchmark | backend={backend} int8={int8} imgsz={args.imgsz}")
+        rows.append(run_backend(args.clip, backend, args.imgsz, int8, args.max_frames))
+
+    baseline = next((r for r in rows if r["backend"] == "torch" and not r["int8"]), None)
+    print(f"{'backend':<10} {'int8':<5} {'fps':>8} {'mean_ms':>9} {'p95_ms':>8} {'IN':>5} {'OUT':>5} {'erro':>6}")
+    for row in rows:
+        error = "-"
+        if baseline is not None:
+            error = abs(row["in"] - baseline["in"]) + abs(row["out"] - baseline["out"])
+        print(
+            f"{row['backend']:<10} {str(row['int8']):<5} {row['fps']:>8} {row['mean_ms']:>9} "
+            f"{row['p95_ms']:>8} {row['in']:>5} {row['out']:>5} {error:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+import tracemalloc
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+import cv2
+
+from app.core.capture import FrameSource
+
+
+def naive_steps(clip: str):
+    """Caminho anterior: `cap.read()` em todos os frames, alocando um array novo a cada leitura."""
+    cap = cv2.VideoCapture(clip)
+    try:
+        while True:
+            ret, _ = cap.read()
+            if not ret:
+                return
+            yield True
+    finally:
+        cap.release()
+
+
+def frame_source_steps(clip: str, skip_frames: int, headless: bool):
+    """FrameSource com anel pré-alocado; em headless, frames fora do ciclo de IA usam só `grab()`."""
+    source = FrameSource(clip)
+    source.open()
+    frame_nmr = 0
+    try:
+        while True:
+            if headless and frame_nmr % skip_frames != 0:
+                if not source.skip():
+                    return
+                yield False
+            else:
+                if source.read() is None:
+                    return
+                yield True
+            frame_nmr += 1
+    finally:
+        source.release()
+
+
+def measure(label: str, steps) -> None:
+    """Mede tempo e bytes alocados por frame (pico de tracemalloc em cada passo)."""
+    frames, decoded, allocated, elapsed = 0, 0, 0, 0.0
+    tracemalloc.start()
+    iterator = iter(steps)
+    while True:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = perf_counter()
+        try:
+            was_decoded = next(iterator)
+        except StopIteration:
+            break
+        elapsed += perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += max(0, peak - current)
+        frames += 1
+        decoded += int(was_decoded)
+    tracemalloc.stop()
+
+    frames = max(frames, 1)
+    print(
+        f"{label:<24} {frames:>7} {decoded:>9} "
+        f"{elapsed / frames * 1000:>9.3f} {allocated / frames / 1024:>13.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede custo de captura: leitura ingênua vs anel pré-alocado com grab().")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--skip-frames", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'caminho':<24} {'frames':>7} {'decodific':>9} {'ms/frame':>9} {'KiB/frame':>13}")
+    measure("cap.read() ingênuo", naive_steps(args.clip))
+    measure("anel pré-alocado", frame_source_steps(args.clip, args.skip_frames, False))
+    measure("anel + grab (headless)", frame_source_steps(args.clip, args.skip_frames, True))
+
+
+if __name__ == "__main__":
+    main()
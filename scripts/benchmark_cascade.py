@@ -0,0 +1,74 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.analytics.counter import StreamCounter
+from app.detection.cascade import CascadeDetector
+from app.detection.yolo_detector import YOLODetector
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import NullStorage, ZERO_COUNTS, iter_clip_frames, summarize_latencies
+from app.utils.logger import log
+
+
+def run(clip: str, detector, tracker_config: str, max_frames: int | None) -> dict:
+    """Processa o clipe e retorna FPS, latências e contagens finais."""
+    tracker = PersonTracker(tracker_config=tracker_config)
+    counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS))
+
+    latencies = []
+    in_c, out_c = 0, 0
+    for frame in iter_clip_frames(clip, max_frames):
+        started = perf_counter()
+        batch = tracker.update(detector, frame)
+        in_c, out_c = counter.count(batch, frame.shape)
+        latencies.append(perf_counter() - started)
+
+    summary = summarize_latencies(latencies)
+    summary.update({"in": in_c, "out": out_c})
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara o detector em cascata com o modelo pesado em todos os frames.")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--light-imgsz", type=int, default=320)
+    parser.add_argument("--heavy-imgsz", type=int, default=640)
+    parser.add_argument("--heavy-model", default=None, help="Pesos maiores para o estágio pesado (usa tracker native)")
+    parser.add_argument("--crowd", type=int, default=8, help="Pessoas no quadro que disparam a escalada")
+    parser.add_argument("--hold-frames", type=int, default=15)
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    tracker_config = "native" if args.heavy_model else "botsort.yaml"
+
+    def heavy_detector() -> YOLODetector:
+        if args.heavy_model:
+            return YOLODetector(model_path=args.heavy_model, imgsz=args.heavy_imgsz)
+        return YOLODetector(imgsz=args.heavy_imgsz)
+
+    log.info(f"Baseline | estágio pesado em todos os frames (imgsz={args.heavy_imgsz})")
+    baseline = run(args.clip, heavy_detector(), tracker_config, args.max_frames)
+
+    light = YOLODetector(imgsz=args.light_imgsz)
+    heavy = heavy_detector() if args.heavy_model else light.with_imgsz(args.heavy_imgsz)
+    cascade = CascadeDetector(light, heavy, crowd_threshold=args.crowd, hold_frames=args.hold_frames)
+    log.info(f"Cascata | leve imgsz={args.light_imgsz} -> pesado imgsz={args.heavy_imgsz}")
+    result = run(args.clip, cascade, tracker_config, args.max_frames)
+
+    print(f"{'modo':<10} {'fps':>8} {'mean_ms':>9} {'p95_ms':>8} {'IN':>5} {'OUT':>5} {'erro':>6} {'% pesado':>9}")
+    for label, row, heavy_ratio in (("pesado", baseline, 1.0), ("cascata", result, cascade.stats()["heavy_ratio"])):
+        error = abs(row["in"] - baseline["in"]) + abs(row["out"] - baseline["out"])
+        print(
+            f"{label:<10} {row['fps']:>8} {row['mean_ms']:>9} {row['p95_ms']:>8} "
+            f"{row['in']:>5} {row['out']:>5} {error:>6} {heavy_ratio * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
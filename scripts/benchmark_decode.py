@@ -0,0 +1,61 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import os
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.core.capture import FrameSource
+from app.core.shm_capture import SharedFrameSource
+from app.utils.logger import log
+
+
+def consume(sources, max_frames: int) -> int:
+    """Lê as fontes em rodízio (como um loop de inferência multi-câmera) até esgotar ou atingir `max_frames`."""
+    for source in sources:
+        if not source.open():
+            raise SystemExit(f"Não foi possível abrir: {source.source}")
+    frames = 0
+    active = list(sources)
+    try:
+        while active and frames < max_frames:
+            for source in list(active):
+                frame = source.read()
+                if frame is None:
+                    active.remove(source)
+                    continue
+                frames += 1
+    finally:
+        for source in sources:
+            source.release()
+    return frames
+
+
+def measure(label: str, sources, max_frames: int) -> None:
+    started = perf_counter()
+    frames = consume(sources, max_frames)
+    elapsed = perf_counter() - started
+    print(f"{label:<22} {len(sources):>7} {frames:>8} {frames / elapsed:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão de decodificação: mesmo processo vs workers com memória compartilhada.")
+    parser.add_argument("clips", nargs="+", help="Vídeos de referência (repetidos até --streams)")
+    parser.add_argument("--streams", type=int, default=4, help="Número de câmeras simuladas")
+    parser.add_argument("--max-frames", type=int, default=2000, help="Total de frames lidos por modo")
+    args = parser.parse_args()
+
+    log.disabled = True
+    clips = [args.clips[i % len(args.clips)] for i in range(args.streams)]
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    print(f"{'modo':<22} {'streams':>7} {'frames':>8} {'fps total':>10}")
+    measure("mesmo processo", [FrameSource(clip, ring_size=1) for clip in clips], args.max_frames)
+    measure("workers (shm)", [SharedFrameSource(clip) for clip in clips], args.max_frames)
+
+
+if __name__ == "__main__":
+    main()
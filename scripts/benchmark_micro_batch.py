@@ -0,0 +1,66 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.analytics.counter import StreamCounter
+from app.detection.yolo_detector import YOLODetector
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import NullStorage, ZERO_COUNTS, iter_clip_frames
+from app.utils.logger import log
+
+
+def run(clip: str, detector: YOLODetector, batch_size: int, max_frames: int | None) -> dict:
+    """Esvazia o clipe (backlog completo) em lotes de `batch_size` frames; contagem sempre em ordem."""
+    tracker = PersonTracker(tracker_config="native")
+    counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS))
+
+    frames = 0
+    elapsed = 0.0
+    in_c, out_c = 0, 0
+    pending = []
+    for frame in iter_clip_frames(clip, max_frames):
+        pending.append(frame)
+        if len(pending) < batch_size:
+            continue
+        started = perf_counter()
+        for item, batch in zip(pending, tracker.update_batch(detector, pending)):
+            in_c, out_c = counter.count(batch, item.shape)
+        elapsed += perf_counter() - started
+        frames += len(pending)
+        pending = []
+    if pending:
+        started = perf_counter()
+        for item, batch in zip(pending, tracker.update_batch(detector, pending)):
+            in_c, out_c = counter.count(batch, item.shape)
+        elapsed += perf_counter() - started
+        frames += len(pending)
+
+    return {"batch": batch_size, "frames": frames, "fps": frames / elapsed if elapsed else 0.0, "in": in_c, "out": out_c}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão ao esvaziar um backlog frame a frame vs em micro-lotes.")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    detector = YOLODetector()
+    rows = []
+    for batch_size in args.batches:
+        log.info(f"Benchmark | micro-lote de {batch_size} frame(s)")
+        rows.append(run(args.clip, detector, batch_size, args.max_frames))
+
+    print(f"{'lote':>5} {'frames':>7} {'fps':>8} {'IN':>5} {'OUT':>5}")
+    for row in rows:
+        print(f"{row['batch']:>5} {row['frames']:>7} {row['fps']:>8.1f} {row['in']:>5} {row['out']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+
+def run_child(source: str, background: bool) -> None:
+    """Modo filho: mede o tempo até a primeira contagem em um processo novo (sem caches de import)."""
+    from app.core.runtime import StartupTimer
+
+    timer = StartupTimer()
+
+    from app.analytics.counter import StreamCounter
+    from app.core.capture import FrameSource
+    from app.detection.cascade import create_detector
+    from app.detection.loader import BackgroundModelLoader
+    from app.tracking.tracker import PersonTracker
+    from app.utils.benchmark import NullStorage, ZERO_COUNTS
+
+    if background:
+        loader = BackgroundModelLoader(create_detector, timer=timer).start()
+    else:
+        with timer.phase("modelo"):
+            detector = create_detector()
+
+    capture = FrameSource(int(source) if source.isdigit() else source)
+    with timer.phase("captura"):
+        capture.open()
+    tracker = PersonTracker()
+    counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS))
+
+    if background:
+        with timer.phase("espera do modelo"):
+            detector = loader.result()
+    with timer.phase("primeiro frame"):
+        frame = capture.read()
+        counter.count(tracker.update(detector, frame), frame.shape)
+    capture.release()
+    print(json.dumps({"first_count_s": round(timer.elapsed(), 3), "phases": timer.phases}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tempo até a primeira contagem: carga serial vs modelo em segundo plano.")
+    parser.add_argument("source", help="Vídeo ou ID da webcam")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", choices=["serial", "background"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.source, args.child == "background")
+        return
+
+    print(f"{'modo':<11} {'1a contagem':>12}  fases")
+    for mode in ("serial", "background"):
+        for _ in range(args.repeat):
+            command = [sys.executable, __file__, args.source, "--child", mode]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            phases = " ".join(f"{name}={seconds:.2f}s" for name, seconds in row["phases"].items())
+            print(f"{mode:<11} {row['first_count_s']:>11.2f}s  {phases}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from pathlib import Path
+from datetime import date
+from threading import Event, Thread
+from time import perf_counter
+import argparse
+import sys
+import tempfile
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.analytics.statistics import StatsAnalyzer
+from app.services.database import DatabaseBackend, PostgresBackend, SqliteBackend
+from app.services.storage import StorageService
+from app.utils.logger import log
+
+
+def _writer(storage: StorageService, events: int, offset: int) -> None:
+    for i in range(events):
+        storage.save_count("IN" if i % 2 else "OUT", offset + i)
+
+
+def _reader(stats: StatsAnalyzer, stop: Event, latencies: list[float]) -> None:
+    today = date.today()
+    while not stop.is_set():
+        started = perf_counter()
+        stats.get_buckets(today, today, "minute")
+        stats.get_daily_report()
+        latencies.append(perf_counter() - started)
+
+
+def run(label: str, backend: DatabaseBackend, writers: int, readers: int, events: int) -> None:
+    """Escritores concorrentes via StorageService (um por câmera) e leitores via StatsAnalyzer (API/dashboard)."""
+    with backend.session() as conn:
+        backend.create_schema(conn)
+        backend.reset(conn)
+
+    storages = [StorageService(backend=backend) for _ in range(writers)]
+    stop = Event()
+    latencies: list[list[float]] = [[] for _ in range(readers)]
+    reader_threads = [
+        Thread(target=_reader, args=(StatsAnalyzer(backend=backend), stop, latencies[i]), daemon=True)
+        for i in range(readers)
+    ]
+    writer_threads = [
+        Thread(target=_writer, args=(storage, events, i * events)) for i, storage in enumerate(storages)
+    ]
+
+    started = perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    for storage in storages:
+        storage.close()
+    elapsed = perf_counter() - started
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+    flushed = sum(storage.get_metrics()["flushed_events"] for storage in storages)
+    failures = sum(storage.get_metrics()["flush_failure_count"] for storage in storages)
+    queries = sorted(latency for per_reader in latencies for latency in per_reader)
+    p95 = queries[int(len(queries) * 0.95)] * 1000 if queries else 0.0
+    print(
+        f"{label:<12} {flushed / elapsed:>12.0f} {failures:>10} "
+        f"{len(queries) / elapsed:>11.1f} {p95:>12.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara vazão SQLite vs PostgreSQL com escritores e leitores concorrentes.")
+    parser.add_argument("--postgres-dsn", default=None, help="DSN postgresql://... (omitido: mede só o SQLite)")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=5000, help="Eventos por escritor")
+    args = parser.parse_args()
+
+    log.disabled = True
+    print(f"{'backend':<12} {'eventos/s':>12} {'falhas':>10} {'consultas/s':>11} {'p95 leitura':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        run("sqlite", SqliteBackend(Path(tmp) / "benchmark.db"), args.writers, args.readers, args.events)
+    if args.postgres_dsn:
+        run("postgresql", PostgresBackend(args.postgres_dsn), args.writers, args.readers, args.events)
+
+
+if __name__ == "__main__":
+    main()
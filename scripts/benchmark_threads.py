@@ -0,0 +1,73 @@
+from pathlib import Path
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+
+def run_config(args: argparse.Namespace) -> None:
+    """Modo filho: aplica o orçamento recebido por variáveis PFM_* e mede o pipeline de IA no clipe."""
+    from time import perf_counter
+
+    from app.core.runtime import apply_thread_budget
+
+    apply_thread_budget()
+
+    from app.analytics.counter import StreamCounter
+    from app.detection.yolo_detector import YOLODetector
+    from app.tracking.tracker import PersonTracker
+    from app.utils.benchmark import NullStorage, ZERO_COUNTS, iter_clip_frames, summarize_latencies
+
+    detector = YOLODetector()
+    tracker = PersonTracker()
+    counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS))
+    latencies = []
+    for frame in iter_clip_frames(args.clip, args.max_frames):
+        started = perf_counter()
+        counter.count(tracker.update(detector, frame), frame.shape)
+        latencies.append(perf_counter() - started)
+    print(json.dumps(summarize_latencies(latencies)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Matriz de orçamentos de threads (OpenCV x torch) com FPS e latência.")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--cv2-threads", nargs="+", default=["", "1", "2"], help="Valores de PFM_CV2_THREADS ('' = padrão)")
+    parser.add_argument("--torch-threads", nargs="+", default=["", "1", "2", "4"], help="Valores de PFM_TORCH_THREADS")
+    parser.add_argument("--affinity", default="", help="PFM_CPU_AFFINITY aplicado a todas as execuções")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_config(args)
+        return
+
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    print(f"{'cv2':>5} {'torch':>6} {'fps':>8} {'mean_ms':>9} {'p95_ms':>8}")
+    for cv2_threads, torch_threads in itertools.product(args.cv2_threads, args.torch_threads):
+        # Um processo por configuração: pools do torch/OpenMP não podem ser redimensionados depois de criados.
+        env = dict(
+            os.environ,
+            PFM_CV2_THREADS=cv2_threads,
+            PFM_TORCH_THREADS=torch_threads,
+            PFM_CPU_AFFINITY=args.affinity,
+        )
+        command = [sys.executable, __file__, args.clip, "--child", "--max-frames", str(args.max_frames)]
+        output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{cv2_threads or 'pad':>5} {torch_threads or 'pad':>6} "
+            f"{row['fps']:>8} {row['mean_ms']:>9} {row['p95_ms']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
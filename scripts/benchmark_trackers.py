@@ -0,0 +1,100 @@
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+import numpy as np
+
+from app.detection.yolo_detector import YOLODetector
+from app.tracking.iou_tracker import iou_matrix, greedy_match
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import iter_clip_frames, summarize_latencies
+from app.utils.logger import log
+
+
+def load_mot_ground_truth(path: str) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """Lê anotações no formato MOT (frame, id, x, y, w, h, ...) indexadas por frame (base 1)."""
+    raw = np.loadtxt(path, delimiter=",", ndmin=2)
+    frames: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    for frame_no in np.unique(raw[:, 0]).astype(int):
+        rows = raw[raw[:, 0] == frame_no]
+        boxes = np.column_stack([rows[:, 2], rows[:, 3], rows[:, 2] + rows[:, 4], rows[:, 3] + rows[:, 5]])
+        frames[frame_no] = (rows[:, 1].astype(int), boxes.astype(np.float32))
+    return frames
+
+
+def count_id_switches(ground_truth: dict, predictions: dict, min_iou: float = 0.5) -> int:
+    """Conta trocas de ID: quando o track associado a uma pessoa anotada muda entre frames."""
+    last_match: dict[int, int] = {}
+    switches = 0
+    for frame_no in sorted(ground_truth):
+        gt_ids, gt_boxes = ground_truth[frame_no]
+        pred_ids, pred_boxes = predictions.get(frame_no, (np.empty(0, dtype=int), np.empty((0, 4))))
+        gt_rows, pred_rows = greedy_match(iou_matrix(gt_boxes, pred_boxes), min_iou)
+        for g, p in zip(gt_rows, pred_rows):
+            gt_id, pred_id = int(gt_ids[g]), int(pred_ids[p])
+            if gt_id in last_match and last_match[gt_id] != pred_id:
+                switches += 1
+            last_match[gt_id] = pred_id
+    return switches
+
+
+def run_tracker(clip: str, tracker_config: str, max_frames: int | None) -> tuple[dict, dict]:
+    """Executa um tracker sobre o clipe e retorna métricas de custo e as predições por frame."""
+    detector = YOLODetector()
+    tracker = PersonTracker(tracker_config=tracker_config)
+
+    latencies = []
+    predictions = {}
+    lifetimes: dict[int, int] = defaultdict(int)
+    for frame_no, frame in enumerate(iter_clip_frames(clip, max_frames), start=1):
+        started = perf_counter()
+        batch = tracker.update(detector, frame)
+        latencies.append(perf_counter() - started)
+
+        if not batch.has_ids:
+            continue
+        predictions[frame_no] = (batch.ids, batch.boxes)
+        for obj_id in batch.ids.tolist():
+            lifetimes[obj_id] += 1
+
+    summary = summarize_latencies(latencies)
+    summary.update(
+        {
+            "tracker": tracker_config,
+            "unique_ids": len(lifetimes),
+            "short_tracks": sum(1 for frames in lifetimes.values() if frames < 5),
+        }
+    )
+    return summary, predictions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara BoT-SORT e o tracker nativo em NumPy em um clipe gravado.")
+    parser.add_argument("clip", help="Caminho do vídeo de referência")
+    parser.add_argument("--trackers", nargs="+", default=["botsort.yaml", "native"])
+    parser.add_argument("--gt", default=None, help="Anotações MOT (gt.txt) para contar trocas de ID")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    ground_truth = load_mot_ground_truth(args.gt) if args.gt else None
+
+    print(f"{'tracker':<14} {'fps':>8} {'mean_ms':>9} {'p95_ms':>8} {'ids':>6} {'curtos':>7} {'id_sw':>6}")
+    for tracker_config in args.trackers:
+        log.info(f"Benchmark | tracker={tracker_config}")
+        summary, predictions = run_tracker(args.clip, tracker_config, args.max_frames)
+        switches = count_id_switches(ground_truth, predictions) if ground_truth else "-"
+        print(
+            f"{summary['tracker']:<14} {summary['fps']:>8} {summary['mean_ms']:>9} {summary['p95_ms']:>8} "
+            f"{summary['unique_ids']:>6} {summary['short_tracks']:>7} {switches:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from pathlib import Path
+import argparse
 import cv2
+import numpy as np
 import yaml
 import sys
 
@@ -21,6 +23,7 @@ class Calibrator:
         self.config = load_zones_config()
         self.y_ratio = self.config.get('counting_line', {}).get('y_ratio', 0.5)
         self.temp_y = self.y_ratio
+        self.temp_offset = self.config.get('counting_line', {}).get('offset', 0.02)
         self.frame = None
 
     def mouse_callback(self, event, x, y, *_):
@@ -31,7 +34,9 @@ class Calibrator:
     def save_config(self):
         """Salva a nova configuração no YAML."""
         try:
-            self.config.setdefault('counting_line', {})['y_ratio'] = round(self.temp_y, 3)
+            counting_line = self.config.setdefault('counting_line', {})
+            counting_line['y_ratio'] = round(self.temp_y, 3)
+            counting_line['offset'] = round(self.temp_offset, 4)
             CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
             with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
                 yaml.dump(self.config, f)
@@ -51,7 +56,7 @@ class Calibrator:
         log.info("--- MODO DE CALIBRAÇÃO INICIADO ---")
         log.info("Clique na imagem para definir altura | S: Salvar | Q: Sair")
 
-        offset_ratio = self.config.get('counting_line', {}).get('offset', 0.02)
+        offset_ratio = self.temp_offset
 
         while True:
             ret, self.frame = cap.read()
@@ -86,5 +91,110 @@ class Calibrator:
         cv2.destroyAllWindows()
 
 
+    def run_sweep(
+        self,
+        clip,
+        y_ratios,
+        offsets,
+        expected=None,
+        skip_frames=2,
+        workers=1,
+        top=10,
+        write=False,
+        min_crossings=1,
+    ):
+        """
+        Calibração automática: roda detecção e rastreamento uma única vez sobre
+        o clipe, mantém as trajetórias em memória e varre a grade de linhas/faixas.
+        """
+        from app.analytics.calibration import sweep_line_params
+        from app.analytics.trajectory_store import TrajectoryBuffer
+        from app.detection.yolo_detector import YOLODetector
+        from app.tracking.tracker import PersonTracker
+
+        cap = cv2.VideoCapture(clip)
+        if not cap.isOpened():
+            log.error(f"Não foi possível abrir o clipe de calibração: {clip}")
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        detector = YOLODetector()
+        tracker = PersonTracker()
+        buffer = TrajectoryBuffer()
+
+        log.info(f"Rastreando clipe de calibração: {clip}")
+        frame_nmr = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_nmr % skip_frames == 0:
+                buffer.record(tracker.update(detector, frame), frame.shape, frame_nmr / fps)
+            frame_nmr += 1
+        cap.release()
+
+        traj = buffer.to_arrays()
+        max_inactive = float(self.config.get('counting_line', {}).get('max_inactive_seconds', 10.0))
+        log.info(f"Trajetórias coletadas: {len(traj)} detecções em {frame_nmr} frames. Varrendo grade...")
+
+        results = sweep_line_params(
+            traj, y_ratios, offsets, max_inactive, expected=expected, workers=workers, min_crossings=min_crossings
+        )
+        if not results:
+            log.warning("Nenhuma configuração válida na grade informada.")
+            return None
+
+        print(f"{'y_ratio':>8} {'offset':>8} {'IN':>5} {'OUT':>5} {'oscil':>6} {'churn':>6} {'erro':>6}")
+        for r in results[:top]:
+            error = "-" if r.count_error is None else r.count_error
+            print(f"{r.y_ratio:>8} {r.offset:>8} {r.in_count:>5} {r.out_count:>5} {r.near_misses:>6} {r.id_churn:>6} {error:>6}")
+
+        best = results[0]
+        log.info(f"Melhor configuração: y_ratio={best.y_ratio} offset={best.offset}")
+        if write and expected is None and best.crossings < min_crossings:
+            log.warning(
+                f"Nenhuma linha teve ao menos {min_crossings} travessia(s) no clipe; zones.yaml não foi alterado."
+            )
+        elif write:
+            self.temp_y = best.y_ratio
+            self.temp_offset = best.offset
+            self.save_config()
+        return best
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Calibração da linha de contagem (manual ou varredura automática).")
+    parser.add_argument("--camera", type=int, default=0, help="Câmera para calibração manual")
+    parser.add_argument("--sweep", metavar="CLIP", default=None, help="Clipe de amostra para varredura automática")
+    parser.add_argument("--y-min", type=float, default=0.3)
+    parser.add_argument("--y-max", type=float, default=0.7)
+    parser.add_argument("--y-step", type=float, default=0.02)
+    parser.add_argument("--offsets", type=float, nargs="+", default=[0.005, 0.01, 0.02, 0.03, 0.05])
+    parser.add_argument("--expected-in", type=int, default=None, help="Contagem IN de referência do clipe")
+    parser.add_argument("--expected-out", type=int, default=None, help="Contagem OUT de referência do clipe")
+    parser.add_argument("--skip-frames", type=int, default=2, help="Mesma cadência de IA do pipeline")
+    parser.add_argument("--workers", type=int, default=1, help="Processos para avaliar a grade")
+    parser.add_argument("--min-crossings", type=int, default=1, help="Sem referência: travessias mínimas para uma linha ser elegível")
+    parser.add_argument("--write", action="store_true", help="Grava a melhor configuração em zones.yaml")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    Calibrator().run()
+    args = _parse_args()
+    calibrator = Calibrator()
+    if args.sweep:
+        expected = None
+        if args.expected_in is not None and args.expected_out is not None:
+            expected = (args.expected_in, args.expected_out)
+        calibrator.run_sweep(
+            args.sweep,
+            y_ratios=np.arange(args.y_min, args.y_max + 1e-9, args.y_step),
+            offsets=args.offsets,
+            expected=expected,
+            skip_frames=args.skip_frames,
+            workers=args.workers,
+            write=args.write,
+            min_crossings=args.min_crossings,
+        )
+    else:
+        calibrator.run(args.camera)
@@ -0,0 +1,43 @@
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.services.counts_repository import CountsRepository
+from app.services.export import EXPORT_FORMATS, iter_export
+from app.utils.logger import log
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Exporta eventos de contagem de um intervalo para CSV/Parquet em blocos (memória constante)."
+    )
+    parser.add_argument("start", type=date.fromisoformat, help="Data inicial YYYY-MM-DD (inclusive)")
+    parser.add_argument("end", type=date.fromisoformat, help="Data final YYYY-MM-DD (inclusive)")
+    parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--direction", choices=("IN", "OUT"), default=None)
+    parser.add_argument("--output", default=None, help="Arquivo de saída (padrão: counts_<start>_<end>.<format>)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Linhas por bloco lido do banco")
+    parser.add_argument("--db", default=None, help="Arquivo SQLite (padrão: PFM_DATABASE_URL ou data/)")
+    args = parser.parse_args()
+
+    output = Path(args.output or f"counts_{args.start}_{args.end}.{args.fmt}")
+    start_dt = datetime.combine(args.start, datetime.min.time())
+    end_dt = datetime.combine(args.end, datetime.min.time()) + timedelta(days=1)
+
+    written = 0
+    with open(output, "wb") as handle:
+        for chunk in iter_export(CountsRepository(args.db), start_dt, end_dt, args.fmt, args.direction, args.chunk_size):
+            handle.write(chunk)
+            written += len(chunk)
+
+    log.info(f"Exportação concluída: {output} ({written / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
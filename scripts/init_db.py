@@ -1,12 +1,10 @@
-import sqlite3
 from pathlib import Path
+from typing import Optional
+from app.services.database import SqliteBackend, create_backend
 from app.utils.logger import log
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = BASE_DIR / "data" / "PeopleFlowMonitor.db"
 
-
-def init_db(db_path: Path = DB_PATH) -> None:
+def init_db(db_path: Optional[Path] = None) -> None:
     """
     Inicializa o banco de dados e cria a tabela 'counts' se não existir.
     
@@ -15,33 +13,26 @@ def init_db(db_path: Path = DB_PATH) -> None:
         - direction: 'IN' ou 'OUT'
         - timestamp: Data e hora do evento
         - object_id: ID do objeto rastreado
+
+    Também cria 'occupancy_minute' (entradas/saídas por minuto), usada pelo
+    índice de ocupação, e 'day_summary' (resumos imutáveis de dias fechados).
+
+    Sem `db_path`, usa PFM_DATABASE_URL (PostgreSQL) quando definido, senão o
+    SQLite padrão em data/.
     """
+    backend = create_backend(db_path)
     try:
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        log.info(f"Inicializando banco de dados em: {db_path}")
-
-        with sqlite3.connect(db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS counts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    direction TEXT NOT NULL,
-                    timestamp DATETIME NOT NULL,
-                    object_id INTEGER NOT NULL
-                )
-            ''')
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_counts_timestamp
-                ON counts(timestamp)
-            ''')
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_counts_direction_timestamp
-                ON counts(direction, timestamp)
-            ''')
-            conn.commit()
+        if isinstance(backend, SqliteBackend):
+            Path(backend.db_path).parent.mkdir(parents=True, exist_ok=True)
+        log.info(f"Inicializando banco de dados em: {backend.describe()}")
+
+        with backend.session() as conn:
+            if backend.create_schema(conn):
+                log.info("Tabela 'occupancy_minute' criada a partir dos eventos existentes.")
 
         log.info("Tabela 'counts' e índices criados/verificados com sucesso.")
 
-    except sqlite3.Error as e:
+    except backend.errors as e:
         log.error(f"Erro de banco de dados: {e}")
     except Exception as e:
         log.error(f"Erro inesperado ao inicializar o banco: {e}")
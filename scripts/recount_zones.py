@@ -0,0 +1,44 @@
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.analytics.recount import recount
+from app.analytics.trajectory_store import load_trajectories
+from app.config.settings import load_zones_config
+from app.utils.logger import log
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recontagem IN/OUT de um dia gravado com outra configuração de linha, sem reexecutar o YOLO."
+    )
+    parser.add_argument("day_dir", help="Diretório diário gravado (ex.: data/trajectories/2026-02-12)")
+    parser.add_argument("--y-ratio", type=float, default=None, help="Padrão: valor atual do zones.yaml")
+    parser.add_argument("--offset", type=float, default=None, help="Padrão: valor atual do zones.yaml")
+    parser.add_argument("--max-inactive", type=float, default=None, help="Segundos até liberar um ID inativo")
+    args = parser.parse_args()
+
+    zone_data = load_zones_config().get("counting_line", {})
+    y_ratio = args.y_ratio if args.y_ratio is not None else zone_data.get("y_ratio", 0.6)
+    offset = args.offset if args.offset is not None else zone_data.get("offset", 0.05)
+    max_inactive = args.max_inactive if args.max_inactive is not None else float(
+        zone_data.get("max_inactive_seconds", 10.0)
+    )
+
+    started = perf_counter()
+    traj = load_trajectories(args.day_dir)
+    result = recount(traj, y_ratio, offset, max_inactive)
+    elapsed = perf_counter() - started
+
+    log.info(f"Recontagem | Linha: {y_ratio} | Offset: {offset} | Linhas gravadas: {len(traj)}")
+    log.info(f"Entradas (IN): {result.in_count} | Saídas (OUT): {result.out_count} | Tempo: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
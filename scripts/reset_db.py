@@ -1,27 +1,24 @@
-import sqlite3
 from pathlib import Path
+from typing import Optional
+from app.services.database import create_backend
 from app.utils.logger import log
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = BASE_DIR / "data" / "PeopleFlowMonitor.db"
 
-
-def reset_database(db_path: Path = DB_PATH) -> None:
+def reset_database(db_path: Optional[Path] = None) -> None:
     """
-    Limpa todos os registros da tabela 'counts' e reinicia o contador de IDs.
+    Limpa todos os registros da tabela 'counts' (e as tabelas derivadas de fluxo por minuto e resumos diários) e reinicia o contador de IDs.
     """
-    if not db_path.exists():
-        log.warning(f"O banco de dados não foi encontrado em: {db_path}")
+    backend = create_backend(db_path)
+    if not backend.is_available():
+        log.warning(f"O banco de dados não foi encontrado em: {backend.describe()}")
         return
 
     try:
-        with sqlite3.connect(db_path) as conn:
-            conn.execute("DELETE FROM counts")
-            conn.execute("DELETE FROM sqlite_sequence WHERE name='counts'")
-            conn.commit()
-        log.info(f"Banco de dados '{db_path}' zerado com sucesso.")
+        with backend.session() as conn:
+            backend.reset(conn)
+        log.info(f"Banco de dados '{backend.describe()}' zerado com sucesso.")
 
-    except sqlite3.OperationalError as e:
+    except backend.operational_errors as e:
         log.error(f"Falha crítica ao resetar o banco de dados: {e}")
     except Exception as e:
         log.error(f"Erro inesperado ao resetar o banco de dados: {e}")
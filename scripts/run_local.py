@@ -8,20 +8,54 @@ base_dir_str = str(BASE_DIR)
 if base_dir_str not in sys.path:
     sys.path.insert(0, base_dir_str)
 
-from app.core.pipeline import ProcessingPipeline
+from app.core.runtime import StartupTimer, apply_thread_budget
 from app.analytics.statistics import StatsAnalyzer
-from app.utils.logger import log
+from app.analytics.trajectory_store import TrajectoryRecorder
+from app.config.settings import (
+    LIVE_STATE_PATH,
+    LOG_ASYNC,
+    LOG_JSON_BACKUPS,
+    LOG_JSON_MAX_BYTES,
+    LOG_JSON_PATH,
+    LOG_RATE_LIMIT,
+    LOG_RATE_WINDOW_SECONDS,
+    TRAJECTORY_DIR,
+    ZONES_RELOAD_SECONDS,
+)
+from app.core.zones_watcher import ZonesWatcher
+from app.services.live_state import LiveStateWriter
+from app.utils.logger import configure_logging, log
 
-def main(video_source=0):
+def main(video_source=0, headless=False):
     """
     Ponto de entrada para execução local do monitoramento por vídeo.
     `video_source` pode ser o ID da webcam (0, 1, ...) ou caminho para arquivo de vídeo.
+    `headless=True` dispensa a janela de exibição e pula a decodificação de frames fora do ciclo de IA.
     """
+    # Escrita do log em thread de fundo: rajadas de eventos não bloqueiam o loop de frames.
+    configure_logging(
+        async_mode=LOG_ASYNC,
+        json_path=LOG_JSON_PATH or None,
+        json_max_bytes=LOG_JSON_MAX_BYTES,
+        json_backups=LOG_JSON_BACKUPS,
+        rate_limit=LOG_RATE_LIMIT,
+        rate_window=LOG_RATE_WINDOW_SECONDS,
+    )
     log.info("Inicializando PeopleFlowMonitor...")
+    timer = StartupTimer()
+    # Antes de importar torch/cv2 via pipeline: pools nativos só leem o orçamento na inicialização.
+    apply_thread_budget()
+    from app.core.pipeline import ProcessingPipeline
+    from app.detection.cascade import create_detector
+    from app.detection.loader import BackgroundModelLoader
 
+    # Modelo (import do torch, pesos e warmup) carrega em segundo plano enquanto banco e câmera abrem.
+    loader = BackgroundModelLoader(create_detector, timer=timer).start()
+
+    report = None
     try:
-        stats = StatsAnalyzer()
-        report = stats.get_daily_report()
+        with timer.phase("estatísticas"):
+            report = StatsAnalyzer().get_daily_report()
         log.info("--- [ RESUMO DE HOJE ] ---")
         log.info(f"Entradas (IN): {report['IN']}")
         log.info(f"Saídas  (OUT): {report['OUT']}")
@@ -30,9 +64,19 @@ def main(video_source=0):
         log.error(f"Falha ao carregar estatísticas iniciais: {e}")
 
     try:
-        pipeline = ProcessingPipeline(source=video_source)
+        recorder = TrajectoryRecorder(TRAJECTORY_DIR) if TRAJECTORY_DIR else None
+        pipeline = ProcessingPipeline(
+            source=video_source,
+            headless=headless,
+            recorder=recorder,
+            live_state=LiveStateWriter(LIVE_STATE_PATH),
+            zones_watcher=ZonesWatcher(interval=ZONES_RELOAD_SECONDS) if ZONES_RELOAD_SECONDS > 0 else None,
+            detector_loader=loader,
+            initial_counts=report,
+            startup_timer=timer,
+        )
         log.info(f"Acessando fonte de vídeo: {video_source}")
-        log.info("Carregando modelos de IA e iniciando captura...")
+        log.info("Iniciando captura (modelo de IA carregando em segundo plano)...")
         pipeline.run()
     except KeyboardInterrupt:
         log.warning("Execução interrompida pelo usuário (Ctrl+C).")
@@ -0,0 +1,63 @@
+from pathlib import Path
+import argparse
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+base_dir_str = str(BASE_DIR)
+if base_dir_str not in sys.path:
+    sys.path.insert(0, base_dir_str)
+
+from app.config.settings import DB_PATH, SITE_ID, SYNC_CENTRAL_DB_PATH, SYNC_TOKEN
+from app.services.sync import CentralAggregator, DirectoryTransport, HttpTransport, SyncAgent
+from app.utils.logger import log
+
+
+def _push(args: argparse.Namespace) -> None:
+    if args.url:
+        transport = HttpTransport(args.url, token=args.token)
+    elif args.outbox:
+        transport = DirectoryTransport(args.outbox)
+    else:
+        raise SystemExit("Informe --url ou --outbox")
+
+    agent = SyncAgent(args.db, args.site_id, transport, batch_size=args.batch_size)
+    while True:
+        sent = agent.run_once()
+        log.info(f"Enviados: {sent} evento(s) | {agent.bytes_sent / 1024:.1f} KiB acumulados")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+def _ingest(args: argparse.Namespace) -> None:
+    aggregator = CentralAggregator(args.central_db)
+    inserted = aggregator.ingest_directory(args.inbox)
+    log.info(f"Lotes consolidados em {args.central_db}: {inserted} evento(s) novo(s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sincronização incremental de contagens site -> central.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    push = sub.add_parser("push", help="Envia eventos novos deste site")
+    push.add_argument("--site-id", default=SITE_ID, required=not SITE_ID)
+    push.add_argument("--db", default=str(DB_PATH))
+    push.add_argument("--url", help="Endpoint do agregador, ex.: http://central:8000/sync/ingest")
+    push.add_argument("--token", default=SYNC_TOKEN, help="Token compartilhado do central (padrão: PFM_SYNC_TOKEN)")
+    push.add_argument("--outbox", help="Pasta compartilhada para envio por arquivos")
+    push.add_argument("--batch-size", type=int, default=5000)
+    push.add_argument("--interval", type=float, default=0.0, help="Repetir a cada N segundos (0 = uma vez)")
+    push.set_defaults(func=_push)
+
+    ingest = sub.add_parser("ingest", help="Consolida no central os lotes de uma pasta")
+    ingest.add_argument("inbox")
+    ingest.add_argument("--central-db", default=str(SYNC_CENTRAL_DB_PATH))
+    ingest.set_defaults(func=_ingest)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
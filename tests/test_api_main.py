@@ -1,27 +1,95 @@
+import gzip
+import json
+import tempfile
 import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+from app.analytics.occupancy import OccupancyIndex
+from app.services.live_state import LiveState
+from app.services.sync import CentralAggregator, decode_batch, encode_batch
 
 try:
     from fastapi.testclient import TestClient
-    from app.api.main import app, get_stats_analyzer
+    from app.api.main import (
+        _range_cache_control,
+        app,
+        get_central_aggregator,
+        get_live_state,
+        get_report_queue,
+        get_stats_analyzer,
+        get_sync_token,
+    )
     FASTAPI_AVAILABLE = True
 except Exception:
     TestClient = None
     app = None
+    get_live_state = None
     get_stats_analyzer = None
+    get_report_queue = None
+    get_central_aggregator = None
+    get_sync_token = None
     FASTAPI_AVAILABLE = False
 
 
 class _FakeStatsAnalyzer:
+    version = "v1"
+    queries = 0
+
     def get_daily_report(self):
         return {"IN": 7, "OUT": 3}
 
+    def get_occupancy_index(self, day=None):
+        return OccupancyIndex(day or date(2026, 2, 12), [(600, 5, 1), (660, 0, 2)])
+
+    def get_data_version(self):
+        return self.version
+
+    def get_range_report(self, start_day, end_day, direction=None):
+        _FakeStatsAnalyzer.queries += 1
+        report = {"IN": 10, "OUT": 4}
+        return {direction: report[direction]} if direction else report
+
+    def get_buckets(self, start_day, end_day, bucket="hour", direction=None):
+        _FakeStatsAnalyzer.queries += 1
+        return {"bucket": ["2026-02-12 08:00"], "IN": [3], "OUT": [1]}
+
+
+class _FakeReportQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, start, end=None, capacity_limit=None):
+        self.submitted.append((start, end, capacity_limit))
+        return "lote1"
+
+    def batch_status(self, batch_id):
+        if batch_id != "lote1":
+            return None
+        return {"batch_id": batch_id, "total": 1, "finished": 0, "jobs": [{"day": "2026-02-12", "status": "running"}]}
+
+
+class _FakeAggregator:
+    """Conta lotes que chegaram ao agregador; o decode real (com limite de tamanho) continua valendo."""
+
+    def __init__(self):
+        self.batches = 0
+
+    def ingest(self, data):
+        payload = decode_batch(data)
+        self.batches += 1
+        return {"site_id": payload["site_id"], "inserted": len(payload["rows"])}
+
 
 @unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi nao esta instalado no ambiente")
 
 
 class ApiMainTests(unittest.TestCase):
     def setUp(self):
+        _FakeStatsAnalyzer.version = "v1"
+        _FakeStatsAnalyzer.queries = 0
         app.dependency_overrides[get_stats_analyzer] = lambda: _FakeStatsAnalyzer()
+        app.dependency_overrides[get_live_state] = lambda: None
         self.client = TestClient(app)
 
     def tearDown(self):
@@ -43,6 +111,124 @@ class ApiMainTests(unittest.TestCase):
             },
         )
 
+    def test_stats_and_live_prefer_fresh_pipeline_state(self):
+        live = LiveState(in_count=12, out_count=4, active_tracks=3, day=date.today(), heartbeat=0.0)
+        app.dependency_overrides[get_live_state] = lambda: live
+
+        self.assertEqual(self.client.get("/stats").json()["today"], {"IN": 12, "OUT": 4})
+        payload = self.client.get("/live").json()
+        self.assertEqual(payload["source"], "live")
+        self.assertEqual((payload["occupancy"], payload["active_tracks"]), (8, 3))
+
+    def test_live_falls_back_to_database_without_pipeline(self):
+        payload = self.client.get("/live").json()
+        self.assertEqual(payload["source"], "database")
+        self.assertEqual(payload["today"], {"IN": 7, "OUT": 3})
+        self.assertIsNone(payload["active_tracks"])
+
+    def test_occupancy_point_and_range_queries(self):
+        point = self.client.get("/occupancy", params={"date": "2026-02-12", "at": "10:30"})
+        self.assertEqual(point.status_code, 200)
+        self.assertEqual(point.json(), {"date": "2026-02-12", "at": "10:30", "occupancy": 4})
+
+        window = self.client.get("/occupancy", params={"date": "2026-02-12", "start": "10:59", "end": "11:00"})
+        self.assertEqual(window.json()["min"], 2)
+        self.assertEqual(window.json()["max"], 4)
+        self.assertEqual(window.json()["avg"], 3.0)
+
+    def test_occupancy_rejects_invalid_input(self):
+        response = self.client.get("/occupancy", params={"at": "25:00"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_stats_buckets_returns_columnar_payload(self):
+        response = self.client.get("/stats/buckets", params={"start": "2026-02-12", "end": "2026-02-12"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["bucket"], ["2026-02-12 08:00"])
+        self.assertEqual(response.json()["IN"], [3])
+        self.assertEqual(response.headers["cache-control"], "public, max-age=3600")
+
+    def test_stats_range_conditional_get_skips_query_until_data_changes(self):
+        params = {"start": "2026-02-01", "end": "2999-01-01", "direction": "IN"}
+        first = self.client.get("/stats/range", params=params)
+        self.assertEqual(first.json()["totals"], {"IN": 10})
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+
+        etag = first.headers["etag"]
+        cached = self.client.get("/stats/range", params=params, headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(_FakeStatsAnalyzer.queries, 1)
+
+        _FakeStatsAnalyzer.version = "v2"
+        changed = self.client.get("/stats/range", params=params, headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+    def test_range_is_cached_only_after_settling_and_weak_etags_match(self):
+        end_day = date(2026, 2, 12)
+        self.assertEqual(_range_cache_control(end_day, datetime(2026, 2, 12, 23, 59)), "no-cache")
+        self.assertEqual(_range_cache_control(end_day, datetime(2026, 2, 13, 0, 1)), "no-cache")
+        self.assertEqual(_range_cache_control(end_day, datetime(2026, 2, 13, 0, 5)), "public, max-age=3600")
+
+        params = {"start": "2026-02-12", "end": "2026-02-12"}
+        etag = self.client.get("/stats/range", params=params).headers["etag"]
+        weak = self.client.get("/stats/range", params=params, headers={"If-None-Match": f'"other", W/{etag}'})
+        self.assertEqual(weak.status_code, 304)
+        self.assertEqual(_FakeStatsAnalyzer.queries, 1)
+
+    def test_stats_buckets_validates_parameters(self):
+        bad_bucket = self.client.get("/stats/buckets", params={"start": "2026-02-12", "end": "2026-02-12", "bucket": "month"})
+        bad_range = self.client.get("/stats/range", params={"start": "2026-02-12", "end": "2026-02-01"})
+        self.assertEqual(bad_bucket.status_code, 422)
+        self.assertEqual(bad_range.status_code, 422)
+
+    def test_reports_are_queued_and_polled_by_batch(self):
+        queue = _FakeReportQueue()
+        app.dependency_overrides[get_report_queue] = lambda: queue
+
+        submitted = self.client.post("/reports", params={"start": "2026-02-01", "end": "2026-02-28", "limit": 40})
+        self.assertEqual(submitted.status_code, 202)
+        self.assertEqual(submitted.json(), {"batch_id": "lote1", "jobs": 28})
+        self.assertEqual(queue.submitted, [(date(2026, 2, 1), date(2026, 2, 28), 40)])
+
+        self.assertEqual(self.client.get("/reports/lote1").json()["jobs"][0]["status"], "running")
+        self.assertEqual(self.client.get("/reports/outro").status_code, 404)
+        self.assertEqual(self.client.get("/reports/lote1/2026-02-12").status_code, 409)
+
+    def test_sync_ingest_merges_batches_and_rejects_malformed_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            aggregator = CentralAggregator(Path(tmp) / "central.db")
+            app.dependency_overrides[get_central_aggregator] = lambda: aggregator
+            app.dependency_overrides[get_sync_token] = lambda: "segredo"
+            auth = {"Authorization": "Bearer segredo"}
+
+            batch = encode_batch("loja-a", [(1, "2026-02-12 08:00:00", "IN", 7)])
+            ok = self.client.post("/sync/ingest", content=batch, headers=auth)
+            self.assertEqual(ok.status_code, 200)
+            self.assertEqual(ok.json()["inserted"], 1)
+
+            for rows in ([[2, "2026-02-12 08:00:00", "IN"]], [[2, "2026-02-12 08:00:00", "IN", {"x": 1}]], ["linha"]):
+                body = gzip.compress(json.dumps({"site_id": "loja-a", "rows": rows}).encode("utf-8"))
+                self.assertEqual(self.client.post("/sync/ingest", content=body, headers=auth).status_code, 400)
+            self.assertEqual(self.client.post("/sync/ingest", content=b"\x1f\x8b trunc", headers=auth).status_code, 400)
+
+    def test_sync_ingest_requires_token_and_bounds_batch_size(self):
+        aggregator = _FakeAggregator()
+        app.dependency_overrides[get_central_aggregator] = lambda: aggregator
+        batch = encode_batch("loja-a", [(1, "2026-02-12 08:00:00", "IN", 7)])
+
+        app.dependency_overrides[get_sync_token] = lambda: ""
+        self.assertEqual(self.client.post("/sync/ingest", content=batch).status_code, 503)
+
+        app.dependency_overrides[get_sync_token] = lambda: "segredo"
+        self.assertEqual(self.client.post("/sync/ingest", content=batch).status_code, 401)
+        wrong = {"Authorization": "Bearer outro"}
+        self.assertEqual(self.client.post("/sync/ingest", content=batch, headers=wrong).status_code, 401)
+        self.assertEqual(aggregator.batches, 0)
+
+        bomb = gzip.compress(b"0" * (64 * 1024 * 1024))  # ~64 KiB compactado, 64 MiB expandido
+        auth = {"Authorization": "Bearer segredo"}
+        self.assertEqual(self.client.post("/sync/ingest", content=bomb, headers=auth).status_code, 413)
+
 
 if __name__ == "__main__":
     unittest.main()
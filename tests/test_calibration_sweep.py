@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from app.analytics.calibration import evaluate_line, sweep_line_params
+from app.analytics.recount import prepare_trajectories
+from app.analytics.trajectory_store import TrajectoryBuffer
+from app.tracking.track_batch import TrackBatch
+
+FRAME_SHAPE = (100, 100, 3)
+
+
+def _trajectories(tracks):
+    """tracks: {id: [y_top por frame]} -> TrajectoryArrays (um frame a cada 0.1s)."""
+    buffer = TrajectoryBuffer()
+    n_frames = max(len(ys) for ys in tracks.values())
+    for frame_no in range(n_frames):
+        ids = [obj_id for obj_id, ys in tracks.items() if frame_no < len(ys) and ys[frame_no] is not None]
+        boxes = [[0.0, float(tracks[i][frame_no]), 10.0, 50.0] for i in ids]
+        buffer.record(TrackBatch.from_arrays(boxes, ids, [1.0] * len(ids)), FRAME_SHAPE, frame_no * 0.1)
+    return buffer.to_arrays()
+
+
+class CalibrationSweepTests(unittest.TestCase):
+    def test_evaluate_line_reports_near_misses_and_churn(self):
+        traj = _trajectories(
+            {
+                1: [30, 40, 49, 40, 30],        # entra na faixa [45, 55] e volta: OUT espúrio
+                2: [30, 50, 70],                # cruza: IN
+                3: [None, None, 50, 60, 70],    # nasce dentro da faixa
+            }
+        )
+
+        result = evaluate_line(prepare_trajectories(traj, 10.0), 0.5, 0.05, expected=(2, 0))
+
+        self.assertEqual((result.in_count, result.out_count), (2, 1))
+        self.assertEqual(result.near_misses, 1)
+        self.assertEqual(result.id_churn, 1)
+        self.assertEqual(result.count_error, 1)
+
+    def test_sweep_ranks_by_error_then_stability_and_matches_across_processes(self):
+        traj = _trajectories(
+            {
+                1: [10, 30, 47, 30, 47, 30],
+                2: [10, 30, 60, 90],
+                3: [90, 60, 30, 10],
+            }
+        )
+        y_ratios = np.arange(0.3, 0.71, 0.1)
+        offsets = [0.02, 0.05]
+
+        serial = sweep_line_params(traj, y_ratios, offsets, expected=(1, 1))
+        parallel = sweep_line_params(traj, y_ratios, offsets, expected=(1, 1), workers=2)
+
+        self.assertEqual([r.as_dict() for r in serial], [r.as_dict() for r in parallel])
+        self.assertEqual(len(serial), len(y_ratios) * len(offsets))
+        best = serial[0]
+        self.assertEqual((best.count_error, best.near_misses), (0, 0))
+        keys = [(r.count_error, r.instability, r.offset) for r in serial]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_without_reference_empty_band_does_not_win(self):
+        traj = _trajectories(
+            {
+                1: [10, 30, 60, 90],
+                2: [90, 60, 30, 10],
+                3: [10, 30, 49, 30, 49, 30],   # oscila na faixa de 0.5
+            }
+        )
+
+        # A faixa vazia (0.95) vem primeiro na grade: com empate em instabilidade zero, venceria.
+        ranked = sweep_line_params(traj, [0.95, 0.5, 0.2], [0.02], min_crossings=2)
+
+        self.assertEqual([r.y_ratio for r in ranked], [0.2, 0.5, 0.95])
+        self.assertGreater(ranked[1].instability, 0)
+        empty = next(r for r in ranked if r.y_ratio == 0.95)
+        self.assertEqual((empty.crossings, empty.instability), (0, 0))
+        self.assertIs(ranked[-1], empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.detection.cascade import CascadeDetector, needs_escalation, validate_stage_sizes
+from app.tracking.track_batch import TrackBatch
+
+FRAME = np.zeros((100, 100, 3), dtype=np.uint8)
+BAND = (0.5, 0.05)
+
+
+def _result(tops, confs):
+    boxes = [[10.0, top, 30.0, top + 20.0] for top in tops]
+    return SimpleNamespace(boxes=SimpleNamespace(xyxy=np.array(boxes).reshape(-1, 4), conf=np.array(confs), id=None))
+
+
+class _Stage:
+    def __init__(self, name, results):
+        self.name = name
+        self.results = list(results)
+        self.calls = []
+
+    def _next(self, kind):
+        self.calls.append(kind)
+        return self.results.pop(0) if self.results else _result([], [])
+
+    def detect(self, frame, conf=None):
+        return self._next("detect")
+
+    def track(self, frame, tracker, conf, iou):
+        return self._next("track")
+
+
+class CascadeDetectorTests(unittest.TestCase):
+    def test_triggers_on_uncertain_boxes_near_band_or_crowd(self):
+        near_uncertain = TrackBatch.from_results(_result([48, 52], [0.35, 0.4]))
+        far_uncertain = TrackBatch.from_results(_result([5, 90], [0.35, 0.4]))
+        near_confident = TrackBatch.from_results(_result([48, 52], [0.9, 0.8]))
+        crowd = TrackBatch.from_results(_result([5] * 8, [0.9] * 8))
+
+        self.assertTrue(needs_escalation(near_uncertain, 100, BAND))
+        self.assertFalse(needs_escalation(far_uncertain, 100, BAND))
+        self.assertFalse(needs_escalation(near_confident, 100, BAND))
+        self.assertTrue(needs_escalation(crowd, 100, BAND, crowd_threshold=8))
+        self.assertFalse(needs_escalation(TrackBatch.empty(), 100, BAND))
+
+    def test_detect_reruns_triggering_frame_and_holds_heavy_stage(self):
+        light = _Stage("light", [_result([], []), _result([48, 52], [0.3, 0.3])])
+        heavy = _Stage("heavy", [])
+        cascade = CascadeDetector(light, heavy, band=BAND, hold_frames=2)
+
+        for _ in range(5):
+            cascade.detect(FRAME)
+
+        # frame 2 dispara e é refeito no pesado; frames 3-4 ficam no pesado; frame 5 volta ao leve.
+        self.assertEqual(len(light.calls), 3)
+        self.assertEqual(len(heavy.calls), 3)
+        self.assertEqual(cascade.stats()["escalations"], 1)
+        self.assertFalse(cascade.escalated)
+
+    def test_track_escalates_from_next_frame_only(self):
+        light = _Stage("light", [_result([5] * 9, [0.9] * 9)])
+        heavy = _Stage("heavy", [_result([5] * 9, [0.9] * 9)])
+        cascade = CascadeDetector(light, heavy, band=BAND, crowd_threshold=8, hold_frames=1)
+
+        cascade.track(FRAME)
+        self.assertEqual((len(light.calls), len(heavy.calls)), (1, 0))
+        cascade.track(FRAME)  # ainda lotado: renova a janela
+        cascade.track(FRAME)
+        cascade.track(FRAME)
+
+        self.assertEqual((light.calls, heavy.calls), (["track", "track"], ["track", "track"]))
+        self.assertEqual(cascade.stats()["heavy_ratio"], 0.5)
+
+    def test_same_weights_cascade_requires_larger_heavy_stage(self):
+        validate_stage_sizes(320, 640)
+        validate_stage_sizes(640, 640, heavy_model="yolov8s.pt")
+        with self.assertRaises(ValueError):
+            validate_stage_sizes(640, 640)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,6 +50,49 @@ class CountsRepositoryTests(unittest.TestCase):
         self.assertEqual(len(df), 2)
         self.assertListEqual(df["direction"].tolist(), ["IN", "OUT"])
 
+    def test_fetch_page_walks_keyset_newest_first_with_filters(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)",
+                [("2026-02-12 12:00:00", "IN", 4), ("2026-02-12 12:00:00", "IN", 5), ("2026-02-12 18:00:00", "OUT", 6)],
+            )
+        repo = CountsRepository(self.db_path)
+        start_dt, end_dt = datetime(2026, 2, 12), datetime(2026, 2, 13)
+
+        first = repo.fetch_page(start_dt, end_dt, page_size=2)
+        self.assertEqual([row[3] for row in first.rows], [6, 5])
+        self.assertEqual(first.next_cursor, ("2026-02-12 12:00:00", 5))
+
+        second = repo.fetch_page(start_dt, end_dt, before=first.next_cursor, page_size=2)
+        self.assertEqual([row[3] for row in second.rows], [4, 2])
+        third = repo.fetch_page(start_dt, end_dt, before=second.next_cursor, page_size=2)
+        self.assertEqual([row[3] for row in third.rows], [1])
+        self.assertFalse(third.has_more)
+
+        only_in = repo.fetch_page(start_dt, end_dt, direction="IN", page_size=10)
+        self.assertEqual([row[3] for row in only_in.rows], [5, 4, 1])
+        window = repo.fetch_page(datetime(2026, 2, 12, 11), datetime(2026, 2, 12, 13), page_size=10)
+        self.assertEqual([row[3] for row in window.rows], [5, 4, 2])
+
+
+    def test_fetch_page_cursor_becomes_index_upper_bound(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE INDEX idx_counts_timestamp ON counts(timestamp)")
+        repo = CountsRepository(self.db_path)
+        start_dt, end_dt = datetime(2026, 2, 12), datetime(2026, 2, 13)
+
+        query, params = repo._page_query(start_dt, end_dt, None, ("2026-02-12 12:00:00", 2), 10)
+        self.assertIn("timestamp <= ?", query)
+        self.assertEqual(params[:2], ["2026-02-12 00:00:00", "2026-02-12 12:00:00"])
+        with sqlite3.connect(self.db_path) as conn:
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+        self.assertIn("USING INDEX idx_counts_timestamp (timestamp>? AND timestamp<?)", plan)
+
+        # Cursor além do fim do intervalo: o fim continua sendo o limite.
+        _, params = repo._page_query(start_dt, end_dt, None, ("2026-02-14 00:00:00", 9), 10)
+        self.assertEqual(params[:2], ["2026-02-12 00:00:00", "2026-02-13 00:00:00"])
+        page = repo.fetch_page(start_dt, end_dt, before=("2026-02-12 12:00:00", 2))
+        self.assertEqual([row[3] for row in page.rows], [1])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from app.analytics.statistics import StatsAnalyzer
+from app.services import database
+from app.services.counts_repository import CountsRepository
+from app.services.database import DatabaseBackend, PostgresBackend, SqliteBackend, _PostgresConnection, create_backend
+from app.services.storage import StorageService
+from app.utils.logger import log
+
+# Ex.: PFM_TEST_POSTGRES_DSN=postgresql://postgres@localhost/pfm_test (o banco é truncado pelos testes).
+# Sem DSN, um servidor temporário é iniciado se `pgserver` estiver instalado (requirements-postgres.txt).
+POSTGRES_DSN = os.getenv("PFM_TEST_POSTGRES_DSN", "")
+_postgres_server = None
+
+
+def _postgres_dsn() -> str:
+    global _postgres_server
+    if POSTGRES_DSN:
+        return POSTGRES_DSN
+    if _postgres_server is None:
+        try:
+            import pgserver
+        except ImportError:
+            return ""
+        _postgres_server = pgserver.get_server(tempfile.mkdtemp(prefix="pfm_pg_"), cleanup_mode="delete")
+    return _postgres_server.get_uri()
+CLOSED_DAY = date(2026, 2, 12)
+
+
+def _events(day: date, n_events: int) -> list[tuple[str, str, int]]:
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+    return [
+        ((start + timedelta(seconds=17 * i)).strftime("%Y-%m-%d %H:%M:%S"), "IN" if i % 3 else "OUT", i)
+        for i in range(n_events)
+    ]
+
+
+class SqliteBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = SqliteBackend(os.path.join(self.tmp.name, "pfm.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_create_backend_selects_by_path_or_url(self):
+        self.assertIsInstance(create_backend(self.backend.db_path), SqliteBackend)
+        with patch.object(database, "DATABASE_URL", ""):
+            self.assertIsInstance(create_backend(), SqliteBackend)
+        with patch.object(database, "DATABASE_URL", "postgresql://u@h/db"), patch.object(database, "PostgresBackend") as pg:
+            create_backend()
+            pg.assert_called_once_with("postgresql://u@h/db")
+            self.assertIsInstance(create_backend(self.backend.db_path), SqliteBackend)
+
+    def test_session_rolls_back_on_error_and_reset_clears_tables(self):
+        with self.backend.session() as conn:
+            self.backend.create_schema(conn)
+            self.backend.insert_events(conn, _events(CLOSED_DAY, 3))
+
+        with self.assertRaises(RuntimeError):
+            with self.backend.session() as conn:
+                self.backend.insert_events(conn, _events(CLOSED_DAY, 5))
+                raise RuntimeError("falha no meio da transação")
+
+        with sqlite3.connect(self.backend.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM counts").fetchone()[0], 3)
+
+        with self.backend.session() as conn:
+            self.backend.reset(conn)
+            self.backend.insert_events(conn, _events(CLOSED_DAY, 1))
+        with sqlite3.connect(self.backend.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT MIN(id), COUNT(*) FROM counts").fetchone(), (1, 1))
+
+
+class PostgresPlaceholderTests(unittest.TestCase):
+    def test_question_marks_inside_literals_and_comments_are_kept(self):
+        query = "SELECT '?', \"a?\" FROM t WHERE a = ? AND b LIKE '%x''?' -- ?\nAND c = ? /* ? */ AND d = $$?$$"
+        self.assertEqual(
+            _PostgresConnection._sql(query),
+            "SELECT '?', \"a?\" FROM t WHERE a = %s AND b LIKE '%%x''?' -- ?\nAND c = %s /* ? */ AND d = $$?$$",
+        )
+
+
+class DatabaseBackendContractTests(unittest.TestCase):
+    def test_backend_without_connect_schema_or_version_cannot_be_created(self):
+        class Partial(DatabaseBackend):
+            def connect(self, persistent=False):
+                return sqlite3.connect(":memory:")
+
+        with self.assertRaises(TypeError):
+            DatabaseBackend()
+        with self.assertRaises(TypeError):
+            Partial()
+
+
+def _walk_pages(repo, page_size=250):
+    """Percorre o dia fechado pelo keyset; devolve (tamanhos das páginas, object_ids em ordem)."""
+    start = datetime.combine(CLOSED_DAY, datetime.min.time())
+    sizes, object_ids, cursor = [], [], None
+    while True:
+        page = repo.fetch_page(start, start + timedelta(days=1), before=cursor, page_size=page_size)
+        sizes.append(len(page.rows))
+        object_ids.extend(row[3] for row in page.rows)
+        if not page.has_more:
+            return sizes, object_ids
+        cursor = page.next_cursor
+
+
+class PostgresBackendTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dsn = _postgres_dsn()
+        if not cls.dsn:
+            raise unittest.SkipTest("PFM_TEST_POSTGRES_DSN não definido e pgserver não instalado")
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.backend = PostgresBackend(self.dsn)
+        with self.backend.session() as conn:
+            self.backend.create_schema(conn)
+            self.backend.reset(conn)
+
+    def _store(self, events, backend=None):
+        storage = StorageService(backend=backend or self.backend)
+        storage._batch_size = len(events) + 1
+        for timestamp, direction, object_id in events:
+            storage._enqueue_event_locked((timestamp, direction, object_id))
+        storage.close()
+        return storage
+
+    def test_flush_copies_events_and_keeps_minute_flows(self):
+        events = _events(CLOSED_DAY, 600)
+        storage = self._store(events)
+
+        self.assertEqual(storage.get_metrics()["flushed_events"], 600)
+        with self.backend.session() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM counts").fetchone()[0]
+            flows = conn.execute("SELECT SUM(in_count), SUM(out_count) FROM occupancy_minute").fetchone()
+        self.assertEqual(total, 600)
+        self.assertEqual(tuple(flows), (400, 200))
+
+    def test_stats_and_repository_match_sqlite(self):
+        events = _events(CLOSED_DAY, 600)
+        self._store(events)
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_backend = SqliteBackend(os.path.join(tmp, "pfm.db"))
+            self._store(events, sqlite_backend)
+
+            for bucket in ("hour", "day", "week"):
+                self.assertEqual(
+                    StatsAnalyzer(backend=self.backend).get_buckets(CLOSED_DAY, CLOSED_DAY, bucket),
+                    StatsAnalyzer(backend=sqlite_backend).get_buckets(CLOSED_DAY, CLOSED_DAY, bucket),
+                )
+            expected = StatsAnalyzer(backend=sqlite_backend).get_day_summary(CLOSED_DAY)
+            expected_pages = _walk_pages(CountsRepository(backend=sqlite_backend))
+
+        stats = StatsAnalyzer(backend=self.backend)
+        self.assertEqual(stats.get_day_summary(CLOSED_DAY), expected)
+        self.assertEqual(stats.get_range_report(CLOSED_DAY, CLOSED_DAY), {"IN": 400, "OUT": 200})
+        self.assertEqual(stats.get_occupancy_index(CLOSED_DAY).in_total, 400)
+
+        start = datetime.combine(CLOSED_DAY, datetime.min.time())
+        chunks = list(CountsRepository(backend=self.backend).iter_counts_between(start, start + timedelta(days=1), chunk_size=250))
+        self.assertEqual([len(chunk) for chunk in chunks], [250, 250, 100])
+        self.assertEqual(chunks[0][0][1:], events[0])
+        frame = CountsRepository(backend=self.backend).fetch_counts_between(start, start + timedelta(days=1))
+        self.assertEqual(len(frame), 600)
+        self.assertEqual(_walk_pages(CountsRepository(backend=self.backend)), expected_pages)
+
+    def test_fallback_to_counts_when_derived_tables_are_missing(self):
+        self._store(_events(CLOSED_DAY, 600))
+        with self.backend.session() as conn:
+            conn.execute("DROP TABLE occupancy_minute")
+            conn.execute("DROP TABLE day_summary")
+
+        stats = StatsAnalyzer(backend=self.backend)
+        summary = stats.get_day_summary(CLOSED_DAY)
+        self.assertEqual((summary.in_total, summary.out_total), (400, 200))
+        self.assertEqual(summary.peak_hour, 8)
+        self.assertEqual(stats.get_occupancy_index(CLOSED_DAY).in_total, 400)
+        self.assertEqual(sum(stats.get_buckets(CLOSED_DAY, CLOSED_DAY, "hour")["IN"]), 400)
+
+    def test_data_version_changes_after_flush(self):
+        before = self.backend.data_version()
+        self._store(_events(CLOSED_DAY, 5))
+        self.assertNotEqual(self.backend.data_version(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
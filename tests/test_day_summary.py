@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+from app.analytics.statistics import StatsAnalyzer
+from app.services.database import SqliteBackend
+from app.services.day_summary import DaySummary, load_day_summary
+from app.services.storage import StorageService
+from app.utils.logger import log
+
+CLOSED_DAY = date(2026, 2, 12)
+
+
+class DaySummaryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        temp.close()
+        self.db_path = temp.name
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.db_path + suffix)
+            except (FileNotFoundError, PermissionError):
+                pass
+
+    def _create_counts(self, rows):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE counts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    direction TEXT NOT NULL,
+                    object_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.executemany("INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)", rows)
+
+    def test_summary_metrics(self):
+        summary = DaySummary.from_hourly_rows(CLOSED_DAY, [(8, 3, 1), (10, 1, 3), (12, 0, 1)])
+
+        self.assertEqual((summary.in_total, summary.out_total), (4, 5))
+        self.assertEqual((summary.peak_hour, summary.peak_count), (8, 4))
+        self.assertEqual(summary.closing_occupancy, 0)
+        self.assertEqual(summary.kpis()["avg_h"], round(9 / 24, 2))
+        self.assertIsNone(DaySummary.from_hourly_rows(CLOSED_DAY, []).peak_hour)
+
+    def test_closed_day_is_persisted_and_served_without_raw_rows(self):
+        self._create_counts(
+            [
+                ("2026-02-12 08:10:00", "IN", 1),
+                ("2026-02-12 08:20:00", "IN", 2),
+                ("2026-02-12 17:00:00", "OUT", 1),
+            ]
+        )
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+
+        first = analyzer.get_day_summary(CLOSED_DAY)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM counts")  # leituras seguintes não podem depender dos eventos brutos
+
+        self.assertEqual(analyzer.get_day_summary(CLOSED_DAY), first)
+        self.assertEqual(analyzer.get_daily_report(CLOSED_DAY), {"IN": 2, "OUT": 1})
+        self.assertEqual(analyzer.get_hourly_peak(CLOSED_DAY), {"hour": "08", "count": 2})
+
+    def test_today_is_computed_but_not_persisted(self):
+        now = datetime.now()
+        self._create_counts([(now.strftime("%Y-%m-%d %H:%M:%S"), "IN", 1)])
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+
+        self.assertEqual(analyzer.get_day_summary().in_total, 1)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertIsNone(load_day_summary(conn, now.date(), SqliteBackend(self.db_path)))
+
+    def test_storage_writes_summary_on_rollover_and_invalidates_late_events(self):
+        storage = StorageService(db_path=self.db_path)
+        yesterday = datetime.now().date() - timedelta(days=1)
+        try:
+            storage._current_day = yesterday
+            storage._close_day_if_needed()
+            with sqlite3.connect(self.db_path) as conn:
+                self.assertIsNotNone(load_day_summary(conn, yesterday, SqliteBackend(self.db_path)))
+
+            late = (yesterday.strftime("%Y-%m-%d") + " 23:59:59", "IN", 7)
+            with storage._lock:
+                storage._enqueue_event_locked(late)
+            storage._flush_if_needed(force=True)
+            with sqlite3.connect(self.db_path) as conn:
+                self.assertIsNone(load_day_summary(conn, yesterday, SqliteBackend(self.db_path)))
+        finally:
+            storage.close()
+
+        self.assertEqual(StatsAnalyzer(db_path=self.db_path).get_day_summary(yesterday).in_total, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
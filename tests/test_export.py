@@ -0,0 +1,96 @@
+import csv
+import importlib.util
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from app.services.counts_repository import CountsRepository
+from app.services.export import iter_export
+
+try:
+    from fastapi.testclient import TestClient
+    from app.api.main import app, get_counts_repository
+    FASTAPI_AVAILABLE = True
+except Exception:
+    TestClient = None
+    app = None
+    get_counts_repository = None
+    FASTAPI_AVAILABLE = False
+
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+START, END = datetime(2026, 2, 12), datetime(2026, 2, 13)
+
+
+class ExportTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        temp.close()
+        self.db_path = temp.name
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE counts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    direction TEXT NOT NULL,
+                    object_id INTEGER NOT NULL
+                )
+                """
+            )
+            rows = [(f"2026-02-12 08:{i:02d}:00", "IN" if i % 3 else "OUT", i) for i in range(25)]
+            rows.append(("2026-02-13 00:00:00", "IN", 99))  # exclude (upper bound)
+            conn.executemany("INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)", rows)
+        self.repo = CountsRepository(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            try:
+                os.remove(self.db_path)
+            except PermissionError:
+                pass
+
+    def test_repository_iterates_in_bounded_chunks(self):
+        chunks = list(self.repo.iter_counts_between(START, END, chunk_size=10))
+
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        self.assertEqual(chunks[0][0], (1, "2026-02-12 08:00:00", "OUT", 0))
+
+    def test_csv_export_streams_header_then_one_block_per_chunk(self):
+        chunks = list(iter_export(self.repo, START, END, "csv", direction="OUT", chunk_size=4))
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+        self.assertEqual(len(chunks), 1 + 3)
+        self.assertEqual(rows[0], ["id", "timestamp", "direction", "object_id"])
+        self.assertEqual(len(rows) - 1, 9)
+        self.assertTrue(all(row[2] == "OUT" for row in rows[1:]))
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow nao esta instalado no ambiente")
+    def test_parquet_export_writes_one_row_group_per_chunk(self):
+        import pyarrow.parquet as pq
+
+        chunks = list(iter_export(self.repo, START, END, "parquet", chunk_size=10))
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(parquet.metadata.num_rows, 25)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.read().column("object_id").to_pylist(), list(range(25)))
+
+    @unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi nao esta instalado no ambiente")
+    def test_export_endpoint_streams_csv(self):
+        app.dependency_overrides[get_counts_repository] = lambda: self.repo
+        try:
+            response = TestClient(app).get("/export", params={"start": "2026-02-12", "end": "2026-02-12"})
+        finally:
+            app.dependency_overrides.clear()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("counts_2026-02-12_2026-02-12.csv", response.headers["content-disposition"])
+        self.assertEqual(len(response.text.strip().splitlines()), 26)
+
+
+if __name__ == "__main__":
+    unittest.main()
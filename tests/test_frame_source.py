@@ -0,0 +1,123 @@
+import unittest
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = hasattr(cv2, "CAP_PROP_FPS")
+except Exception:
+    CV2_AVAILABLE = False
+
+if CV2_AVAILABLE:
+    from app.core.capture import FrameSource
+
+
+class _FakeCapture:
+    def __init__(self, source, frames=10, shape=(4, 6, 3), clock=None, read_seconds=()):
+        self.frames = frames
+        self.clock = clock
+        self.read_seconds = list(read_seconds)
+        self.shape = shape
+        self.read_calls = 0
+        self.grab_calls = 0
+        self.allocations = 0
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 25.0 if prop == cv2.CAP_PROP_FPS else 0.0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.read_calls + self.grab_calls >= self.frames:
+            return False, None
+        self.read_calls += 1
+        if self.read_seconds:
+            self.clock.now += self.read_seconds.pop(0)
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+            self.allocations += 1
+        image.fill(self.read_calls)
+        return True, image
+
+    def grab(self):
+        if self.read_calls + self.grab_calls >= self.frames:
+            return False
+        self.grab_calls += 1
+        return True
+
+    def release(self):
+        pass
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@unittest.skipUnless(CV2_AVAILABLE, "opencv nao esta instalado no ambiente")
+class FrameSourceTests(unittest.TestCase):
+    def _open(self, source=0, clock=None, **kwargs):
+        fake = {}
+
+        def factory(source):
+            fake["cap"] = _FakeCapture(source, clock=clock, **kwargs)
+            return fake["cap"]
+
+        source = FrameSource(source, ring_size=2, capture_factory=factory, clock=clock or _FakeClock())
+        self.assertTrue(source.open())
+        return source, fake["cap"]
+
+    def test_read_reuses_preallocated_ring_buffers(self):
+        source, cap = self._open()
+
+        frames = [source.read() for _ in range(6)]
+
+        self.assertEqual(cap.allocations, 1)
+        self.assertEqual(source.ring_allocations, 1)
+        self.assertEqual(len({id(f) for f in frames}), 2)
+        self.assertIs(frames[0], frames[2])
+        self.assertIsNot(frames[4], frames[5])
+
+    def test_skip_only_grabs_without_decoding(self):
+        source, cap = self._open()
+
+        self.assertTrue(source.skip())
+        self.assertIsNotNone(source.read())
+
+        self.assertEqual((cap.grab_calls, cap.read_calls), (1, 1))
+        self.assertEqual((source.frames_skipped, source.frames_decoded), (1, 1))
+
+    def test_read_returns_none_at_end_of_stream(self):
+        source, _ = self._open(frames=1)
+
+        self.assertIsNotNone(source.read())
+        self.assertIsNone(source.read())
+
+    def test_live_backlog_follows_read_latency(self):
+        clock = _FakeClock()
+        # 25 fps na fonte: intervalo de 40 ms, backlog abaixo de 20 ms por leitura.
+        source, _ = self._open(source="rtsp://camera/stream", clock=clock, read_seconds=[0.039, 0.004, 0.025])
+
+        self.assertFalse(source.has_backlog())
+        source.read()
+        self.assertFalse(source.has_backlog())
+        source.read()
+        self.assertTrue(source.has_backlog())
+        source.read()
+        self.assertFalse(source.has_backlog())
+
+    def test_file_source_always_has_backlog(self):
+        source, _ = self._open(source="videos/sample.mp4")
+
+        self.assertTrue(source.has_backlog())
+
+
+if __name__ == "__main__":
+    unittest.main()
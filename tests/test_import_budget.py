@@ -0,0 +1,90 @@
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Orçamento (ms) do import de cada ponto de entrada e módulos que não podem ser carregados nele.
+# PFM_IMPORT_BUDGET_SCALE ajusta os limites em máquinas mais lentas (ex.: CI compartilhado).
+ENTRY_POINTS = {
+    "app.api.main": (1200, ("pandas", "numpy", "yaml", "plotly", "fpdf")),
+    "app.core.pipeline": (800, ("ultralytics", "torch", "pandas", "plotly", "fpdf")),
+    "app.ui.dashboard": (4000, ("fpdf", "kaleido", "plotly")),
+}
+
+# Módulos da aplicação importados pelo dashboard: verificados mesmo sem streamlit instalado.
+DASHBOARD_DEPENDENCIES_FORBIDDEN = ("pandas", "numpy", "plotly", "fpdf", "kaleido")
+
+
+def dashboard_app_imports() -> list[str]:
+    """Módulos `app.*` importados no topo de app/ui/dashboard.py."""
+    tree = ast.parse((ROOT_DIR / "app" / "ui" / "dashboard.py").read_text(encoding="utf-8"))
+    modules = [node.module for node in tree.body if isinstance(node, ast.ImportFrom) and node.module]
+    modules += [alias.name for node in tree.body if isinstance(node, ast.Import) for alias in node.names]
+    return [module for module in modules if module.startswith("app.")]
+
+
+def measure_import(module: str, *extra: str) -> tuple[float, set[str]]:
+    """
+    Importa `module` (e `extra`) em um processo novo com -X importtime; retorna
+    (ms cumulativos de `module`, módulos importados).
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join((module, *extra))}"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            total_us = int(cumulative)
+    if total_us is None:
+        raise AssertionError(f"{module} não apareceu na saída de -X importtime")
+    return total_us / 1000.0, imported
+
+
+class ImportBudgetTests(unittest.TestCase):
+    scale = float(os.getenv("PFM_IMPORT_BUDGET_SCALE", "1"))
+
+    def _check(self, module: str) -> None:
+        budget_ms, forbidden = ENTRY_POINTS[module]
+        elapsed_ms, imported = measure_import(module)
+        self.assertFalse(imported & set(forbidden), f"{module} importou {sorted(imported & set(forbidden))}")
+        self.assertLessEqual(elapsed_ms, budget_ms * self.scale, f"{module}: {elapsed_ms:.0f} ms")
+
+    @unittest.skipUnless(importlib.util.find_spec("fastapi"), "fastapi nao esta instalado no ambiente")
+    def test_api_entry_point(self):
+        self._check("app.api.main")
+
+    @unittest.skipUnless(importlib.util.find_spec("cv2"), "opencv nao esta instalado no ambiente")
+    def test_pipeline_entry_point(self):
+        self._check("app.core.pipeline")
+
+    @unittest.skipUnless(importlib.util.find_spec("streamlit"), "streamlit nao esta instalado no ambiente")
+    def test_dashboard_entry_point(self):
+        self._check("app.ui.dashboard")
+
+    def test_dashboard_dependencies_stay_lazy(self):
+        modules = dashboard_app_imports()
+        self.assertIn("app.services.dashboard_reporting", modules)
+        _, imported = measure_import(*modules)
+        forbidden = imported & set(DASHBOARD_DEPENDENCIES_FORBIDDEN)
+        self.assertFalse(forbidden, f"dependências do dashboard importaram {sorted(forbidden)}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.tracking.iou_tracker import IoUTracker, iou_matrix
+from app.tracking.tracker import PersonTracker
+
+
+class _FakeDetectDetector:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.confs_requested = []
+
+    def detect(self, frame, conf=None):
+        self.confs_requested.append(conf)
+        boxes, confs = self.frames.pop(0)
+        return SimpleNamespace(
+            boxes=SimpleNamespace(xyxy=np.asarray(boxes, dtype=np.float32), conf=np.asarray(confs, dtype=np.float32))
+        )
+
+
+class IoUTrackerTests(unittest.TestCase):
+    def test_iou_matrix_matches_manual_values(self):
+        a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+
+        iou = iou_matrix(a, b)
+
+        np.testing.assert_allclose(iou, [[1.0, 50 / 150, 0.0]], rtol=1e-6)
+
+    def test_ids_persist_while_boxes_move(self):
+        tracker = IoUTracker(high_conf=0.5)
+
+        _, ids_1, _ = tracker.update([[0, 0, 10, 20], [50, 0, 60, 20]], [0.9, 0.9])
+        _, ids_2, _ = tracker.update([[2, 2, 12, 22], [52, 2, 62, 22]], [0.9, 0.9])
+        _, ids_3, _ = tracker.update([[4, 4, 14, 24], [54, 4, 64, 24]], [0.9, 0.9])
+
+        self.assertListEqual(ids_1.tolist(), [1, 2])
+        self.assertListEqual(ids_2.tolist(), [1, 2])
+        self.assertListEqual(ids_3.tolist(), [1, 2])
+
+    def test_low_confidence_detection_keeps_existing_track_but_never_opens_one(self):
+        tracker = IoUTracker(high_conf=0.5, low_conf=0.1)
+        tracker.update([[0, 0, 10, 20]], [0.9])
+
+        _, ids, _ = tracker.update([[1, 1, 11, 21], [80, 80, 90, 100]], [0.2, 0.2])
+
+        self.assertListEqual(ids.tolist(), [1])
+        self.assertEqual(tracker.active_tracks, 1)
+
+    def test_unmatched_track_coasts_on_its_velocity_without_float_errors(self):
+        tracker = IoUTracker(high_conf=0.5, max_age=5)
+        tracker.update([[0, 0, 10, 20]], [0.9])
+        tracker.update([[2, 0, 12, 20]], [0.9])
+        boxes, velocity = tracker._boxes.copy(), tracker._velocity.copy()
+
+        with np.errstate(all="raise"):
+            tracker.update([[80, 80, 90, 100]], [0.9])
+
+        np.testing.assert_array_equal(tracker._velocity[0], velocity[0])
+        np.testing.assert_array_equal(tracker._boxes[0], boxes[0] + velocity[0])
+
+    def test_lost_tracks_are_dropped_after_max_age(self):
+        tracker = IoUTracker(max_age=2)
+        tracker.update([[0, 0, 10, 20]], [0.9])
+
+        for _ in range(3):
+            tracker.update(np.empty((0, 4)), np.empty(0))
+
+        self.assertEqual(tracker.active_tracks, 0)
+        _, ids, _ = tracker.update([[0, 0, 10, 20]], [0.9])
+        self.assertListEqual(ids.tolist(), [2])
+
+    def test_person_tracker_native_mode_uses_detect_outputs(self):
+        detector = _FakeDetectDetector(
+            [
+                ([[0, 0, 10, 20]], [0.9]),
+                ([[1, 1, 11, 21]], [0.9]),
+            ]
+        )
+        tracker = PersonTracker(tracker_config="native", conf=0.3)
+
+        tracker.update(detector, frame=None)
+        result = tracker.update(detector, frame=None)
+
+        self.assertListEqual(result.ids.tolist(), [1])
+        self.assertEqual(result.boxes.shape, (1, 4))
+        self.assertEqual(detector.confs_requested, [0.1, 0.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.services.live_state import LiveStateReader, LiveStateWriter, _SEQ, _SEQ_OFFSET
+
+
+class LiveStateTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "live_state.bin"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reader_without_pipeline_returns_none(self):
+        reader = LiveStateReader(self.path)
+        self.assertIsNone(reader.read())
+
+        writer = LiveStateWriter(self.path)
+        self.assertIsNone(reader.read())  # arquivo criado, nada publicado
+        writer.close()
+
+    def test_publish_and_fresh_read(self):
+        writer = LiveStateWriter(self.path)
+        reader = LiveStateReader(self.path)
+        writer.publish(10, 4, 2, now=1000.0)
+
+        state = reader.read()
+        self.assertEqual((state.in_count, state.out_count, state.active_tracks), (10, 4, 2))
+        self.assertEqual(state.occupancy, 6)
+        self.assertIsNotNone(reader.read_fresh(5.0, now=1003.0))
+        self.assertIsNone(reader.read_fresh(5.0, now=1010.0))
+
+        writer.publish(10, 4, 2, day=date.today() - timedelta(days=1))
+        self.assertIsNone(reader.read_fresh(5.0))
+        writer.publish(11, 4, 1)
+        self.assertEqual(reader.read_fresh(5.0).in_count, 11)
+        writer.close()
+
+    def test_write_in_progress_is_never_returned(self):
+        writer = LiveStateWriter(self.path)
+        writer.publish(1, 1, 0)
+        _SEQ.pack_into(writer._mm, _SEQ_OFFSET, writer._seq + 1)  # escritor interrompido no meio
+
+        self.assertIsNone(LiveStateReader(self.path, max_retries=5).read())
+        writer.close()
+
+        restarted = LiveStateWriter(self.path)
+        restarted.publish(2, 0, 0)
+        self.assertEqual(LiveStateReader(self.path).read().in_count, 2)
+        restarted.close()
+
+    def test_concurrent_reads_are_consistent(self):
+        writer = LiveStateWriter(self.path)
+        writer.publish(0, 0, 0)
+        stop = threading.Event()
+
+        def write_loop():
+            n = 0
+            while not stop.is_set():
+                n += 1
+                writer.publish(n, n, n)
+
+        thread = threading.Thread(target=write_loop)
+        thread.start()
+        reader = LiveStateReader(self.path)
+        reads = 0
+        deadline = time.monotonic() + 0.3
+        try:
+            while time.monotonic() < deadline:
+                state = reader.read()
+                if state is not None:
+                    self.assertEqual(state.in_count, state.out_count)
+                    self.assertEqual(state.in_count, state.active_tracks)
+                    reads += 1
+        finally:
+            stop.set()
+            thread.join()
+            writer.close()
+        self.assertGreater(reads, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.utils import logger as logger_module
+from app.utils.logger import RateLimitFilter, configure_logging, stop_logging
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger("PeopleFlowMonitor.test")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.stdout = io.StringIO()
+        self._stdout_patch = patch.object(logger_module.sys, "stdout", self.stdout)
+        self._stdout_patch.start()
+
+    def tearDown(self):
+        stop_logging()
+        self._stdout_patch.stop()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        self.logger.filters.clear()
+        self.tmp.cleanup()
+
+    def test_rate_limit_per_message_key_reports_suppressed(self):
+        clock = FakeClock()
+        rate_filter = RateLimitFilter(burst=2, window=10.0, clock=clock)
+        configure_logging(self.logger)
+        self.logger.addFilter(rate_filter)
+
+        for obj_id in range(5):
+            self.logger.info("IN detectado | ID: %s", obj_id)
+        self.logger.warning("outra mensagem")
+        clock.now = 10.0
+        self.logger.info("IN detectado | ID: %s", 99)
+
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].endswith("ID: 0"))
+        self.assertTrue(lines[1].endswith("ID: 1"))
+        self.assertIn("outra mensagem", lines[2])
+        self.assertTrue(lines[3].endswith("ID: 99 (+3 suprimidas)"))
+
+    def test_async_mode_writes_from_listener_with_json_sink(self):
+        json_path = Path(self.tmp.name) / "pfm.jsonl"
+        configure_logging(self.logger, async_mode=True, json_path=str(json_path), rate_limit=1)
+
+        self.logger.error("Erro durante o processamento de IA: %s", "falha")
+        self.logger.error("Erro durante o processamento de IA: %s", "falha")
+        stop_logging()  # esvazia a fila
+
+        self.assertEqual(len(self.stdout.getvalue().splitlines()), 1)
+        records = [json.loads(line) for line in json_path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["level"], "ERROR")
+        self.assertEqual(records[0]["msg"], "Erro durante o processamento de IA: falha")
+
+
+if __name__ == "__main__":
+    unittest.main()
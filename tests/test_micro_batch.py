@@ -0,0 +1,139 @@
+import sys
+import types
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules["cv2"] = types.ModuleType("cv2")
+if "ultralytics" not in sys.modules:
+    ultralytics_stub = types.ModuleType("ultralytics")
+    ultralytics_stub.YOLO = object
+    sys.modules["ultralytics"] = ultralytics_stub
+
+from app.analytics.counter import StreamCounter
+from app.core.pipeline import ProcessingPipeline
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import NullStorage, ZERO_COUNTS
+from app.utils.logger import log
+
+ZONES = {"counting_line": {"y_ratio": 0.5, "offset": 0.05}}
+
+
+def _frame(index):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    frame[0, 0, 0] = index
+    return frame
+
+
+class _ScriptedDetector:
+    """Uma pessoa descendo (IN) e outra subindo (OUT); a posição depende do índice gravado no frame."""
+
+    def __init__(self):
+        self.single_calls = 0
+        self.batch_sizes = []
+
+    def _result(self, frame):
+        i = int(frame[0, 0, 0])
+        boxes = np.array(
+            [[10.0, 5.0 + 6 * i, 30.0, 25.0 + 6 * i], [60.0, 95.0 - 6 * i, 80.0, 115.0 - 6 * i]],
+            dtype=np.float32,
+        )
+        return SimpleNamespace(boxes=SimpleNamespace(xyxy=boxes, conf=np.array([0.9, 0.9]), id=None))
+
+    def detect(self, frame, conf=None):
+        self.single_calls += 1
+        return self._result(frame)
+
+    def detect_batch(self, frames, conf=None):
+        self.batch_sizes.append(len(frames))
+        return [self._result(frame) for frame in frames]
+
+
+class _ScriptedCapture:
+    def __init__(self, n_frames, backlog=True):
+        self.frames = [_frame(i) for i in range(n_frames)]
+        self.position = 0
+        self.backlog = backlog
+
+    def is_opened(self):
+        return self.position < len(self.frames)
+
+    def read(self):
+        if self.position >= len(self.frames):
+            return None
+        self.position += 1
+        return self.frames[self.position - 1]
+
+    def skip(self):
+        self.position += 1
+        return self.position <= len(self.frames)
+
+    def has_backlog(self):
+        return self.backlog
+
+
+class MicroBatchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def _pipeline(self, micro_batch):
+        pipeline = ProcessingPipeline.__new__(ProcessingPipeline)
+        pipeline.detector = _ScriptedDetector()
+        pipeline.tracker = PersonTracker(tracker_config="native")
+        pipeline.counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS), zones_config=ZONES)
+        pipeline.recorder = None
+        pipeline.live_state = None
+        pipeline.zones_watcher = None
+        pipeline.startup_timer = None
+        pipeline.headless = True
+        pipeline.skip_frames = 1
+        pipeline.micro_batch = micro_batch
+        return pipeline
+
+    def test_update_batch_matches_sequential_native_tracking(self):
+        frames = [_frame(i) for i in range(6)]
+        detector = _ScriptedDetector()
+
+        sequential = PersonTracker(tracker_config="native")
+        expected = [sequential.update(detector, frame) for frame in frames]
+        batched = PersonTracker(tracker_config="native").update_batch(detector, frames)
+
+        self.assertEqual(detector.batch_sizes, [6])
+        for got, want in zip(batched, expected):
+            np.testing.assert_array_equal(got.ids, want.ids)
+            np.testing.assert_array_equal(got.boxes, want.boxes)
+
+    def test_micro_batched_run_counts_like_frame_by_frame(self):
+        reference = self._pipeline(micro_batch=1)
+        reference._run_frames(_ScriptedCapture(16))
+
+        batched = self._pipeline(micro_batch=4)
+        frames = batched._run_micro_batched(_ScriptedCapture(16))
+
+        self.assertEqual(frames, 16)
+        self.assertEqual((reference.counter.in_count, reference.counter.out_count), (1, 1))
+        self.assertEqual(
+            (batched.counter.in_count, batched.counter.out_count),
+            (reference.counter.in_count, reference.counter.out_count),
+        )
+        self.assertEqual(batched.detector.batch_sizes, [4, 4, 4, 4])
+        self.assertEqual(batched.detector.single_calls, 0)
+
+    def test_live_source_without_backlog_is_not_delayed(self):
+        pipeline = self._pipeline(micro_batch=4)
+        pipeline._run_micro_batched(_ScriptedCapture(5, backlog=False))
+        self.assertEqual(pipeline.detector.batch_sizes, [1, 1, 1, 1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
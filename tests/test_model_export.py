@@ -0,0 +1,72 @@
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+from app.detection.model_export import ensure_exported_model, exported_model_path
+from app.utils.logger import log
+
+
+class _FakeExportYOLO:
+    exports = []
+
+    def __init__(self, weights):
+        self.weights = Path(weights)
+
+    def export(self, **kwargs):
+        _FakeExportYOLO.exports.append(kwargs)
+        exported = self.weights.with_suffix(".onnx")
+        exported.write_bytes(b"onnx")
+        return str(exported)
+
+
+class ModelExportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.weights = Path(self.tmp.name) / "yolov8n.pt"
+        self.weights.write_bytes(b"pt")
+        _FakeExportYOLO.exports = []
+        self._prev_ultralytics = sys.modules.get("ultralytics")
+        stub = types.ModuleType("ultralytics")
+        stub.YOLO = _FakeExportYOLO
+        sys.modules["ultralytics"] = stub
+
+    def tearDown(self):
+        if self._prev_ultralytics is not None:
+            sys.modules["ultralytics"] = self._prev_ultralytics
+        else:
+            sys.modules.pop("ultralytics", None)
+        self.tmp.cleanup()
+
+    def test_exported_path_encodes_backend_size_and_precision(self):
+        self.assertEqual(exported_model_path(self.weights, "torch", 640), self.weights)
+        self.assertEqual(exported_model_path(self.weights, "onnx", 416).name, "yolov8n_416.onnx")
+        self.assertEqual(
+            exported_model_path(self.weights, "openvino", 320, int8=True).name,
+            "yolov8n_320_int8_openvino_model",
+        )
+        with self.assertRaises(ValueError):
+            exported_model_path(self.weights, "tensorrt", 640)
+
+    def test_export_runs_once_and_is_reused_from_cache(self):
+        first = ensure_exported_model(self.weights, "onnx", 416)
+        second = ensure_exported_model(self.weights, "onnx", 416)
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.exists())
+        self.assertEqual(len(_FakeExportYOLO.exports), 1)
+        self.assertEqual(_FakeExportYOLO.exports[0], {"format": "onnx", "imgsz": 416})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+from app.analytics.occupancy import OccupancyIndex
+from app.analytics.statistics import StatsAnalyzer
+from app.services.occupancy_store import ensure_occupancy_table
+from app.services.storage import StorageService
+from app.utils.logger import log
+
+DAY = date(2026, 2, 12)
+
+
+class OccupancyIndexTests(unittest.TestCase):
+    def setUp(self):
+        # 08:00 +3 -> 3 | 08:30 -1 -> 2 | 09:00 +2 -4 -> 0 (limitado em zero)
+        self.index = OccupancyIndex(DAY, [(480, 3, 0), (510, 0, 1), (540, 2, 4)])
+
+    def test_point_queries_follow_prefix_sums(self):
+        self.assertEqual(self.index.at("07:59"), 0)
+        self.assertEqual(self.index.at("08:00"), 3)
+        self.assertEqual(self.index.at("08:45"), 2)
+        self.assertEqual(self.index.at("09:00"), 0)
+        self.assertEqual(self.index.at("23:59"), 0)
+
+    def test_range_stats_match_brute_force(self):
+        for start, end in [(0, 1439), (480, 480), (479, 541), (500, 530), (509, 510)]:
+            window = self.index.occupancy[start:end + 1].tolist()
+            stats = self.index.range_stats(start, end)
+            self.assertEqual(stats["min"], min(window))
+            self.assertEqual(stats["max"], max(window))
+            self.assertAlmostEqual(stats["avg"], round(sum(window) / len(window), 2))
+
+    def test_invalid_ranges_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            self.index.range_stats("10:00", "09:00")
+        with self.assertRaises(ValueError):
+            self.index.at("24:00")
+
+
+class OccupancyStorageTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        temp.close()
+        self.db_path = temp.name
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.db_path + suffix)
+            except (FileNotFoundError, PermissionError):
+                pass
+
+    def _create_counts(self, rows):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE counts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    direction TEXT NOT NULL,
+                    object_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.executemany("INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)", rows)
+
+    def test_flush_upserts_minute_flows(self):
+        storage = StorageService(db_path=self.db_path)
+        storage._batch_size = 100
+        for direction, object_id in [("IN", 1), ("IN", 2), ("OUT", 1)]:
+            storage.save_count(direction, object_id)
+        storage._flush_if_needed(force=True)
+        storage.save_count("IN", 3)
+        storage.close()
+
+        with sqlite3.connect(self.db_path) as conn:
+            totals = conn.execute("SELECT SUM(in_count), SUM(out_count) FROM occupancy_minute").fetchone()
+
+        self.assertEqual(totals, (3, 1))
+
+    def test_existing_events_are_backfilled_once(self):
+        self._create_counts(
+            [
+                ("2026-02-12 08:00:10", "IN", 1),
+                ("2026-02-12 08:00:50", "IN", 2),
+                ("2026-02-12 08:01:00", "OUT", 1),
+            ]
+        )
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertTrue(ensure_occupancy_table(conn))
+            self.assertFalse(ensure_occupancy_table(conn))
+            rows = conn.execute("SELECT * FROM occupancy_minute ORDER BY minute").fetchall()
+
+        self.assertEqual(rows, [("2026-02-12 08:00", 2, 0), ("2026-02-12 08:01", 0, 1)])
+
+    def test_stats_analyzer_index_with_and_without_minute_table(self):
+        self._create_counts(
+            [
+                ("2026-02-12 08:00:10", "IN", 1),
+                ("2026-02-12 08:05:00", "IN", 2),
+                ("2026-02-12 09:00:00", "OUT", 1),
+                ("2026-02-13 00:00:00", "IN", 3),  # outro dia
+            ]
+        )
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+
+        from_counts = analyzer.get_occupancy_index(DAY)
+        with sqlite3.connect(self.db_path) as conn:
+            ensure_occupancy_table(conn)
+        from_minutes = analyzer.get_occupancy_index(DAY)
+
+        for index in (from_counts, from_minutes):
+            self.assertEqual(index.at("08:30"), 2)
+            self.assertEqual(index.at("23:59"), 1)
+            self.assertEqual((index.in_total, index.out_total), (2, 1))
+
+
+    def test_stats_analyzer_reuses_index_until_data_changes(self):
+        self._create_counts([("2026-02-12 08:00:10", "IN", 1)])
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+
+        first = analyzer.get_occupancy_index(DAY)
+        self.assertIs(StatsAnalyzer(db_path=self.db_path).get_occupancy_index(DAY), first)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO counts (timestamp, direction, object_id) VALUES ('2026-02-12 08:01:00', 'IN', 2)")
+        rebuilt = analyzer.get_occupancy_index(DAY)
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.at("08:30"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
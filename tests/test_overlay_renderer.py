@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = hasattr(cv2, "resize")
+except Exception:
+    CV2_AVAILABLE = False
+
+if CV2_AVAILABLE:
+    from app.core.overlay import OverlayRenderer, LINE_UP_COLOR
+from app.tracking.track_batch import TrackBatch
+
+
+@unittest.skipUnless(CV2_AVAILABLE, "opencv nao esta instalado no ambiente")
+class OverlayRendererTests(unittest.TestCase):
+    def test_renders_at_display_size_with_scaled_lines(self):
+        renderer = OverlayRenderer(display_width=640)
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+        annotated = renderer.render(frame, None, 3, 1, line_y_ratio=0.5, offset=0.1)
+
+        self.assertEqual(annotated.shape, (360, 640, 3))
+        line_up_y = int(360 * 0.4)
+        self.assertEqual(tuple(annotated[line_up_y, 320]), LINE_UP_COLOR)
+        self.assertFalse(frame.any(), "frame de origem nao deve ser alterado quando ha resize")
+
+    def test_static_layer_rebuilt_only_when_size_or_zone_changes(self):
+        renderer = OverlayRenderer(display_width=640)
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        for counts in range(5):
+            renderer.render(frame, None, counts, counts, line_y_ratio=0.5, offset=0.05)
+        self.assertEqual(renderer.layer_builds, 1)
+
+        renderer.render(frame, None, 0, 0, line_y_ratio=0.6, offset=0.05)
+        self.assertEqual(renderer.layer_builds, 2)
+
+        renderer.render(np.zeros((480, 640, 3), dtype=np.uint8), None, 0, 0, line_y_ratio=0.6, offset=0.05)
+        self.assertEqual(renderer.layer_builds, 3)
+
+    def test_counter_panel_rebuilt_only_when_counts_change(self):
+        renderer = OverlayRenderer(display_width=640)
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+
+        first = renderer.render(frame.copy(), None, 3, 1, line_y_ratio=0.5, offset=0.05)
+        for _ in range(4):
+            renderer.render(frame.copy(), None, 3, 1, line_y_ratio=0.5, offset=0.05)
+        self.assertEqual(renderer.panel_builds, 1)
+
+        changed = renderer.render(frame.copy(), None, 4, 1, line_y_ratio=0.5, offset=0.05)
+        self.assertEqual(renderer.panel_builds, 2)
+        self.assertFalse(np.array_equal(first[40:56], changed[40:56]))
+        self.assertTrue(np.array_equal(first[60:], changed[60:]))
+
+    def test_boxes_are_drawn_with_scaled_coordinates(self):
+        renderer = OverlayRenderer(display_width=640)
+        frame = np.zeros((1440, 2560, 3), dtype=np.uint8)
+        batch = TrackBatch.from_arrays([[1000, 1200, 1400, 1400]], [7], [0.9])
+
+        annotated = renderer.render(frame, batch, 0, 0, line_y_ratio=0.1, offset=0.01)
+
+        # box (1000, 1200) em 2560x1440 -> (250, 300) em 640x360
+        self.assertTrue(annotated[300, 260].any())
+        self.assertFalse(annotated[200, 260].any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,9 @@ import unittest
 import types
 import sys
 
-if "cv2" not in sys.modules:
+try:
+    import cv2  # noqa: F401
+except ImportError:
     sys.modules["cv2"] = types.ModuleType("cv2")
 if "ultralytics" not in sys.modules:
     ultralytics_stub = types.ModuleType("ultralytics")
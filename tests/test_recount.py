@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from app.analytics.counter import StreamCounter
+from app.analytics.recount import recount
+from app.analytics.trajectory_store import TrajectoryArrays, TrajectoryRecorder, load_trajectories
+from app.tracking.track_batch import TrackBatch
+from app.utils.benchmark import NullStorage, ZERO_COUNTS
+from app.utils.logger import log
+
+FRAME_SHAPE = (100, 100, 3)
+ZONES = {"counting_line": {"y_ratio": 0.5, "offset": 0.05, "max_inactive_seconds": 10.0}}
+
+
+def _batch(y_tops, ids):
+    boxes = [[0.0, float(y), 10.0, float(y) + 10.0] for y in y_tops]
+    return TrackBatch.from_arrays(boxes, ids, [1.0] * len(ids))
+
+
+def _frames():
+    """Sequência com IN (id 1), OUT (id 2), oscilação sem contagem (id 3) e duplicata bloqueada (id 1)."""
+    return [
+        _batch([20, 80, 50], [1, 2, 3]),
+        _batch([48, 70, 52], [1, 2, 3]),
+        _batch([90, 30, 48], [1, 2, 3]),
+        _batch([20, 10], [1, 2]),
+        _batch([95], [1]),
+    ]
+
+
+class TrajectoryRecountTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record(self, frames, start=None, step=0.1):
+        start = start if start is not None else datetime(2026, 2, 12, 10, 0, 0).timestamp()
+        recorder = TrajectoryRecorder(self.tmp.name)
+        for i, batch in enumerate(frames):
+            recorder.record(batch, FRAME_SHAPE, start + i * step)
+        recorder.close()
+        return load_trajectories(f"{self.tmp.name}/2026-02-12")
+
+    def test_recorded_columns_round_trip_through_memmap(self):
+        traj = self._record(_frames())
+
+        self.assertEqual(len(traj), 12)
+        self.assertIsInstance(traj.track_id, np.memmap)
+        self.assertListEqual(traj.track_id[:3].tolist(), [1, 2, 3])
+        self.assertListEqual(traj.y_top[:3].tolist(), [20.0, 80.0, 50.0])
+        self.assertTrue((traj.frame_h == 100).all())
+
+    def test_recount_matches_live_stream_counter(self):
+        counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS), zones_config=ZONES)
+        for batch in _frames():
+            counter.count(batch, FRAME_SHAPE)
+
+        result = recount(self._record(_frames()), 0.5, 0.05, max_inactive_seconds=10.0)
+
+        self.assertEqual((result.in_count, result.out_count), (counter.in_count, counter.out_count))
+        self.assertEqual((result.in_count, result.out_count), (1, 1))
+        self.assertListEqual(result.event_track_id.tolist(), [1, 2])
+
+    def test_new_zone_config_changes_counts_without_rerunning_detection(self):
+        traj = self._record(_frames())
+
+        # Faixa [80, 90]: id 1 volta da faixa para o topo (OUT) e id 2 sai de 80 para 70 (OUT).
+        shifted = recount(traj, 0.85, 0.05)
+
+        self.assertEqual((shifted.in_count, shifted.out_count), (0, 2))
+
+    def test_id_released_after_inactivity_can_count_again(self):
+        traj = TrajectoryArrays(
+            frame_time=np.array([0.0, 1.0, 2.0, 30.0, 31.0]),
+            track_id=np.array([5, 5, 5, 5, 5]),
+            frame_h=np.full(5, 100, dtype=np.uint16),
+            box=np.array([[0, y, 1, 1] for y in (20, 80, 20, 20, 80)], dtype=np.float32),
+        )
+
+        result = recount(traj, 0.5, 0.05, max_inactive_seconds=10.0)
+
+        self.assertEqual((result.in_count, result.out_count), (2, 0))
+
+    def test_live_counter_frame_time_agrees_on_inactivity_release(self):
+        counter = StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS), zones_config=ZONES)
+        counter.count(_batch([20], [5]), FRAME_SHAPE, now=0.0)
+        counter.count(_batch([80], [5]), FRAME_SHAPE, now=1.0)
+        counter.count(TrackBatch.empty(), FRAME_SHAPE, now=15.0)  # frames sem o ID durante a ausência
+        counter.count(_batch([20], [5]), FRAME_SHAPE, now=31.0)
+        counter.count(_batch([80], [5]), FRAME_SHAPE, now=32.0)
+
+        self.assertEqual(counter.in_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
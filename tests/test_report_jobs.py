@@ -0,0 +1,191 @@
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from pathlib import Path
+
+from app.services.database import SqliteBackend
+from app.services.report_jobs import CREATE_REPORT_JOBS_SQL, ReportJobQueue, _now
+from app.utils.logger import log
+
+
+def _fake_render(backend, day, capacity_limit, output_dir):
+    """Render de teste: arquivo texto no lugar do PDF; dias 13 sem dados e 14 com erro."""
+    if day.day == 13:
+        return None
+    if day.day == 14:
+        raise RuntimeError("kaleido indisponivel")
+    path = Path(output_dir) / f"relatorio_fluxo_{day}.txt"
+    path.write_text(f"{day} limite={capacity_limit}", encoding="utf-8")
+    return str(path)
+
+
+def _crash_render(backend, day, capacity_limit, output_dir):
+    """Render de teste que derruba o processo worker no dia 12."""
+    if day.day == 12:
+        os._exit(1)
+    return _fake_render(backend, day, capacity_limit, output_dir)
+
+
+class _BrokenExecutor:
+    def __init__(self):
+        self.shutdown_calls = 0
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker encerrado")
+
+    def shutdown(self, wait=True):
+        self.shutdown_calls += 1
+
+
+class _PendingExecutor:
+    """Aceita tarefas e nunca as executa (fila longa em outro processo)."""
+
+    def submit(self, *args, **kwargs):
+        return Future()
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class ReportJobQueueTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = SqliteBackend(Path(self.tmp.name) / "test.db")
+        self.output_dir = Path(self.tmp.name) / "docs"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _queue(self, executor=None, workers=2):
+        return ReportJobQueue(
+            backend=self.backend,
+            output_dir=self.output_dir,
+            workers=workers,
+            executor=executor,
+            render=_fake_render,
+        )
+
+    def test_range_creates_one_job_per_day_with_final_status(self):
+        queue = self._queue(executor=ThreadPoolExecutor(max_workers=2))
+        batch_id = queue.submit(date(2026, 3, 11), date(2026, 3, 14), capacity_limit=40)
+        queue.shutdown(wait=True)
+
+        status = queue.batch_status(batch_id)
+        self.assertEqual((status["total"], status["finished"]), (4, 4))
+        self.assertEqual((status["done"], status["empty"], status["failed"]), (2, 1, 1))
+        by_day = {job["day"]: job for job in status["jobs"]}
+        self.assertEqual(
+            Path(by_day["2026-03-11"]["output_path"]).read_text(encoding="utf-8"), "2026-03-11 limite=40"
+        )
+        self.assertEqual(by_day["2026-03-14"]["error"], "kaleido indisponivel")
+        self.assertIsNone(queue.batch_status("inexistente"))
+
+    def test_rejects_inverted_or_oversized_ranges(self):
+        queue = self._queue(executor=ThreadPoolExecutor(max_workers=1))
+        with self.assertRaises(ValueError):
+            queue.submit(date(2026, 3, 14), date(2026, 3, 11))
+        with self.assertRaises(ValueError):
+            queue.submit(date(2026, 1, 1), date(2026, 6, 1))
+        queue.shutdown()
+
+    def test_process_pool_workers_report_through_job_table(self):
+        queue = self._queue(workers=2)
+        batch_id = queue.submit(date(2026, 3, 10), date(2026, 3, 12))
+        queue.shutdown(wait=True)
+
+        status = queue.batch_status(batch_id)
+        self.assertEqual((status["done"], status["failed"]), (3, 0))
+        self.assertEqual(len(list(self.output_dir.glob("*.txt"))), 3)
+
+    def test_orphaned_jobs_are_failed_so_batches_finish(self):
+        with self.backend.session() as conn:
+            conn.execute(CREATE_REPORT_JOBS_SQL)
+            conn.executemany(
+                """
+                INSERT INTO report_jobs (id, batch_id, day, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    ("a", "antigo", "2026-03-10", "queued", "2026-03-10 08:00:00", "2026-03-10 08:00:00"),
+                    ("b", "antigo", "2026-03-11", "running", "2026-03-10 08:00:00", "2026-03-10 08:00:01"),
+                    ("c", "antigo", "2026-03-12", "done", "2026-03-10 08:00:00", "2026-03-10 08:00:02"),
+                    ("d", "outro", "2026-03-10", "running", _now(), _now()),
+                ],
+            )
+
+        queue = self._queue(executor=ThreadPoolExecutor(max_workers=1))
+        queue.shutdown()
+
+        status = queue.batch_status("antigo")
+        self.assertEqual((status["total"], status["finished"]), (3, 3))
+        self.assertEqual((status["failed"], status["done"]), (2, 1))
+        # Job recente de outro processo (ex.: API e dashboard no mesmo banco) não é tocado.
+        self.assertEqual(queue.batch_status("outro")["running"], 1)
+
+    def test_heartbeat_keeps_long_queued_jobs_from_other_processes_alive(self):
+        owner = ReportJobQueue(
+            backend=self.backend,
+            output_dir=self.output_dir,
+            executor=_PendingExecutor(),
+            render=_fake_render,
+            stale_after=60,
+            heartbeat_interval=0.05,
+        )
+        try:
+            batch_id = owner.submit(date(2026, 3, 10), date(2026, 3, 11))
+            with self.backend.session() as conn:
+                conn.execute("UPDATE report_jobs SET updated_at = '2026-03-10 08:00:00'")
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                with self.backend.session() as conn:
+                    if conn.execute("SELECT MIN(updated_at) FROM report_jobs").fetchone()[0] > "2026-03-10 08:00:00":
+                        break
+                time.sleep(0.02)
+
+            # Outra fila no mesmo banco (outro processo) não marca como órfãos jobs que o dono ainda renova.
+            other = ReportJobQueue(backend=self.backend, output_dir=self.output_dir, render=_fake_render, stale_after=60)
+            self.assertEqual(other.batch_status(batch_id)["queued"], 2)
+        finally:
+            owner.shutdown()
+
+    def test_broken_pool_on_submit_fails_jobs_and_discards_pool(self):
+        executor = _BrokenExecutor()
+        queue = self._queue(executor=executor)
+
+        batch_id = queue.submit(date(2026, 3, 10), date(2026, 3, 12))
+
+        status = queue.batch_status(batch_id)
+        self.assertEqual((status["total"], status["failed"], status["finished"]), (3, 3, 3))
+        self.assertIn("worker encerrado", status["jobs"][0]["error"])
+        self.assertEqual(executor.shutdown_calls, 1)
+        self.assertIsNone(queue._executor)
+
+    def test_dead_worker_fails_batch_and_next_submit_gets_new_pool(self):
+        queue = ReportJobQueue(backend=self.backend, output_dir=self.output_dir, workers=1, render=_crash_render)
+        try:
+            crashed = queue.submit(date(2026, 3, 12))
+            queue._executor.shutdown(wait=True)
+            self.assertEqual(queue.batch_status(crashed)["failed"], 1)
+
+            batch_id = queue.submit(date(2026, 3, 10))
+            queue.shutdown(wait=True)
+            self.assertEqual(queue.batch_status(batch_id)["done"], 1)
+        finally:
+            queue.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
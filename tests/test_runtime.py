@@ -0,0 +1,73 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.config import settings
+from app.core.runtime import ThreadBudget, apply_stage_affinity, apply_thread_budget, parse_affinity, parse_cpu_list
+from app.utils.logger import log
+
+try:
+    import cv2
+    CV2_AVAILABLE = hasattr(cv2, "setNumThreads")
+except Exception:
+    CV2_AVAILABLE = False
+
+
+class RuntimeBudgetTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def test_parse_cpu_lists_and_stage_affinity(self):
+        self.assertEqual(parse_cpu_list("0-2, 5"), frozenset({0, 1, 2, 5}))
+        self.assertEqual(
+            parse_affinity("pipeline=0-1;decode=2;"),
+            {"pipeline": frozenset({0, 1}), "decode": frozenset({2})},
+        )
+        with self.assertRaises(ValueError):
+            parse_affinity("gpu=0")
+
+    @unittest.skipUnless(CV2_AVAILABLE, "opencv nao esta instalado no ambiente")
+    def test_apply_sets_opencv_threads(self):
+        previous = cv2.getNumThreads()
+        try:
+            apply_thread_budget(ThreadBudget(cv2_threads=1))
+            self.assertEqual(cv2.getNumThreads(), 1)
+        finally:
+            cv2.setNumThreads(previous)
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "afinidade de CPU indisponível")
+    def test_stage_affinity_pins_only_the_calling_thread(self):
+        allowed = os.sched_getaffinity(0)
+        cpu = min(allowed)
+        budget = ThreadBudget(affinity={"flush": frozenset({cpu})})
+        result = {}
+
+        def flush_stage():
+            result["pinned"] = apply_stage_affinity("flush", budget)
+            result["mask"] = os.sched_getaffinity(threading.get_native_id())
+
+        thread = threading.Thread(target=flush_stage)
+        thread.start()
+        thread.join()
+
+        self.assertTrue(result["pinned"])
+        self.assertEqual(result["mask"], {cpu})
+        self.assertEqual(os.sched_getaffinity(0), allowed)
+        self.assertFalse(apply_stage_affinity("decode", budget))
+
+
+    def test_invalid_affinity_setting_is_logged_not_raised(self):
+        with patch.object(settings, "CPU_AFFINITY", "flush=x"):
+            self.assertFalse(apply_stage_affinity("flush"))
+        with patch.object(settings, "CPU_AFFINITY", "gpu=0"):
+            self.assertFalse(apply_stage_affinity("decode"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = hasattr(cv2, "VideoWriter")
+except Exception:
+    CV2_AVAILABLE = False
+
+if CV2_AVAILABLE:
+    from app.core.capture import FrameSource
+    from app.core.shm_capture import SharedFrameRing, SharedFrameSource
+
+
+def _write_clip(path, frames=12, shape=(48, 64)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (shape[1], shape[0]))
+    for i in range(frames):
+        frame = np.zeros((*shape, 3), dtype=np.uint8)
+        frame[:, : (i + 1) * 4] = 20 * i
+        writer.write(frame)
+    writer.release()
+
+
+@unittest.skipUnless(CV2_AVAILABLE, "opencv nao esta instalado no ambiente")
+class SharedFrameSourceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clip = os.path.join(self.tmp.name, "clip.avi")
+        _write_clip(self.clip)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ring_slots_are_views_over_shared_memory(self):
+        ring = SharedFrameRing((4, 6, 3), slots=3)
+        attached = SharedFrameRing((4, 6, 3), slots=3, name=ring.name)
+        try:
+            ring.slot(1)[...] = 7
+            self.assertTrue(np.all(attached.slot(1) == 7))
+            self.assertTrue(np.all(attached.slot(0) == 0))
+        finally:
+            attached.close()
+            ring.close()
+
+    def test_frames_match_in_process_decode(self):
+        local = FrameSource(self.clip, ring_size=1)
+        self.assertTrue(local.open())
+        expected = []
+        while (frame := local.read()) is not None:
+            expected.append(frame.copy())
+        local.release()
+
+        shared = SharedFrameSource(self.clip, slots=3, hold=1)
+        self.assertTrue(shared.open())
+        received, indices = [], []
+        try:
+            while (frame := shared.read()) is not None:
+                received.append(frame.copy())
+                indices.append(shared.last_frame_index)
+            self.assertFalse(shared.is_opened())
+        finally:
+            shared.release()
+
+        self.assertEqual(len(received), len(expected))
+        self.assertEqual(indices, list(range(len(expected))))
+        for got, want in zip(received, expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_held_frames_stay_valid_and_skip_advances(self):
+        shared = SharedFrameSource(self.clip, slots=4, hold=2)
+        self.assertTrue(shared.open())
+        try:
+            first = shared.read()
+            snapshot = first.copy()
+            shared.read()
+            np.testing.assert_array_equal(first, snapshot)  # ainda retido (hold=2)
+
+            self.assertTrue(shared.skip())
+            self.assertEqual(shared.read() is not None, True)
+            self.assertEqual(shared.last_frame_index, 3)
+            self.assertEqual((shared.frames_decoded, shared.frames_skipped), (3, 1))
+        finally:
+            del first
+            shared.release()
+
+    def test_open_fails_for_missing_source(self):
+        shared = SharedFrameSource(os.path.join(self.tmp.name, "missing.avi"))
+        self.assertFalse(shared.open())
+        self.assertIsNone(shared.read())
+        shared.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import sys
+import threading
+import types
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules["cv2"] = types.ModuleType("cv2")
+if "ultralytics" not in sys.modules:
+    ultralytics_stub = types.ModuleType("ultralytics")
+    ultralytics_stub.YOLO = object
+    sys.modules["ultralytics"] = ultralytics_stub
+
+from app.analytics.counter import StreamCounter
+from app.core.pipeline import ProcessingPipeline
+from app.core.runtime import StartupTimer
+from app.detection.loader import BackgroundModelLoader
+from app.tracking.tracker import PersonTracker
+from app.utils.benchmark import NullStorage, ZERO_COUNTS
+from app.utils.logger import log
+
+ZONES = {"counting_line": {"y_ratio": 0.5, "offset": 0.05}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _SlowDetector:
+    """Detector que só fica pronto quando o teste libera `release`; registra o warmup."""
+
+    def __init__(self, events):
+        self.events = events
+        self.warmed = False
+
+    def warmup(self):
+        self.warmed = True
+        self.events.append("warmup")
+
+    def detect(self, frame, conf=None):
+        boxes = np.array([[10.0, 10.0, 30.0, 30.0]], dtype=np.float32)
+        return SimpleNamespace(boxes=SimpleNamespace(xyxy=boxes, conf=np.array([0.9]), id=None))
+
+
+class _FakeFrameSource:
+    """Fonte de 3 frames; ao abrir, libera o carregamento do modelo (prova que a captura veio antes)."""
+
+    events = None
+    opened = None
+
+    def __init__(self, source, ring_size=3):
+        self.frames = [np.zeros((100, 100, 3), dtype=np.uint8) for _ in range(3)]
+        self.position = 0
+
+    def open(self):
+        self.events.append("captura")
+        self.opened.set()
+        return True
+
+    def is_opened(self):
+        return self.position < len(self.frames)
+
+    def read(self):
+        if self.position >= len(self.frames):
+            return None
+        self.position += 1
+        return self.frames[self.position - 1]
+
+    def skip(self):
+        self.position += 1
+        return self.position <= len(self.frames)
+
+    def release(self):
+        self.events.append("release")
+
+
+class StartupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def test_timer_accumulates_phases_and_summary(self):
+        clock = FakeClock()
+        timer = StartupTimer(clock=clock)
+        with timer.phase("modelo"):
+            clock.now = 2.0
+        with timer.phase("captura"):
+            clock.now = 2.5
+
+        self.assertEqual(timer.phases, {"modelo": 2.0, "captura": 0.5})
+        self.assertEqual(timer.summary(), "Inicialização | modelo 2.00s | captura 0.50s | primeira contagem em 2.50s")
+
+    def test_loader_warms_up_and_propagates_failures(self):
+        events = []
+        timer = StartupTimer()
+        loader = BackgroundModelLoader(lambda: _SlowDetector(events), timer=timer).start()
+        detector = loader.result(timeout=5)
+        self.assertTrue(detector.warmed)
+        self.assertTrue(loader.ready())
+        self.assertEqual(set(timer.phases), {"modelo", "warmup"})
+
+        def failing_factory():
+            raise RuntimeError("pesos ausentes")
+
+        failing = BackgroundModelLoader(failing_factory).start()
+        with self.assertRaises(RuntimeError):
+            failing.result(timeout=5)
+        self.assertFalse(failing.ready())
+
+    def test_capture_opens_while_model_loads(self):
+        events = []
+        release = threading.Event()
+
+        def factory():
+            release.wait(5)
+            events.append("modelo")
+            return _SlowDetector(events)
+
+        timer = StartupTimer()
+        loader = BackgroundModelLoader(factory, timer=timer).start()
+        _FakeFrameSource.events = events
+        _FakeFrameSource.opened = release
+
+        with patch("app.core.pipeline.FrameSource", _FakeFrameSource):
+            pipeline = ProcessingPipeline(
+                source="clip.mp4",
+                tracker=PersonTracker(tracker_config="native"),
+                counter=StreamCounter(storage=NullStorage(), initial_counts=dict(ZERO_COUNTS), zones_config=ZONES),
+                headless=True,
+                capture_process=False,
+                micro_batch=1,
+                detector_loader=loader,
+                startup_timer=timer,
+            )
+            pipeline.run()
+
+        self.assertEqual(events[:3], ["captura", "modelo", "warmup"])
+        self.assertIsInstance(pipeline.detector, _SlowDetector)
+        self.assertIn("espera do modelo", timer.phases)
+        self.assertIsNone(pipeline.startup_timer)  # resumo registrado na primeira contagem
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import os
 import sqlite3
 import tempfile
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import patch
 
 from app.analytics.statistics import StatsAnalyzer
@@ -91,6 +91,41 @@ class StatsAnalyzerTests(unittest.TestCase):
         self.assertEqual(peak["hour"], "08")
         self.assertEqual(peak["count"], 3)
 
+    def test_buckets_and_range_totals(self):
+        self._insert_events(
+            [
+                ("2026-02-09 08:10:00", "IN", 1),   # segunda-feira
+                ("2026-02-12 08:20:00", "OUT", 2),
+                ("2026-02-12 08:30:00", "IN", 3),
+                ("2026-02-12 10:00:00", "IN", 4),
+                ("2026-02-16 00:00:00", "IN", 5),   # semana seguinte
+                ("2026-02-17 00:00:00", "OUT", 6),  # exclude (upper bound)
+            ]
+        )
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+
+        hourly = analyzer.get_buckets(date(2026, 2, 12), date(2026, 2, 12), "hour")
+        weekly = analyzer.get_buckets(date(2026, 2, 9), date(2026, 2, 16), "week", direction="IN")
+
+        self.assertEqual(
+            hourly,
+            {"bucket": ["2026-02-12 08:00", "2026-02-12 10:00"], "IN": [1, 1], "OUT": [1, 0]},
+        )
+        self.assertEqual(weekly, {"bucket": ["2026-02-09", "2026-02-16"], "IN": [3, 1]})
+        self.assertEqual(analyzer.get_range_report(date(2026, 2, 9), date(2026, 2, 16)), {"IN": 4, "OUT": 1})
+        with self.assertRaises(ValueError):
+            analyzer.get_buckets(date(2026, 2, 9), date(2026, 2, 16), "month")
+
+    def test_data_version_changes_only_when_file_changes(self):
+        analyzer = StatsAnalyzer(db_path=self.db_path)
+        first = analyzer.get_data_version()
+        self.assertEqual(first, analyzer.get_data_version())
+
+        self._insert_events([("2026-02-12 08:10:00", "IN", 1)])
+        os.utime(self.db_path, ns=(0, 1))  # garante mtime distinto em sistemas de arquivos de baixa resolução
+
+        self.assertNotEqual(first, analyzer.get_data_version())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,43 +1,12 @@
 import unittest
-from time import monotonic
-from types import SimpleNamespace
 from unittest.mock import patch
 
 from app.analytics.counter import StreamCounter
 from app.core.enums import Position
+from app.tracking.track_batch import TrackBatch
 from app.utils.logger import log
 
 
-class _FakeTensor:
-    def __init__(self, data):
-        self.data = data
-
-    def cpu(self):
-        return self
-
-    def numpy(self):
-        return self.data
-
-    def int(self):
-        return _FakeTensor([int(x) for x in self.data])
-
-    def __getitem__(self, key):
-        if isinstance(key, tuple):
-            rows, col = key
-            selected = self.data[rows] if isinstance(rows, slice) else [self.data[rows]]
-            return _FakeTensor([row[col] for row in selected])
-        return _FakeTensor(self.data[key])
-
-
-class _FakeBoxes:
-    def __init__(self, y_tops, ids):
-        self.xyxy = _FakeTensor([[0.0, float(y), 10.0, float(y) + 10.0] for y in y_tops])
-        self.id = _FakeTensor(ids)
-
-    def __bool__(self):
-        return len(self.id.data) > 0
-
-
 class _FakeStorageService:
     def __init__(self):
         self.saved_events = []
@@ -51,8 +20,9 @@ class _FakeStatsAnalyzer:
         return {"IN": 0, "OUT": 0}
 
 
-def _make_results(y_tops, ids):
-    return SimpleNamespace(boxes=_FakeBoxes(y_tops, ids))
+def _make_batch(y_tops, ids):
+    boxes = [[0.0, float(y), 10.0, float(y) + 10.0] for y in y_tops]
+    return TrackBatch.from_arrays(boxes, ids, [1.0] * len(ids))
 
 
 class StreamCounterTests(unittest.TestCase):
@@ -77,22 +47,21 @@ class StreamCounterTests(unittest.TestCase):
             "app.analytics.counter.StorageService", _FakeStorageService
         ), patch("app.analytics.counter.StatsAnalyzer", _FakeStatsAnalyzer):
             counter = StreamCounter()
-        counter.cleanup_interval_seconds = 0.0
         return counter
 
     def test_in_out_and_anti_duplication(self):
         counter = self._make_counter()
         frame_shape = (100, 100, 3)
 
-        counter.count(_make_results([40], [1]), frame_shape)  # TOP
-        in_c, out_c = counter.count(_make_results([60], [1]), frame_shape)  # TOP -> BOTTOM (IN)
+        counter.count(_make_batch([40], [1]), frame_shape)  # TOP
+        in_c, out_c = counter.count(_make_batch([60], [1]), frame_shape)  # TOP -> BOTTOM (IN)
         self.assertEqual((in_c, out_c), (1, 0))
 
-        in_c, out_c = counter.count(_make_results([40], [1]), frame_shape)  # already counted, no OUT
+        in_c, out_c = counter.count(_make_batch([40], [1]), frame_shape)  # already counted, no OUT
         self.assertEqual((in_c, out_c), (1, 0))
 
-        counter.count(_make_results([60], [2]), frame_shape)  # BOTTOM
-        in_c, out_c = counter.count(_make_results([40], [2]), frame_shape)  # BOTTOM -> TOP (OUT)
+        counter.count(_make_batch([60], [2]), frame_shape)  # BOTTOM
+        in_c, out_c = counter.count(_make_batch([40], [2]), frame_shape)  # BOTTOM -> TOP (OUT)
         self.assertEqual((in_c, out_c), (1, 1))
 
         self.assertEqual(counter.storage.saved_events, [("IN", 1), ("OUT", 2)])
@@ -101,15 +70,48 @@ class StreamCounterTests(unittest.TestCase):
         counter = self._make_counter()
         frame_shape = (100, 100, 3)
 
-        counter.track_positions[99] = Position.TOP
-        counter.already_counted.add(99)
-        counter.last_seen_at[99] = monotonic() - 5.0
+        counter.count(_make_batch([40], [99]), frame_shape, now=0.0)
+        counter.count(_make_batch([60], [99]), frame_shape, now=0.05)  # IN: 99 fica em already_counted
+        self.assertIn(99, counter.already_counted)
 
-        counter.count(SimpleNamespace(boxes=None), frame_shape)
+        counter.count(TrackBatch.empty(), frame_shape, now=0.2)
 
         self.assertNotIn(99, counter.track_positions)
         self.assertNotIn(99, counter.already_counted)
         self.assertNotIn(99, counter.last_seen_at)
+        self.assertNotIn(99, counter.last_y_top)
+
+    def test_expiry_visits_only_stale_ids_in_frame_time(self):
+        counter = self._make_counter()
+        counter.max_inactive_seconds = 10.0
+        frame_shape = (100, 100, 3)
+
+        counter.count(_make_batch([40, 40, 40], [1, 2, 3]), frame_shape, now=0.0)
+        counter.count(_make_batch([40], [1]), frame_shape, now=8.0)  # 1 passa para o fim da fila
+        counter.count(_make_batch([40], [4]), frame_shape, now=10.5)
+
+        self.assertEqual(list(counter.last_seen_at), [1, 4])
+        self.assertEqual(set(counter.track_positions), {1, 4})
+
+        counter.count(TrackBatch.empty(), frame_shape, now=18.0)  # 8.0 + 10 ainda não passou
+        self.assertEqual(list(counter.last_seen_at), [1, 4])
+        counter.count(TrackBatch.empty(), frame_shape, now=20.6)
+        self.assertEqual(list(counter.last_seen_at), [])
+        self.assertEqual((counter.track_positions, counter.last_y_top), ({}, {}))
+
+    def test_apply_zones_remaps_active_tracks_without_phantom_crossing(self):
+        counter = self._make_counter()
+        frame_shape = (100, 100, 3)
+
+        counter.count(_make_batch([40, 52], [1, 2]), frame_shape)  # 1: TOP, 2: MIDDLE (45..55)
+        counter.apply_zones({"counting_line": {"y_ratio": 0.3, "offset": 0.05}})  # faixa 25..35
+
+        self.assertEqual(counter.track_positions[1], Position.BOTTOM)
+        self.assertEqual(counter.track_positions[2], Position.BOTTOM)
+        self.assertEqual(counter.count(_make_batch([40, 52], [1, 2]), frame_shape), (0, 0))
+
+        in_c, out_c = counter.count(_make_batch([20], [1]), frame_shape)  # BOTTOM -> TOP na faixa nova
+        self.assertEqual((in_c, out_c), (0, 1))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+import gzip
+import json
+import sqlite3
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from app.services.database import SqliteBackend
+from app.services.sync import (
+    CentralAggregator,
+    DirectoryTransport,
+    HttpTransport,
+    LoopbackTransport,
+    SyncAgent,
+    BatchTooLarge,
+    decode_batch,
+    encode_batch,
+)
+from app.utils.logger import log
+
+
+class _FlakyTransport:
+    """Entrega ao agregador mas falha ao devolver o ack (simula timeout após o commit central)."""
+
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self.fail_next = True
+
+    def send(self, data):
+        result = self.aggregator.ingest(data)
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("ack perdido")
+        return result
+
+
+class SyncTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.central = CentralAggregator(self.base / "central.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _site_db(self, name, n_events):
+        path = self.base / f"{name}.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS counts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    direction TEXT NOT NULL,
+                    object_id INTEGER NOT NULL
+                )
+                """
+            )
+            self._add_events(conn, n_events)
+        return path
+
+    def _add_events(self, conn, n_events):
+        conn.executemany(
+            "INSERT INTO counts (timestamp, direction, object_id) VALUES (?, ?, ?)",
+            [(f"2026-02-12 08:00:{i % 60:02d}", "IN" if i % 2 else "OUT", i) for i in range(n_events)],
+        )
+
+    def _central_rows(self):
+        with sqlite3.connect(self.central.db_path) as conn:
+            return conn.execute("SELECT site_id, COUNT(*) FROM site_counts GROUP BY site_id ORDER BY site_id").fetchall()
+
+    def test_incremental_sync_ships_only_new_rows_per_site(self):
+        db_a, db_b = self._site_db("a", 12), self._site_db("b", 3)
+        agent_a = SyncAgent(db_a, "loja-a", LoopbackTransport(self.central), batch_size=5)
+        agent_b = SyncAgent(db_b, "loja-b", LoopbackTransport(self.central))
+
+        self.assertEqual(agent_a.run_once(), 12)
+        self.assertEqual(agent_b.run_once(), 3)
+        self.assertEqual(agent_a.run_once(), 0)
+
+        with sqlite3.connect(db_a) as conn:
+            self._add_events(conn, 4)
+        bytes_before = agent_a.bytes_sent
+        self.assertEqual(agent_a.run_once(), 4)
+
+        self.assertLess(agent_a.bytes_sent - bytes_before, bytes_before)
+        self.assertEqual(self._central_rows(), [("loja-a", 16), ("loja-b", 3)])
+        self.assertEqual(self.central.watermark("loja-a"), 16)
+
+    def test_events_after_reset_are_still_synced(self):
+        db = self._site_db("a", 5)
+        backend = SqliteBackend(db)
+        with backend.session() as conn:
+            backend.create_schema(conn)
+        agent = SyncAgent(db, "loja-a", LoopbackTransport(self.central))
+        self.assertEqual(agent.run_once(), 5)
+
+        with backend.session() as conn:
+            backend.reset(conn)
+        with sqlite3.connect(db) as conn:
+            self._add_events(conn, 3)
+            self.assertEqual(conn.execute("SELECT MIN(id) FROM counts").fetchone()[0], 1)
+
+        self.assertEqual(agent.run_once(), 3)
+        self.assertEqual(self._central_rows(), [("loja-a", 8)])
+        self.assertEqual(self.central.watermark("loja-a"), 3)
+
+    def test_central_created_before_epochs_is_migrated(self):
+        path = self.base / "legado.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE site_counts (
+                    site_id TEXT NOT NULL, source_id INTEGER NOT NULL, timestamp DATETIME NOT NULL,
+                    direction TEXT NOT NULL, object_id INTEGER NOT NULL, PRIMARY KEY (site_id, source_id)
+                )
+                """
+            )
+            conn.execute("INSERT INTO site_counts VALUES ('loja-a', 1, '2026-02-12 08:00:00', 'IN', 7)")
+
+        central = CentralAggregator(path)
+        central.ingest(encode_batch("loja-a", [(1, "2026-02-13 08:00:00", "IN", 9)], epoch="e2"))
+
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT epoch, source_id, object_id FROM site_counts ORDER BY epoch").fetchall()
+        self.assertEqual(rows, [("", 1, 7), ("e2", 1, 9)])
+
+    def test_retry_after_lost_ack_is_idempotent(self):
+        db = self._site_db("a", 7)
+        agent = SyncAgent(db, "loja-a", _FlakyTransport(self.central))
+
+        with self.assertRaises(ConnectionError):
+            agent.run_once()
+        self.assertEqual(agent.run_once(), 7)  # reenvia o mesmo lote
+
+        self.assertEqual(self._central_rows(), [("loja-a", 7)])
+        replay = self.central.ingest(encode_batch("loja-a", [(1, "2026-02-12 08:00:00", "OUT", 0)], agent.epoch))
+        self.assertEqual(replay["inserted"], 0)
+
+    def test_malformed_batches_are_rejected_before_writing(self):
+        def raw(payload):
+            return gzip.compress(json.dumps(payload).encode("utf-8"))
+
+        bad = [
+            raw({"site_id": "loja-a", "rows": [[1, "2026-02-12 08:00:00", "IN"]]}),
+            raw({"site_id": "loja-a", "rows": [[1, "2026-02-12 08:00:00", "IN", [7]]]}),
+            raw({"site_id": "loja-a", "rows": [[True, "2026-02-12 08:00:00", "IN", 7]]}),
+            raw({"site_id": "loja-a", "rows": [[1, "2026-02-12 08:00:00", "SIDEWAYS", 7]]}),
+            raw({"site_id": "loja-a", "rows": ["1,2026-02-12,IN,7"]}),
+            raw({"site_id": "loja-a", "rows": [[2, "2026-02-12 08:00:00", "IN", 7], [1, None, "IN", 7]]}),
+            raw(["loja-a"]),
+            raw({"site_id": 5, "rows": []}),
+            gzip.compress(b"{}")[:-4],
+            b"nao e gzip",
+        ]
+        for data in bad:
+            with self.assertRaises(ValueError):
+                self.central.ingest(data)
+        self.assertEqual(self._central_rows(), [])
+
+    def test_decompression_is_bounded(self):
+        batch = encode_batch("loja-a", [(i, "2026-02-12 08:00:00", "IN", i) for i in range(200)])
+        self.assertEqual(len(decode_batch(batch, max_bytes=64 * 1024)["rows"]), 200)
+        with self.assertRaises(BatchTooLarge):
+            decode_batch(gzip.compress(b" " * (1024 * 1024)), max_bytes=64 * 1024)
+
+    def test_directory_transport_round_trip(self):
+        db = self._site_db("a", 9)
+        outbox = self.base / "outbox"
+        agent = SyncAgent(db, "loja-a", DirectoryTransport(outbox), batch_size=4)
+
+        self.assertEqual(agent.run_once(), 9)
+        self.assertEqual(len(list(outbox.glob("*.json.gz"))), 3)
+        self.assertEqual(self.central.ingest_directory(outbox), 9)
+        self.assertEqual(list(outbox.glob("*.json.gz")), [])
+        self.assertEqual(self._central_rows(), [("loja-a", 9)])
+
+    def test_http_transport_against_loopback_server(self):
+        aggregator = self.central
+        received_auth = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received_auth.append(self.headers.get("Authorization"))
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                payload = json.dumps(aggregator.ingest(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/sync/ingest"
+            agent = SyncAgent(self._site_db("a", 6), "loja-a", HttpTransport(url, token="segredo"), batch_size=4)
+            self.assertEqual(agent.run_once(), 6)
+            self.assertEqual(received_auth, ["Bearer segredo", "Bearer segredo"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(self._central_rows(), [("loja-a", 6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,29 @@
 import unittest
+from types import SimpleNamespace
 
+import numpy as np
+
+from app.tracking.track_batch import TrackBatch
 from app.tracking.tracker import PersonTracker
 
 
+class _FakeTensor:
+    def __init__(self, data):
+        self.data = np.asarray(data)
+        self.cpu_calls = 0
+
+    def cpu(self):
+        self.cpu_calls += 1
+        return self
+
+    def numpy(self):
+        return self.data
+
+
 class _FakeDetector:
-    def __init__(self):
+    def __init__(self, result=None):
         self.calls = []
+        self.result = result if result is not None else SimpleNamespace(boxes=None)
 
     def track(self, frame, tracker, conf, iou):
         self.calls.append(
@@ -16,7 +34,7 @@ class _FakeDetector:
                 "iou": iou,
             }
         )
-        return {"ok": True}
+        return self.result
 
 
 class PersonTrackerContractTests(unittest.TestCase):
@@ -27,13 +45,30 @@ class PersonTrackerContractTests(unittest.TestCase):
 
         result = tracker.update(detector, frame)
 
-        self.assertEqual(result, {"ok": True})
+        self.assertIsInstance(result, TrackBatch)
+        self.assertEqual(len(result), 0)
         self.assertEqual(len(detector.calls), 1)
         self.assertEqual(detector.calls[0]["frame"], frame)
         self.assertEqual(detector.calls[0]["tracker"], "botsort.yaml")
         self.assertEqual(detector.calls[0]["conf"], 0.25)
         self.assertEqual(detector.calls[0]["iou"], 0.45)
 
+    def test_update_converts_results_into_contiguous_track_batch_once(self):
+        boxes = SimpleNamespace(
+            xyxy=_FakeTensor([[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]]),
+            id=_FakeTensor([3.0, 9.0]),
+            conf=_FakeTensor([0.8, 0.6]),
+        )
+        detector = _FakeDetector(SimpleNamespace(boxes=boxes))
+
+        batch = PersonTracker().update(detector, frame=object())
+
+        self.assertTrue(batch.has_ids)
+        self.assertListEqual(batch.ids.tolist(), [3, 9])
+        self.assertEqual(batch.boxes.dtype, np.float32)
+        self.assertTrue(batch.boxes.flags["C_CONTIGUOUS"])
+        self.assertEqual((boxes.xyxy.cpu_calls, boxes.id.cpu_calls, boxes.conf.cpu_calls), (1, 1, 1))
+
 
 if __name__ == "__main__":
     unittest.main()
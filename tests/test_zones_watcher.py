@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core.zones_watcher import ZonesWatcher
+from app.utils.logger import log
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ZonesWatcherTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._prev_log_disabled = log.disabled
+        log.disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        log.disabled = cls._prev_log_disabled
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "zones.yaml"
+        self._write("counting_line:\n  y_ratio: 0.5\n  offset: 0.05\n", mtime=1_000)
+        self.clock = FakeClock()
+        self.watcher = ZonesWatcher(self.path, interval=1.0, clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, text: str, mtime: int) -> None:
+        self.path.write_text(text, encoding="utf-8")
+        os.utime(self.path, ns=(mtime * 10**9, mtime * 10**9))
+
+    def test_returns_config_only_after_change_and_interval(self):
+        self.clock.now = 5.0
+        self.assertIsNone(self.watcher.poll())  # sem alteração
+
+        self._write("counting_line:\n  y_ratio: 0.4\n  offset: 0.05\n", mtime=2_000)
+        self.clock.now = 5.5
+        self.assertIsNone(self.watcher.poll())  # dentro do intervalo
+
+        self.clock.now = 6.0
+        config = self.watcher.poll()
+        self.assertEqual(config["counting_line"]["y_ratio"], 0.4)
+        self.clock.now = 7.0
+        self.assertIsNone(self.watcher.poll())
+        self.assertEqual(self.watcher.reloads, 1)
+
+    def test_invalid_file_keeps_current_zones_until_fixed(self):
+        self._write("counting_line: [\n", mtime=2_000)
+        self.clock.now = 1.0
+        self.assertIsNone(self.watcher.poll())
+
+        self._write("counting_line:\n  y_ratio: 0.7\n  offset: 0.02\n", mtime=3_000)
+        self.clock.now = 2.0
+        self.assertEqual(self.watcher.poll()["counting_line"]["offset"], 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()